@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Latency benchmark for handshake verification in ``src.codex16_validator``.
+
+Run from the repository root::
+
+    python benchmarks/bench_handshake.py --iterations 20000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import codex16_validator as validator  # noqa: E402
+
+
+def _time_per_call(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark handshake verification")
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--agents", type=int, default=500, help="configs per verify_many batch")
+    args = parser.parse_args()
+
+    text = validator.HANDSHAKE_YAML
+    for audit in (False, True):
+        def cold() -> None:
+            validator.clear_cache()
+            validator.verify_handshake(text, audit=audit)
+
+        cold_s = _time_per_call(cold, max(1, args.iterations // 10))
+        validator.verify_handshake(text, audit=audit)
+        warm_s = _time_per_call(lambda: validator.verify_handshake(text, audit=audit), args.iterations)
+        mode = "audit" if audit else "default"
+        print(f"{mode:8s} cold {cold_s * 1e6:9.2f} us/call   cached {warm_s * 1e6:7.2f} us/call")
+
+    configs = [text] * args.agents
+    validator.clear_cache()
+    start = time.perf_counter()
+    results = validator.verify_many(configs)
+    elapsed = time.perf_counter() - start
+    print(f"verify_many {len(results)} configs in {elapsed * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Model calls per report for ``Summarizer.summarize`` vs ``summarize_many``.
+
+Starts a local fake OpenAI-compatible completion server, then summarizes a
+synthetic feed of mostly small reports both one call at a time and packed::
+
+    python benchmarks/bench_summarizer.py --reports 500 --latency-ms 50
+
+The server answers packed prompts with one OODA object per report id, and
+``--bad-rate`` makes that fraction of packed entries invalid so the
+per-entry fallback is exercised too.  Requires the ``openai`` package; no
+API key or network access is needed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks import generators  # noqa: E402
+from src.summarizer import Summarizer, estimate_tokens  # noqa: E402
+
+_REPORT_RE = re.compile(r"^\[(r\d+)\]$", re.M)
+
+
+def _ooda(seed: str) -> Dict[str, str]:
+    return {key: f"{key}: {seed[:40]}" for key in ("Observe", "Orient", "Decide", "Act")}
+
+
+class FakeCompletions(ThreadingHTTPServer):
+    """Minimal ``/v1/chat/completions`` endpoint that counts its requests."""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0, bad_rate: float = 0.0, seed: int = 18) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.bad_rate = bad_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def answer(self, prompt: str) -> str:
+        ids = _REPORT_RE.findall(prompt)
+        with self.lock:
+            self.calls += 1
+            self.prompt_tokens += estimate_tokens(prompt)
+            if not ids:
+                return json.dumps(_ooda(prompt))
+            bad = {key for key in ids if self.rng.random() < self.bad_rate}
+        return json.dumps({key: {"Observe": ""} if key in bad else _ooda(key) for key in ids})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeCompletions
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        time.sleep(self.server.latency)
+        content = self.server.answer(body["messages"][-1]["content"])
+        payload = json.dumps({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def make_feed(count: int, large_share: float = 0.02, seed: int = 18) -> List[Dict[str, str]]:
+    """Mostly 200-800 character reports with a few multi-page ones."""
+    rng = random.Random(seed)
+    feed = []
+    for i in range(count):
+        size = rng.randint(6_000, 20_000) if rng.random() < large_share else rng.randint(200, 800)
+        feed.append({"text": generators.make_report(size, front_matter=False, seed=i)})
+    return feed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark packed summarization")
+    parser.add_argument("--reports", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated model latency per call")
+    parser.add_argument("--bad-rate", type=float, default=0.01, help="share of packed entries answered invalidly")
+    parser.add_argument("--token-budget", type=int, default=3000)
+    args = parser.parse_args()
+
+    feed = make_feed(args.reports)
+    server = FakeCompletions(args.latency_ms / 1000, args.bad_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    summarizer = Summarizer(api_key="fake", base_url=server.base_url)
+    try:
+        for mode in ("single", "packed"):
+            server.calls = server.prompt_tokens = 0
+            start = time.perf_counter()
+            if mode == "single":
+                summaries = [summarizer.summarize(item) for item in feed]
+            else:
+                summaries = summarizer.summarize_many(feed, token_budget=args.token_budget)
+            elapsed = time.perf_counter() - start
+            assert len(summaries) == len(feed)
+            print(
+                f"{mode:6s} {server.calls:5d} calls  {server.calls / len(feed):.3f} calls/report  "
+                f"{server.prompt_tokens:8d} prompt tokens  {elapsed:7.2f} s"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
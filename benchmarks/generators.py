@@ -0,0 +1,78 @@
+"""Synthetic data generators for the Codex18 benchmark suite."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+from typing import Dict, Iterator, List, Set
+
+ISSUE_TAGS = [
+    "misinformation", "fabrication", "inaccurate", "error",
+    "contradiction", "inconsistency", "omission", "discrepancy",
+    "speculative", "unverified", "ambiguous", "irrelevant",
+]
+
+_WORDS = (
+    "veteran signal drift anchor ledger braid report source field unit brief "
+    "observe orient decide act sentinel protector vector integrity context"
+).split()
+
+
+def _node_hash(node: Dict) -> str:
+    return hashlib.sha256(json.dumps(node, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def iter_braid_nodes(count: int, seed: int = 18) -> Iterator[Dict]:
+    """Yield ``count`` chained nodes that pass :class:`src.validator.Validator`."""
+    rng = random.Random(seed)
+    parent = "genesis"
+    for i in range(count):
+        node = {
+            "id": f"2025-05-25T00:00:00Z-Node{i}",
+            "version_anchor": "v18.0.0",
+            "recursion_layer": "RI-256",
+            "symbolic_anchor": "No Veteran Left Behind",
+            "parent_node": parent,
+            "facts": {"seq": i, "signal": rng.choice(_WORDS)},
+        }
+        node["truth_vector_hash"] = _node_hash(node)
+        parent = node["id"]
+        yield node
+
+
+def write_braid_history(memory_dir: str, count: int) -> str:
+    """Write a ``braid_history.jsonl`` log with ``count`` nodes and return its path."""
+    os.makedirs(memory_dir, exist_ok=True)
+    path = os.path.join(memory_dir, "braid_history.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for node in iter_braid_nodes(count):
+            f.write(json.dumps(node) + "\n")
+    return path
+
+
+def make_report(size_bytes: int, front_matter: bool = True, seed: int = 18) -> str:
+    """Return a report of roughly ``size_bytes`` characters."""
+    rng = random.Random(seed)
+    header = "---\ntitle: Benchmark Report\nauthor: Bench Runner\ntags: [osint, bench]\n---\n" if front_matter else ""
+    line = " ".join(rng.choice(_WORDS) for _ in range(12)) + "\n"
+    body = line * max(1, (size_bytes - len(header)) // len(line))
+    return header + body
+
+
+def make_tags(count: int, seed: int = 18) -> Set[str]:
+    """Return ``count`` issue tags mixing known categories and free-form tags."""
+    rng = random.Random(seed)
+    tags: Set[str] = set(rng.sample(ISSUE_TAGS, min(count, len(ISSUE_TAGS))))
+    i = 0
+    while len(tags) < count:
+        tags.add(f"custom-{i}")
+        i += 1
+    return tags
+
+
+def make_vectors(count: int, seed: int = 18) -> List[List[float]]:
+    """Return ``count`` random 4D truth vectors in ``[0, 1]``."""
+    rng = random.Random(seed)
+    return [[rng.random() for _ in range(4)] for _ in range(count)]
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Load test for the VAULTIS gateway (``src/gateway.py``).
+
+Start the gateway, then drive it with concurrent keep-alive clients::
+
+    python src/gateway.py --workers 4 &
+    python benchmarks/load_gateway.py --url http://localhost:8000 --clients 32 --duration 10
+
+Reports requests/sec and p50/p90/p99 latency per scenario.  Only the standard
+library is used, so the client machine needs no extra packages.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import statistics
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+Request = Tuple[str, str, Optional[bytes], Dict[str, str]]
+
+
+def _drift_request(rng: random.Random) -> Request:
+    inputs = [{"quality_score": rng.random(), "tags": rng.sample(["bias", "omission", "speculation"], 1)}
+              for _ in range(8)]
+    body = json.dumps({"inputs": inputs}).encode("utf-8")
+    return "POST", "/drift/batch", body, {"Content-Type": "application/json"}
+
+
+def _search_request(rng: random.Random) -> Request:
+    return "GET", f"/braid/search?q=latest_report+{rng.choice(['bench', 'report', 'alarm'])}", None, {}
+
+
+def _health_request(rng: random.Random) -> Request:
+    return "GET", "/health", None, {}
+
+
+def _report_request(rng: random.Random) -> Request:
+    body = ("---\ntitle: load test\n---\n" + "lorem ipsum " * 200).encode("utf-8")
+    name = f"load_{threading.get_ident()}_{rng.getrandbits(48):x}.md"
+    return "POST", f"/reports?filename={name}", body, {"Content-Type": "text/markdown"}
+
+
+SCENARIOS: Dict[str, Callable[[random.Random], Request]] = {
+    "health": _health_request,
+    "drift": _drift_request,
+    "search": _search_request,
+    "reports": _report_request,
+}
+
+
+def _connect(url: str) -> http.client.HTTPConnection:
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+    conn.connect()
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs adds ~40ms to every request and measures nothing useful.
+    conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return conn
+
+
+def _client(url: str, scenario: str, deadline: float, latencies: List[float], errors: List[int], seed: int) -> None:
+    conn = _connect(url)
+    make = SCENARIOS[scenario]
+    rng = random.Random(seed)
+    local: List[float] = []
+    failed = 0
+    while time.perf_counter() < deadline:
+        method, path, body, headers = make(rng)
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                failed += 1
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            conn.close()
+            conn = _connect(url)
+            continue
+        local.append(time.perf_counter() - start)
+    conn.close()
+    latencies.extend(local)
+    errors.append(failed)
+
+
+def run_load(url: str, scenario: str, clients: int, duration: float) -> Dict:
+    """Hammer ``url`` with ``clients`` threads for ``duration`` seconds."""
+    latencies: List[float] = []
+    errors: List[int] = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_client, args=(url, scenario, deadline, latencies, errors, seed))
+        for seed in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+
+    def pct(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000 if ordered else 0.0
+
+    return {
+        "scenario": scenario,
+        "clients": clients,
+        "requests": len(ordered),
+        "errors": sum(errors),
+        "requests_per_s": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(pct(0.50), 3),
+        "p90_ms": round(pct(0.90), 3),
+        "p99_ms": round(pct(0.99), 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load test the VAULTIS gateway")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default: all read/analyze scenarios)")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scenario in args.scenario or ["health", "drift", "search"]:
+        result = run_load(args.url, scenario, args.clients, args.duration)
+        results.append(result)
+        print(f"{scenario:10s} {result['requests_per_s']:10.1f} req/s  p50 {result['p50_ms']:8.2f} ms  "
+              f"p99 {result['p99_ms']:8.2f} ms  errors {result['errors']}", flush=True)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
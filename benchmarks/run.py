@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""Benchmark runner for the Codex18 hot paths.
+
+Measure the current tree and store a JSON baseline::
+
+    python benchmarks/run.py run --scale small --output benchmarks/baselines/small.json
+
+Compare a new run against a stored baseline, failing on regressions larger
+than the threshold (a ratio, ``0.15`` = 15% slower)::
+
+    python benchmarks/run.py run --scale small --output /tmp/new.json
+    python benchmarks/run.py compare benchmarks/baselines/small.json /tmp/new.json --threshold 0.15
+
+Scales: ``small`` (1k braid nodes, reports up to 1MB), ``medium`` (100k nodes,
+reports up to 10MB) and ``large`` (1M nodes, reports up to 100MB).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if __package__ in (None, ""):
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks import generators
+
+SCALES: Dict[str, Dict] = {
+    "small": {
+        "braid_nodes": 1_000,
+        "report_sizes": [1_000, 1_000_000],
+        "tag_counts": [10, 1_000],
+        "drift_ops": 200,
+        "ingest_files": 50,
+        "backtest_rows": 50_000,
+    },
+    "medium": {
+        "braid_nodes": 100_000,
+        "report_sizes": [1_000, 1_000_000, 10_000_000],
+        "tag_counts": [10, 1_000, 100_000],
+        "drift_ops": 1_000,
+        "ingest_files": 500,
+        "backtest_rows": 525_600,
+    },
+    "large": {
+        "braid_nodes": 1_000_000,
+        "report_sizes": [1_000, 1_000_000, 100_000_000],
+        "tag_counts": [10, 1_000, 1_000_000],
+        "drift_ops": 5_000,
+        "ingest_files": 2_000,
+        "backtest_rows": 2_000_000,
+    },
+}
+
+
+class Case(NamedTuple):
+    name: str
+    ops: int
+    func: Callable[[], None]
+    setup: Optional[Callable[[], None]] = None
+
+
+def _size_label(size: int) -> str:
+    for unit, factor in (("MB", 1_000_000), ("KB", 1_000)):
+        if size >= factor:
+            return f"{size // factor}{unit}"
+    return f"{size}B"
+
+
+# ----------------------------------------------------------------------
+# Cases
+# ----------------------------------------------------------------------
+def braid_cases(params: Dict, workdir: str) -> Iterator[Case]:
+    from src.memory_ledger import MemoryBraid
+
+    config = os.path.join(workdir, "VAULTIS.yml")
+    with open(config, "w", encoding="utf-8") as f:
+        f.write("version: 18.0.0\nrecursion_tier: RI-256\n")
+    memory_dir = os.path.join(workdir, "braid")
+    nodes = params["braid_nodes"]
+    generators.write_braid_history(memory_dir, nodes)
+
+    yield Case(f"braid_load[{nodes}]", 1, lambda: MemoryBraid(config_path=config, memory_dir=memory_dir))
+
+    braid = MemoryBraid(config_path=config, memory_dir=memory_dir)
+    counter = iter(range(10**9))
+    yield Case(f"braid_update[{nodes}]", 3, lambda: [braid.update({"bench": next(counter)}) for _ in range(3)])
+
+
+def codec_cases(params: Dict, workdir: str) -> Iterator[Case]:
+    from src import codec
+
+    nodes = list(generators.iter_braid_nodes(min(params["braid_nodes"], 100_000)))
+    encoded = codec.dumps(nodes, indent=True)
+    label = f"{codec.BACKEND},{len(nodes)}"
+    yield Case(f"codec_dumps[{label}]", len(nodes), lambda: codec.dumps(nodes, indent=True))
+    yield Case(f"codec_loads[{label}]", len(nodes), lambda: codec.loads(encoded))
+    yield Case(f"codec_canonical_bytes[{len(nodes)}]", len(nodes), lambda: [codec.canonical_bytes(n) for n in nodes])
+
+
+def validator_cases(params: Dict, workdir: str) -> Iterator[Case]:
+    from src.validator import Validator
+
+    nodes = list(generators.iter_braid_nodes(min(params["braid_nodes"], 100_000)))
+    validator = Validator()
+
+    def validate_all() -> None:
+        for node in nodes:
+            if not validator.validate(node):
+                raise AssertionError("generated node failed validation")
+
+    yield Case(f"validator_validate[{len(nodes)}]", len(nodes), validate_all)
+
+
+def truth_vector_cases(params: Dict, workdir: str) -> Iterator[Case]:
+    from core.truth_vector import TruthVector
+
+    tv = TruthVector()
+    for count in params["tag_counts"]:
+        tags = generators.make_tags(count)
+        yield Case(f"truth_vector_process_input[tags={count}]", 1, lambda tags=tags: tv.process_input(0.7, tags))
+
+
+def drift_cases(params: Dict, workdir: str) -> Iterator[Case]:
+    from core.drift_analysis_engine import DriftAnalysisEngine
+
+    engine = DriftAnalysisEngine()
+    vectors = generators.make_vectors(params["drift_ops"])
+    tags = generators.make_tags(4)
+
+    def analyze() -> None:
+        for vector in vectors:
+            engine.analyze_input(vector[0], tags)
+
+    yield Case(f"drift_analyze_input[{len(vectors)}]", len(vectors), analyze)
+
+
+def ingest_cases(params: Dict, workdir: str) -> Iterator[Case]:
+    from src import ingest
+
+    for size in params["report_sizes"]:
+        text = generators.make_report(size)
+        yield Case(
+            f"ingest_parse_report[{_size_label(size)}]",
+            1,
+            lambda text=text: ingest.build_record(*ingest.parse_report(text), datetime.utcnow()),
+        )
+
+    incoming = os.path.join(workdir, "incoming")
+    output = os.path.join(workdir, "analysis_output")
+    archive = os.path.join(workdir, "archive")
+    files = params["ingest_files"]
+    report = generators.make_report(2_000)
+
+    def stage_files() -> None:
+        for path in (incoming, output, archive):
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path)
+        for i in range(files):
+            with open(os.path.join(incoming, f"report_{i}.md"), "w", encoding="utf-8") as f:
+                f.write(report)
+
+    def ingest_loop() -> None:
+        for path in ingest.iter_incoming(incoming):
+            ingest.ingest_file(path, output, archive)
+
+    yield Case(f"ingest_loop[{files}]", files, ingest_loop, stage_files)
+
+
+def backtest_cases(params: Dict, workdir: str) -> Iterator[Case]:
+    import numpy as np
+
+    from core.drift_backtest import DriftBacktest, History
+
+    rows = params["backtest_rows"]
+    rng = np.random.default_rng(18)
+    vectors = np.clip(0.7 + 0.1 * rng.standard_normal((rows, 4)), 0.0, 1.0)
+    backtest = DriftBacktest(History(1_735_689_600 + 60 * np.arange(rows), vectors))
+    grid = [np.linspace(0.05, 0.5, 10)] * 4
+    yield Case(f"drift_backtest_grid[{rows},10k]", 1, lambda: backtest.sweep_grid(grid, ["fixed", "rotate:1d"]))
+
+
+def handshake_cases(params: Dict, workdir: str) -> Iterator[Case]:
+    from src import codex16_validator
+
+    def cold() -> None:
+        codex16_validator.clear_cache()
+        codex16_validator.verify_handshake()
+
+    yield Case("handshake_verify[cold]", 1, cold)
+    yield Case("handshake_verify[cached]", 1, codex16_validator.verify_handshake)
+
+
+def vector_index_cases(params: Dict, workdir: str) -> Iterator[Case]:
+    from src.vector_index import VectorIndex
+
+    count = params["braid_nodes"]
+    index = VectorIndex(os.path.join(workdir, "truth_vectors.bin"))
+    vectors = generators.make_vectors(count)
+    index.append_many((vector, f"r{i}") for i, vector in enumerate(vectors))
+    queries = generators.make_vectors(20, seed=43)
+
+    def knn() -> None:
+        for query in queries:
+            index.query(query, k=10)
+
+    yield Case(f"vector_index_query[{count},k=10]", len(queries), knn)
+
+
+def trigger_cases(params: Dict, workdir: str) -> Iterator[Case]:
+    from src.trigger_engine import TriggerEngine
+
+    if not params["triggers"]:
+        # An empty engine would time a no-op and poison the baseline
+        raise RuntimeError(f"no trigger definitions found under {REPO_ROOT}")
+    engine = TriggerEngine(params["triggers"])
+    values = [v[0] / 10 for v in generators.make_vectors(10_000)]
+
+    def updates() -> None:
+        for value in values:
+            engine.update("drift_index", value)
+
+    yield Case("trigger_engine_update[10000]", len(values), updates)
+
+
+CASE_GROUPS = {
+    "braid": braid_cases,
+    "validator": validator_cases,
+    "codec": codec_cases,
+    "truth_vector": truth_vector_cases,
+    "drift": drift_cases,
+    "backtest": backtest_cases,
+    "ingest": ingest_cases,
+    "handshake": handshake_cases,
+    "triggers": trigger_cases,
+    "vector_index": vector_index_cases,
+}
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+def _time_case(case: Case, rounds: int) -> Dict:
+    samples: List[float] = []
+    for _ in range(rounds):
+        if case.setup is not None:
+            case.setup()
+        start = time.perf_counter()
+        case.func()
+        samples.append((time.perf_counter() - start) / case.ops)
+    return {
+        "seconds_per_op": statistics.median(samples),
+        "min_seconds_per_op": min(samples),
+        "ops": case.ops,
+        "rounds": rounds,
+    }
+
+
+def run_suite(scale: str = "small", groups: Optional[List[str]] = None, rounds: int = 3) -> Dict:
+    """Run the selected benchmark groups and return the result document."""
+    from src.trigger_engine import TRIGGER_FILES, load_triggers
+
+    # Trigger definitions live in the repository, wherever the runner is started
+    params = dict(SCALES[scale], triggers=load_triggers(os.path.join(REPO_ROOT, p) for p in TRIGGER_FILES))
+    results: Dict[str, Dict] = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="codex18-bench-") as workdir:
+        # Engines write under ./data, so keep every side effect in the workdir
+        os.chdir(workdir)
+        try:
+            for group in groups or list(CASE_GROUPS):
+                for case in CASE_GROUPS[group](params, workdir):
+                    results[case.name] = _time_case(case, rounds)
+                    print(f"{case.name:45s} {results[case.name]['seconds_per_op'] * 1e6:14.2f} us/op", flush=True)
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "meta": {
+            "scale": scale,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.15) -> List[Dict]:
+    """Return one row per shared case, flagging slowdowns beyond ``threshold``."""
+    rows = []
+    for name, base in baseline.get("results", {}).items():
+        new = current.get("results", {}).get(name)
+        if new is None:
+            continue
+        ratio = new["seconds_per_op"] / base["seconds_per_op"] if base["seconds_per_op"] else float("inf")
+        rows.append({"case": name, "baseline": base["seconds_per_op"], "current": new["seconds_per_op"],
+                     "ratio": ratio, "regression": ratio > 1 + threshold})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Codex18 benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="run benchmarks and write a JSON result")
+    run_p.add_argument("--scale", choices=sorted(SCALES), default="small")
+    run_p.add_argument("--group", action="append", choices=sorted(CASE_GROUPS), help="limit to a group (repeatable)")
+    run_p.add_argument("--rounds", type=int, default=3)
+    run_p.add_argument("--output", help="path of the JSON result/baseline to write")
+
+    cmp_p = sub.add_parser("compare", help="compare a result against a baseline")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=0.15)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        result = run_suite(args.scale, args.group, args.rounds)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"{row['case']:45s} {row['ratio']:7.2f}x  {flag}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,15 @@
 import logging
 from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
 
-logging.basicConfig(level=logging.INFO)
-logging.info("[Codex17] RI-2048 Recursive Container Activating...")
+logger = logging.getLogger(__name__)
 
 class Agent(ABC):
-    def __init__(self, name):
+    def __init__(self, name, depends_on: Sequence[str] = ()):
         self.name = name
-        logging.info(f"[Agent] {self.name} initialized")
+        # Names of agents that must finish before this one executes
+        self.depends_on = tuple(depends_on)
+        logger.info(f"[Agent] {self.name} initialized")
 
     @abstractmethod
     def execute(self):
@@ -33,17 +35,30 @@ class ExileArchive(Agent):
     def execute(self):
         return "Transform archived wounds into symbolic strength"
 
-def main():
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    from core.scheduler import AgentScheduler
+
+    parser = argparse.ArgumentParser(description="Run the core agents through the scheduler")
+    parser.add_argument("--workers", type=int, default=None, help="agents run in parallel (default: one per agent)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info("[Codex17] RI-2048 Recursive Container Activating...")
     agents = [
         CoreSelf("Core Self"),
-        ManagerProtector("Manager Protector"),
-        FirefighterProtector("Firefighter"),
-        Sentinel("Sentinel"),
-        ExileArchive("Exile Archive")
+        ManagerProtector("Manager Protector", depends_on=["Core Self"]),
+        FirefighterProtector("Firefighter", depends_on=["Core Self"]),
+        Sentinel("Sentinel", depends_on=["Manager Protector", "Firefighter"]),
+        ExileArchive("Exile Archive", depends_on=["Core Self"])
     ]
-    for agent in agents:
-        result = agent.execute()
-        logging.info(f"[{agent.name}] Action: {result}")
+    runs = AgentScheduler(agents, max_workers=args.workers).run()
+    for run in runs.values():
+        if run.ok:
+            logger.info(f"[{run.name}] Action: {run.result} ({run.duration * 1000:.3f} ms)")
+        else:
+            logger.error(f"[{run.name}] Failed: {run.error}")
 
 if __name__ == "__main__":
     main()
@@ -7,13 +7,21 @@ alarm if any dimension differs by more than the configured threshold (default
 ``latest_drift_report.json`` and logged in ``data/analysis_output/drift_logs``
 with timestamped filenames.
 
+Consumers such as the loopstate tracker can :meth:`~DriftAnalysisEngine.subscribe`
+to receive every analysis result in-process as soon as it is produced.
+
 All timestamps are stored in UTC using the ``YYYY-MM-DDTHH:MM:SSZ`` format.
 """
 import json
+import logging
 import os
 from datetime import datetime
-from typing import List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set
 from core.truth_vector import TruthVector, SimpleTruthVector
+from src import codec
+from src.parse_metrics import timed
+
+logger = logging.getLogger(__name__)
 
 
 class DriftAnalysisEngine:
@@ -34,20 +42,18 @@ class DriftAnalysisEngine:
         self.threshold_vector = [0.20, 0.20, 0.20, 0.20]
         self.drift_alarm_active = False
 
+        self._subscribers: List[Callable[[Dict], None]] = []
+
     # ------------------------------------------------------------------
     # Anchor and report persistence helpers
     # ------------------------------------------------------------------
     def _load_anchor(self) -> Optional[List[float]]:
         try:
-            with open(self.anchor_path, "r") as f:
-                data = json.load(f)
-                return data.get("baseline_vector")
+            return codec.read_json(self.anchor_path).get("baseline_vector")
         except FileNotFoundError:
             # Fallback to a consolidated drift_results file if present
             try:
-                with open(os.path.join("data", "drift_results.json"), "r") as f:
-                    data = json.load(f)
-                    return data.get("baseline_vector")
+                return codec.read_json(os.path.join("data", "drift_results.json")).get("baseline_vector")
             except FileNotFoundError:
                 return None
 
@@ -57,17 +63,15 @@ class DriftAnalysisEngine:
             "baseline_vector": self.anchor_vector,
             "timestamp": timestamp,
         }
-        with open(self.anchor_path, "w") as f:
-            json.dump(data, f)
+        codec.write_json(self.anchor_path, data)
 
     def _load_last_report(self) -> Optional[List[float]]:
         try:
-            with open(self.latest_report_path, "r") as f:
+            with open(self.latest_report_path, "rb") as f:
                 text = f.read().strip()
-                if not text:
-                    return None
-                data = json.loads(text)
-                return data.get("vector")
+            if not text:
+                return None
+            return codec.loads(text).get("vector")
         except FileNotFoundError:
             return None
         except json.JSONDecodeError:
@@ -76,8 +80,7 @@ class DriftAnalysisEngine:
     def _save_last_report(self, vector: List[float]) -> None:
         timestamp = datetime.utcnow().replace(microsecond=0).strftime("%Y-%m-%dT%H:%M:%SZ")
         data = {"vector": vector, "timestamp": timestamp}
-        with open(self.latest_report_path, "w") as f:
-            json.dump(data, f)
+        codec.write_json(self.latest_report_path, data)
 
     def _log_report(
         self,
@@ -85,7 +88,7 @@ class DriftAnalysisEngine:
         diff_anchor: List[float],
         diff_last: Optional[List[float]],
         alarm_flag: bool,
-    ) -> None:
+    ) -> Dict:
         ts = datetime.utcnow().replace(microsecond=0).strftime("%Y-%m-%dT%H:%M:%SZ")
         path = os.path.join(self.logs_dir, f"drift_log_{ts}.json")
         timestamp = ts
@@ -96,9 +99,35 @@ class DriftAnalysisEngine:
             "alarm": alarm_flag,
             "timestamp": timestamp,
         }
-        with open(path, "w") as f:
-            json.dump(data, f)
+        codec.write_json(path, data)
+        return data
+
+    # ------------------------------------------------------------------
+    # Event subscription
+    # ------------------------------------------------------------------
+    def subscribe(self, callback: Callable[[Dict], None]) -> None:
+        """Register ``callback`` to receive every drift log entry as it is written."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Dict], None]) -> None:
+        """Stop delivering drift results to ``callback``."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _publish(self, event: Dict) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as exc:
+                # A faulty subscriber must never break drift analysis
+                logger.error("Drift subscriber %r failed: %s", callback, exc, exc_info=True)
+
+    def reload(self) -> None:
+        """Re-read the anchor and last report persisted by other processes."""
+        self.anchor_vector = self._load_anchor()
+        self.last_report_vector = self._load_last_report()
 
+    @timed("drift_analyze_input")
     def analyze_input(self, quality_score: float, tags: Set[str]):
         """Analyze a new input and update drift state.
 
@@ -143,9 +172,10 @@ class DriftAnalysisEngine:
             differences_last = [abs(vector[i] - self.last_report_vector[i]) for i in range(4)]
 
         # Persist report information
-        self._log_report(vector, differences_anchor, differences_last, alarm_flag)
+        event = self._log_report(vector, differences_anchor, differences_last, alarm_flag)
         self._save_last_report(vector)
         self.last_report_vector = vector
+        self._publish(event)
 
         return vector, alarm_flag
 
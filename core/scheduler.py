@@ -0,0 +1,135 @@
+"""Dependency-aware concurrent runtime for Codex agents.
+
+Agents declare the names of the agents they depend on through
+``Agent.depends_on``.  :class:`AgentScheduler` starts every agent as soon as
+all of its dependencies have finished, so independent agents execute
+concurrently on a thread pool, and records how long each execution took.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyError(RuntimeError):
+    """Raised for an agent whose dependency failed or was skipped."""
+
+
+@dataclass
+class AgentRun:
+    """Outcome of a single agent execution."""
+
+    name: str
+    result: Any = None
+    error: Optional[BaseException] = None
+    started: float = 0.0
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AgentScheduler:
+    """Run agents concurrently while honouring declared dependencies."""
+
+    def __init__(self, agents: Iterable[Any] = (), max_workers: Optional[int] = None) -> None:
+        self.agents: Dict[str, Any] = {}
+        self.max_workers = max_workers
+        for agent in agents:
+            self.add(agent)
+
+    def add(self, agent: Any) -> None:
+        """Register ``agent``; names must be unique."""
+        if agent.name in self.agents:
+            raise ValueError(f"Duplicate agent name: {agent.name}")
+        self.agents[agent.name] = agent
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _dependencies(self, agent: Any) -> List[str]:
+        return list(getattr(agent, "depends_on", ()) or ())
+
+    def _check_graph(self) -> None:
+        for name, agent in self.agents.items():
+            for dep in self._dependencies(agent):
+                if dep not in self.agents:
+                    raise ValueError(f"Agent '{name}' depends on unknown agent '{dep}'")
+
+        visiting: set = set()
+        done: set = set()
+
+        def visit(name: str, path: List[str]) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                cycle = " -> ".join(path[path.index(name):] + [name])
+                raise ValueError(f"Agent dependency cycle: {cycle}")
+            visiting.add(name)
+            for dep in self._dependencies(self.agents[name]):
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.agents:
+            visit(name, [])
+
+    @staticmethod
+    def _execute(agent: Any) -> AgentRun:
+        run = AgentRun(name=agent.name, started=time.perf_counter())
+        try:
+            run.result = agent.execute()
+        except Exception as exc:
+            run.error = exc
+            logger.error("[%s] execution failed: %s", agent.name, exc, exc_info=True)
+        run.duration = time.perf_counter() - run.started
+        return run
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def run(self) -> Dict[str, AgentRun]:
+        """Execute every agent and return runs keyed by agent name.
+
+        Agents whose dependencies failed are not executed; their run carries a
+        :class:`DependencyError` instead.
+        """
+        self._check_graph()
+        pending = {
+            name: set(self._dependencies(agent)) for name, agent in self.agents.items()
+        }
+        runs: Dict[str, AgentRun] = {}
+        running: Dict[Future, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name in [n for n, deps in pending.items() if not deps - runs.keys()]:
+                    deps = pending.pop(name)
+                    failed = [d for d in deps if not runs[d].ok]
+                    if failed:
+                        runs[name] = AgentRun(
+                            name=name,
+                            error=DependencyError(f"dependencies failed: {', '.join(sorted(failed))}"),
+                        )
+                        continue
+                    running[pool.submit(self._execute, self.agents[name])] = name
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    run = future.result()
+                    runs[running.pop(future)] = run
+                    logger.debug("[%s] finished in %.3f ms", run.name, run.duration * 1000)
+
+        return {name: runs[name] for name in self.agents}
+
+
+__all__ = ["AgentRun", "AgentScheduler", "DependencyError"]
@@ -1 +1,377 @@
-# Placeholder for analyze.py
+#!/usr/bin/env python3
+"""Time-series rollups over drift history.
+
+Every drift analysis is folded into per-minute, per-hour and per-day buckets
+for each truth-vector axis (count, sum, min, max and a fixed 100-bin
+histogram for percentiles) plus per-bucket event and alarm counts.  The
+rollups live in SQLite next to the drift logs, so range queries read at most
+a few thousand bucket rows instead of every ``drift_log_*.json`` file.
+
+Raw entries and fine-grained buckets are downsampled away by a retention
+policy (``RETENTION``); coarser buckets keep the history::
+
+    python src/analyze.py backfill             # import existing drift logs
+    python src/analyze.py trend --axis 2 --days 90
+    python src/analyze.py retention
+
+Attach :class:`DriftRollups` to a :class:`~core.drift_analysis_engine.DriftAnalysisEngine`
+to roll up each analysis as it lands.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+if __package__ in (None, ""):
+    # Allow ``python src/analyze.py`` to import sibling modules.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import codec
+
+DB_NAME = "drift_rollups.sqlite3"
+DB_PATH = os.path.join("data", "analysis_output", DB_NAME)
+LOGS_DIR = os.path.join("data", "analysis_output", "drift_logs")
+
+AXES = 4
+BINS = 100
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+DAY = 86400
+# Seconds to keep raw entries and each bucket resolution; ``None`` keeps forever
+RETENTION: Dict[str, Optional[int]] = {"raw": 7 * DAY, "minute": 30 * DAY, "hour": 400 * DAY, "day": None}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw (
+    ts INTEGER NOT NULL, alarm INTEGER NOT NULL,
+    v0 REAL, v1 REAL, v2 REAL, v3 REAL
+);
+CREATE INDEX IF NOT EXISTS raw_ts ON raw (ts);
+CREATE TABLE IF NOT EXISTS axis_rollup (
+    resolution TEXT NOT NULL, bucket INTEGER NOT NULL, axis INTEGER NOT NULL,
+    count INTEGER NOT NULL, sum REAL NOT NULL, min REAL NOT NULL, max REAL NOT NULL,
+    hist TEXT NOT NULL,
+    PRIMARY KEY (resolution, axis, bucket)
+);
+CREATE TABLE IF NOT EXISTS event_rollup (
+    resolution TEXT NOT NULL, bucket INTEGER NOT NULL,
+    events INTEGER NOT NULL, alarms INTEGER NOT NULL,
+    PRIMARY KEY (resolution, bucket)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS seen_logs (name TEXT PRIMARY KEY);
+"""
+
+
+def _epoch(timestamp: str) -> int:
+    dt = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _iso(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def log_name(timestamp: str) -> str:
+    """Return the drift log file name the engine writes for ``timestamp``."""
+    return f"drift_log_{timestamp}.json"
+
+
+def _bin(value: float) -> int:
+    return min(BINS - 1, max(0, int(value * BINS)))
+
+
+def hist_quantile(hist: List[int], q: float, lo: float, hi: float) -> float:
+    """Estimate quantile ``q`` from a 100-bin histogram over ``[0, 1]``."""
+    total = sum(hist)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for idx, n in enumerate(hist):
+        if n and seen + n >= rank:
+            value = (idx + (rank - seen) / n) / BINS
+            return min(hi, max(lo, value))
+        seen += n
+    return hi
+
+
+class _Acc:
+    """In-memory accumulator for one (resolution, axis, bucket)."""
+
+    __slots__ = ("count", "sum", "min", "max", "hist")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.hist = [0] * BINS
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.hist[_bin(value)] += 1
+
+
+class DriftRollups:
+    """Incrementally maintained drift rollups backed by SQLite."""
+
+    def __init__(self, path: str = DB_PATH) -> None:
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _merge(self, axis_accs: Dict[Tuple[str, int, int], _Acc], events: Dict[Tuple[str, int], List[int]]) -> None:
+        cur = self._conn.cursor()
+        for (resolution, axis, bucket), acc in axis_accs.items():
+            row = cur.execute(
+                "SELECT count, sum, min, max, hist FROM axis_rollup WHERE resolution=? AND axis=? AND bucket=?",
+                (resolution, axis, bucket),
+            ).fetchone()
+            if row is not None:
+                acc.count += row[0]
+                acc.sum += row[1]
+                acc.min = min(acc.min, row[2])
+                acc.max = max(acc.max, row[3])
+                acc.hist = [a + b for a, b in zip(acc.hist, json.loads(row[4]))]
+            cur.execute(
+                "INSERT OR REPLACE INTO axis_rollup VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (resolution, bucket, axis, acc.count, acc.sum, acc.min, acc.max, json.dumps(acc.hist)),
+            )
+        for (resolution, bucket), (n, alarms) in events.items():
+            cur.execute(
+                "INSERT INTO event_rollup VALUES (?, ?, ?, ?) ON CONFLICT (resolution, bucket) "
+                "DO UPDATE SET events = events + excluded.events, alarms = alarms + excluded.alarms",
+                (resolution, bucket, n, alarms),
+            )
+
+    @staticmethod
+    def _pick_resolution(start: int, end: int, now: Optional[int] = None) -> str:
+        span = end - start
+        if span <= 2 * DAY:
+            wanted = "minute"
+        elif span <= 90 * DAY:
+            wanted = "hour"
+        else:
+            wanted = "day"
+        # Never pick a resolution whose buckets at ``start`` retention has dropped
+        now = int(time.time()) if now is None else now
+        names = list(RESOLUTIONS)
+        for resolution in names[names.index(wanted):]:
+            keep = RETENTION.get(resolution)
+            if keep is None or start >= now - keep:
+                return resolution
+        return names[-1]
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+    def add_many(self, events: Iterable[Dict]) -> int:
+        """Fold drift log entries into the rollups in one transaction."""
+        axis_accs: Dict[Tuple[str, int, int], _Acc] = {}
+        counts: Dict[Tuple[str, int], List[int]] = {}
+        raw_rows = []
+        names = []
+        for event in events:
+            vector = event.get("vector")
+            if not vector or not event.get("timestamp"):
+                continue
+            names.append((log_name(event["timestamp"]),))
+            ts = _epoch(event["timestamp"])
+            alarm = 1 if event.get("alarm") else 0
+            values = [float(v) for v in vector[:AXES]]
+            raw_rows.append((ts, alarm, *values, *([None] * (AXES - len(values)))))
+            for resolution, width in RESOLUTIONS.items():
+                bucket = ts - ts % width
+                entry = counts.setdefault((resolution, bucket), [0, 0])
+                entry[0] += 1
+                entry[1] += alarm
+                for axis, value in enumerate(values):
+                    key = (resolution, axis, bucket)
+                    acc = axis_accs.get(key)
+                    if acc is None:
+                        acc = axis_accs[key] = _Acc()
+                    acc.add(value)
+        if not raw_rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO raw VALUES (?, ?, ?, ?, ?, ?)", raw_rows)
+            # So backfill skips the log files of analyses already rolled up live
+            self._conn.executemany("INSERT OR IGNORE INTO seen_logs VALUES (?)", names)
+            self._merge(axis_accs, counts)
+        return len(raw_rows)
+
+    def add(self, event: Dict) -> None:
+        """Fold a single drift log entry into the rollups."""
+        self.add_many([event])
+
+    def attach(self, engine) -> None:
+        """Roll up every analysis ``engine`` produces from now on."""
+        engine.subscribe(self.add)
+
+    def backfill(self, logs_dir: str = LOGS_DIR, batch: int = 1000) -> int:
+        """Import drift log files not seen by a previous backfill or :meth:`add`."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key='backfill_last'").fetchone()
+        last = row[0] if row else ""
+        seen = {n for (n,) in self._conn.execute("SELECT name FROM seen_logs WHERE name > ?", (last,))}
+        try:
+            names = sorted(n for n in os.listdir(logs_dir) if n.endswith(".json") and n > last and n not in seen)
+        except FileNotFoundError:
+            return 0
+        imported = 0
+        for start in range(0, len(names), batch):
+            chunk = names[start:start + batch]
+            events = []
+            for name in chunk:
+                try:
+                    events.append(codec.read_json(os.path.join(logs_dir, name)))
+                except (OSError, ValueError):
+                    continue
+            imported += self.add_many(events)
+            with self._lock, self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('backfill_last', ?)", (chunk[-1],))
+                # Names up to the watermark are never considered again
+                self._conn.execute("DELETE FROM seen_logs WHERE name <= ?", (chunk[-1],))
+        return imported
+
+    def apply_retention(self, now: Optional[int] = None) -> Dict[str, int]:
+        """Delete raw entries and buckets older than ``RETENTION`` allows."""
+        now = int(time.time()) if now is None else now
+        deleted: Dict[str, int] = {}
+        with self._lock, self._conn:
+            for name, keep in RETENTION.items():
+                if keep is None:
+                    continue
+                cutoff = now - keep
+                if name == "raw":
+                    deleted[name] = self._conn.execute("DELETE FROM raw WHERE ts < ?", (cutoff,)).rowcount
+                    continue
+                deleted[name] = self._conn.execute(
+                    "DELETE FROM axis_rollup WHERE resolution=? AND bucket < ?", (name, cutoff)
+                ).rowcount
+                self._conn.execute("DELETE FROM event_rollup WHERE resolution=? AND bucket < ?", (name, cutoff))
+        return deleted
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def series(
+        self, axis: int, start: int, end: int, resolution: Optional[str] = None
+    ) -> List[Dict]:
+        """Return one point per bucket for ``axis`` in ``[start, end)``.
+
+        ``resolution`` defaults to the finest one that keeps the answer
+        small: minutes up to two days, hours up to 90 days, then days.  A
+        coarser one is used when ``RETENTION`` has already dropped those
+        buckets at ``start``.
+        """
+        resolution = resolution or self._pick_resolution(start, end)
+        width = RESOLUTIONS[resolution]
+        rows = self._conn.execute(
+            "SELECT bucket, count, sum, min, max, hist FROM axis_rollup "
+            "WHERE resolution=? AND axis=? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+            (resolution, axis, start - start % width, end),
+        ).fetchall()
+        points = []
+        for bucket, n, total, lo, hi, hist_text in rows:
+            hist = json.loads(hist_text)
+            points.append({
+                "bucket": _iso(bucket),
+                "count": n,
+                "mean": total / n,
+                "min": lo,
+                "max": hi,
+                "p50": hist_quantile(hist, 0.50, lo, hi),
+                "p90": hist_quantile(hist, 0.90, lo, hi),
+                "p99": hist_quantile(hist, 0.99, lo, hi),
+            })
+        return points
+
+    def summary(self, axis: int, start: int, end: int, resolution: Optional[str] = None) -> Dict:
+        """Merge every bucket of ``axis`` in ``[start, end)`` into one aggregate."""
+        resolution = resolution or self._pick_resolution(start, end)
+        width = RESOLUTIONS[resolution]
+        n, total, lo, hi = 0, 0.0, float("inf"), float("-inf")
+        hist = [0] * BINS
+        for b_n, b_sum, b_lo, b_hi, b_hist in self._conn.execute(
+            "SELECT count, sum, min, max, hist FROM axis_rollup "
+            "WHERE resolution=? AND axis=? AND bucket >= ? AND bucket < ?",
+            (resolution, axis, start - start % width, end),
+        ):
+            n += b_n
+            total += b_sum
+            lo, hi = min(lo, b_lo), max(hi, b_hi)
+            hist = [a + b for a, b in zip(hist, json.loads(b_hist))]
+        if not n:
+            return {"count": 0}
+        return {
+            "count": n,
+            "mean": total / n,
+            "min": lo,
+            "max": hi,
+            "p50": hist_quantile(hist, 0.50, lo, hi),
+            "p90": hist_quantile(hist, 0.90, lo, hi),
+            "p99": hist_quantile(hist, 0.99, lo, hi),
+        }
+
+    def alarms(self, start: int, end: int, resolution: Optional[str] = None) -> List[Dict]:
+        """Return event and alarm counts per bucket in ``[start, end)``."""
+        resolution = resolution or self._pick_resolution(start, end)
+        width = RESOLUTIONS[resolution]
+        rows = self._conn.execute(
+            "SELECT bucket, events, alarms FROM event_rollup "
+            "WHERE resolution=? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+            (resolution, start - start % width, end),
+        )
+        return [{"bucket": _iso(b), "events": e, "alarms": a, "alarm_rate": a / e} for b, e, a in rows]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Drift history rollups")
+    parser.add_argument("--db", default=DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    backfill_p = sub.add_parser("backfill", help="import drift log files into the rollups")
+    backfill_p.add_argument("--logs-dir", default=LOGS_DIR)
+    trend_p = sub.add_parser("trend", help="print an axis trend")
+    trend_p.add_argument("--axis", type=int, default=0, choices=range(AXES))
+    trend_p.add_argument("--days", type=float, default=7)
+    trend_p.add_argument("--resolution", choices=sorted(RESOLUTIONS))
+    sub.add_parser("retention", help="apply the retention policy")
+    args = parser.parse_args(argv)
+
+    rollups = DriftRollups(args.db)
+    if args.command == "backfill":
+        print(json.dumps({"imported": rollups.backfill(args.logs_dir)}))
+    elif args.command == "trend":
+        end = int(time.time())
+        start = end - int(args.days * DAY)
+        print(json.dumps({
+            "summary": rollups.summary(args.axis, start, end, args.resolution),
+            "series": rollups.series(args.axis, start, end, args.resolution),
+        }, indent=2))
+    else:
+        print(json.dumps(rollups.apply_retention()))
+
+
+if __name__ == "__main__":
+    main()
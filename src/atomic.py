@@ -0,0 +1,66 @@
+"""
+Module: atomic – Crash-safe file replacement.
+
+Readers of a path written through these helpers see either the previous
+content or the complete new content, never a partial write: data goes to a
+hidden temporary file in the same directory, is flushed to disk and then
+renamed over the target with :func:`os.replace`.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, IO
+
+
+def _temp_path(path: str) -> str:
+    directory, name = os.path.split(path)
+    # Unique per writer, and hidden so directory scans skip it
+    return os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _fsync_dir(directory: str) -> None:
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:  # pragma: no cover - e.g. Windows cannot open directories
+        return
+    try:
+        os.fsync(fd)
+    except OSError:  # pragma: no cover - some filesystems refuse directory fsync
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = "w", encoding: str = "utf-8", fsync: bool = True) -> Iterator[IO]:
+    """Open a temporary file that replaces ``path`` when the block succeeds.
+
+    If the block raises, the temporary file is removed and ``path`` is left
+    untouched.  With ``fsync`` the data (and the rename) are flushed to disk
+    before returning, so the new content also survives a power loss.
+    """
+    if mode not in ("w", "wb"):
+        raise ValueError("atomic_open only supports 'w' and 'wb'")
+    tmp = _temp_path(path)
+    f = open(tmp, mode, encoding=None if "b" in mode else encoding)
+    try:
+        with f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if fsync:
+        _fsync_dir(os.path.dirname(path))
+
+
+def atomic_write(path: str, data: Any, fsync: bool = True) -> None:
+    """Atomically replace ``path`` with ``data`` (``str`` or ``bytes``)."""
+    with atomic_open(path, "wb" if isinstance(data, (bytes, bytearray)) else "w", fsync=fsync) as f:
+        f.write(data)
+
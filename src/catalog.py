@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""Embedded SQLite catalog of ingested reports.
+
+Ingest writes one JSON record per report to ``data/analysis_output/``; the
+catalog keeps one row per record so reports can be found by metadata or
+ingest time without opening every file::
+
+    with Catalog() as catalog:
+        catalog.find(author="Alice Example", since="2025-05-01T00:00:00Z")
+
+Rows hold the content hash, ingest timestamp, the common metadata fields
+(``title``, ``author``, ``date``, each indexed), the full metadata as JSON,
+the output path and the archive location.  The database runs in WAL mode so
+readers never block the ingest writer, and :meth:`Catalog.add` buffers rows
+and inserts them in batches.
+
+Rebuild the catalog from the output files (parsed in parallel) with::
+
+    python src/catalog.py rebuild
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+if __package__ in (None, ""):
+    # Allow ``python src/catalog.py`` to import sibling modules.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import codec
+
+CATALOG_NAME = "catalog.sqlite3"
+CATALOG_PATH = os.path.join("data", "analysis_output", CATALOG_NAME)
+INDEXED_FIELDS = ("title", "author", "date")
+DEFAULT_BATCH_SIZE = 500
+
+_COLUMNS = ("output_path", "name", "sha256", "ingest_timestamp", *INDEXED_FIELDS, "metadata", "archive_location")
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS reports (
+    output_path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    ingest_timestamp TEXT NOT NULL,
+    {", ".join(f"{name} TEXT" for name in INDEXED_FIELDS)},
+    metadata TEXT NOT NULL,
+    archive_location TEXT
+);
+CREATE INDEX IF NOT EXISTS reports_sha256 ON reports (sha256);
+CREATE INDEX IF NOT EXISTS reports_ingest_timestamp ON reports (ingest_timestamp);
+{"".join(f"CREATE INDEX IF NOT EXISTS reports_{name} ON reports ({name}, ingest_timestamp);" for name in INDEXED_FIELDS)}
+"""
+_INSERT = f"INSERT OR REPLACE INTO reports ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+
+def catalog_row(record: Dict, output_path: str, archive_location: Optional[str] = None) -> Tuple:
+    """Return the catalog row for an ingest ``record`` written to ``output_path``."""
+    metadata = record.get("metadata") if isinstance(record.get("metadata"), dict) else {}
+    fields = [None if metadata.get(name) is None else str(metadata[name]) for name in INDEXED_FIELDS]
+    name = os.path.splitext(os.path.basename(output_path))[0]
+    return (
+        output_path,
+        name,
+        record["sha256"],
+        record["ingest_timestamp"],
+        *fields,
+        codec.dumps(metadata, sort_keys=True, default=str).decode("utf-8"),
+        archive_location,
+    )
+
+
+def _read_rows(paths: List[str]) -> List[Tuple]:
+    """Parse a chunk of output files; runs in a worker process during rebuilds."""
+    rows = []
+    for path in paths:
+        try:
+            record = codec.read_json(path)
+        except (OSError, ValueError):
+            continue
+        # Drift reports and other JSON files share the output directory
+        if isinstance(record, dict) and "sha256" in record and "ingest_timestamp" in record:
+            rows.append(catalog_row(record, path))
+    return rows
+
+
+class Catalog:
+    """SQLite index of ingest records; safe to share between threads."""
+
+    def __init__(self, path: str = CATALOG_PATH, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._pending: List[Tuple] = []
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "Catalog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def add(
+        self,
+        record: Dict,
+        output_path: str,
+        archive_location: Optional[str] = None,
+        on_commit: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Queue ``record`` for insertion; rows are written in batches.
+
+        ``on_commit`` is called once the row's batch has been committed.
+        """
+        row = catalog_row(record, output_path, archive_location)
+        with self._lock:
+            self._pending.append(row)
+            if on_commit is not None:
+                self._callbacks.append(on_commit)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self) -> int:
+        """Write every queued row; return how many were written."""
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> int:
+        rows, self._pending = self._pending, []
+        callbacks, self._callbacks = self._callbacks, []
+        if rows:
+            with self._conn:
+                self._conn.executemany(_INSERT, rows)
+        for callback in callbacks:
+            callback()
+        return len(rows)
+
+    def rebuild(self, output_dir: str, workers: Optional[int] = None, chunk_size: int = 200) -> int:
+        """Replace the catalog with rows parsed from ``output_dir``.
+
+        Files are parsed in ``workers`` processes.  Archive locations cannot
+        be recovered from output files, so those already in the catalog are
+        carried over.
+        """
+        paths = sorted(
+            os.path.join(output_dir, name) for name in os.listdir(output_dir) if name.endswith(".json")
+        )
+        chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                parsed = list(pool.map(_read_rows, chunks))
+        else:
+            parsed = [_read_rows(chunk) for chunk in chunks]
+
+        with self._lock:
+            self._flush_locked()
+            archived = dict(self._conn.execute("SELECT output_path, archive_location FROM reports"))
+            location = _COLUMNS.index("archive_location")
+            with self._conn:
+                self._conn.execute("DELETE FROM reports")
+                total = 0
+                for rows in parsed:
+                    rows = [row[:location] + (archived.get(row[0]),) for row in rows]
+                    self._conn.executemany(_INSERT, rows)
+                    total += len(rows)
+        return total
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+    def find(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        sha256: Optional[str] = None,
+        limit: Optional[int] = None,
+        **fields: str,
+    ) -> List[Dict]:
+        """Return catalog rows matching every given filter, oldest first.
+
+        ``fields`` filter on the indexed metadata keys (``title``,
+        ``author``, ``date``); ``since``/``until`` bound the ingest
+        timestamp (inclusive/exclusive).
+        """
+        unknown = set(fields) - set(INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"cannot filter on {sorted(unknown)}; indexed fields are {INDEXED_FIELDS}")
+        clauses, params = [], []
+        for name, value in fields.items():
+            clauses.append(f"{name} = ?")
+            params.append(value)
+        if sha256 is not None:
+            clauses.append("sha256 = ?")
+            params.append(sha256)
+        if since is not None:
+            clauses.append("ingest_timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ingest_timestamp < ?")
+            params.append(until)
+        sql = "SELECT * FROM reports"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ingest_timestamp, output_path"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        self.flush()
+        return [self._to_dict(row) for row in self._conn.execute(sql, params)]
+
+    def get(self, output_path: str) -> Optional[Dict]:
+        """Return the row for ``output_path``, if catalogued."""
+        self.flush()
+        row = self._conn.execute("SELECT * FROM reports WHERE output_path = ?", (output_path,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        result = dict(row)
+        result["metadata"] = codec.loads(result["metadata"])
+        return result
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query or rebuild the report catalog")
+    parser.add_argument("--db", default=CATALOG_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild_p = sub.add_parser("rebuild", help="reconstruct the catalog from output files")
+    rebuild_p.add_argument("--output-dir", default=os.path.join("data", "analysis_output"))
+    rebuild_p.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    find_p = sub.add_parser("find", help="print matching catalog rows as JSON lines")
+    for name in INDEXED_FIELDS:
+        find_p.add_argument(f"--{name}")
+    find_p.add_argument("--sha256")
+    find_p.add_argument("--since", help="earliest ingest timestamp (inclusive)")
+    find_p.add_argument("--until", help="latest ingest timestamp (exclusive)")
+    find_p.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+
+    with Catalog(args.db) as catalog:
+        if args.command == "rebuild":
+            print(json.dumps({"catalogued": catalog.rebuild(args.output_dir, args.workers)}))
+            return 0
+        fields = {name: getattr(args, name) for name in INDEXED_FIELDS if getattr(args, name) is not None}
+        for row in catalog.find(args.since, args.until, args.sha256, args.limit, **fields):
+            print(json.dumps(row, ensure_ascii=False, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""Packed, deduplicated chronicle archive for original reports.
+
+Instead of moving every original into ``data/chronicle/archive/`` as a loose
+file, :class:`ChronicleArchive` appends it to a compressed segment file::
+
+    data/chronicle/archive/
+        index.jsonl                 one JSON line per archived original
+        segments/seg-00000001.gz    independent gzip members, back to back
+        segments/seg-00000002.zst   (zstd frames when ``codec="zstd"``)
+
+Each original is compressed on its own, so an index entry
+``{"name", "sha256", "segment", "offset", "length", ...}`` is enough to
+seek to it and decompress it without touching the rest of the segment.
+Originals whose content hash is already archived only add an index line that
+points at the existing blob.  Appends are serialised across processes with a
+:class:`~src.locking.FileLock`.
+
+Migrate an existing loose archive with::
+
+    python src/chronicle_archive.py migrate data/chronicle/archive
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+if __package__ in (None, ""):
+    # Allow ``python src/chronicle_archive.py`` to import sibling modules.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.locking import FileLock
+
+try:  # Optional, faster codec
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+INDEX_NAME = "index.jsonl"
+SEGMENTS_DIR = "segments"
+LOCK_NAME = ".archive.lock"
+DEFAULT_SEGMENT_BYTES = 256 * 1024 * 1024
+
+_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+class ArchiveError(Exception):
+    """Raised when an archived original is missing or corrupt."""
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    # mtime=0 keeps identical inputs byte-identical
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _decompress(codec: str, blob: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise ArchiveError("zstandard is required to read zstd segments")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+
+class ChronicleArchive:
+    """Append-only archive of originals packed into compressed segments."""
+
+    def __init__(
+        self,
+        root: str = os.path.join("data", "chronicle", "archive"),
+        codec: str = "gzip",
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+    ) -> None:
+        if codec not in _EXTENSIONS:
+            raise ValueError(f"unknown codec {codec!r}; expected one of {sorted(_EXTENSIONS)}")
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("codec 'zstd' requires the zstandard package")
+        self.root = root
+        self.codec = codec
+        self.segment_bytes = segment_bytes
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self.segments_dir = os.path.join(root, SEGMENTS_DIR)
+        os.makedirs(self.segments_dir, exist_ok=True)
+        self._lock = FileLock(os.path.join(root, LOCK_NAME))
+
+        self._entries: List[Dict] = []
+        self._by_name: Dict[str, List[Dict]] = {}
+        self._by_hash: Dict[str, Dict] = {}
+        self._index_offset = 0
+        self._refresh()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _add_entry(self, entry: Dict) -> None:
+        self._entries.append(entry)
+        self._by_name.setdefault(entry["name"], []).append(entry)
+        self._by_hash.setdefault(entry["sha256"], entry)
+
+    def _refresh(self) -> None:
+        """Load index lines appended since the last read (by any process)."""
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(self._index_offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # a writer is mid-line; pick it up next time
+                    self._index_offset += len(line)
+                    if line.strip():
+                        self._add_entry(json.loads(line))
+        except FileNotFoundError:
+            pass
+
+    def _segment_path(self, segment: str) -> str:
+        return os.path.join(self.segments_dir, segment)
+
+    def _current_segment(self) -> str:
+        ext = _EXTENSIONS[self.codec]
+        for entry in reversed(self._entries):
+            if entry.get("deduplicated_from"):
+                continue
+            segment = entry["segment"]
+            if segment.endswith(ext) and os.path.getsize(self._segment_path(segment)) < self.segment_bytes:
+                return segment
+            number = int(segment.split("-")[1].split(".")[0]) + 1
+            return f"seg-{number:08d}{ext}"
+        return f"seg-{1:08d}{ext}"
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def entries(self) -> Iterator[Dict]:
+        """Yield every index entry in archive order."""
+        self._refresh()
+        return iter(list(self._entries))
+
+    def lookup(self, name: Optional[str] = None, sha256: Optional[str] = None) -> Optional[Dict]:
+        """Return the latest entry for ``name`` or the entry for ``sha256``."""
+        self._refresh()
+        if sha256 is not None:
+            return self._by_hash.get(sha256)
+        versions = self._by_name.get(name or "")
+        return versions[-1] if versions else None
+
+    def put(self, name: str, data: bytes, archived_at: Optional[str] = None) -> Dict:
+        """Archive ``data`` under ``name`` and return its index entry."""
+        digest = hashlib.sha256(data).hexdigest()
+        archived_at = archived_at or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock:
+            self._refresh()
+            existing = self._by_hash.get(digest)
+            if existing is not None:
+                entry = dict(existing, name=name, archived_at=archived_at, deduplicated_from=existing["name"])
+            else:
+                blob = _compress(self.codec, data)
+                segment = self._current_segment()
+                with open(self._segment_path(segment), "ab") as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    f.write(blob)
+                    f.flush()
+                    os.fsync(f.fileno())
+                entry = {
+                    "name": name,
+                    "sha256": digest,
+                    "segment": segment,
+                    "offset": offset,
+                    "length": len(blob),
+                    "size": len(data),
+                    "codec": self.codec,
+                    "archived_at": archived_at,
+                }
+            line = (json.dumps(entry, sort_keys=True) + "\n").encode("utf-8")
+            with open(self.index_path, "ab") as f:
+                if f.seek(0, os.SEEK_END) > self._index_offset:
+                    # Everything complete was read above, so this is the torn
+                    # line of a writer that died; cut it or ours is glued on
+                    f.truncate(self._index_offset)
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._index_offset += len(line)
+            self._add_entry(entry)
+        return entry
+
+    def put_file(self, path: str, name: Optional[str] = None, archived_at: Optional[str] = None) -> Dict:
+        """Archive the file at ``path`` and remove it once it is durable."""
+        with open(path, "rb") as f:
+            data = f.read()
+        entry = self.put(name or os.path.basename(path), data, archived_at)
+        os.remove(path)
+        return entry
+
+    def read(self, entry: Dict) -> bytes:
+        """Return the original bytes for an index ``entry``."""
+        with open(self._segment_path(entry["segment"]), "rb") as f:
+            f.seek(entry["offset"])
+            blob = f.read(entry["length"])
+        data = _decompress(entry.get("codec", "gzip"), blob)
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise ArchiveError(f"checksum mismatch for {entry['name']} in {entry['segment']}")
+        return data
+
+    def get(self, name: Optional[str] = None, sha256: Optional[str] = None) -> bytes:
+        """Return the archived original by file ``name`` (latest) or content hash."""
+        entry = self.lookup(name, sha256)
+        if entry is None:
+            raise KeyError(name if sha256 is None else sha256)
+        return self.read(entry)
+
+    def verify(self) -> List[str]:
+        """Re-read every stored blob; return the names that fail to verify."""
+        bad = []
+        for entry in self.entries():
+            if entry.get("deduplicated_from"):
+                continue
+            try:
+                self.read(entry)
+            except Exception:
+                bad.append(entry["name"])
+        return bad
+
+
+def migrate_loose(archive_dir: str, archive: Optional[ChronicleArchive] = None) -> Dict[str, int]:
+    """Pack the loose files in ``archive_dir`` into a :class:`ChronicleArchive`.
+
+    Files are archived under their current names (collision suffixes
+    included) in modification-time order and removed once written.  Safe to
+    rerun after an interruption.
+    """
+    archive = archive or ChronicleArchive(archive_dir)
+    skip = {INDEX_NAME, LOCK_NAME, SEGMENTS_DIR}
+    paths = [
+        os.path.join(archive_dir, name)
+        for name in os.listdir(archive_dir)
+        if name not in skip and os.path.isfile(os.path.join(archive_dir, name))
+    ]
+    paths.sort(key=os.path.getmtime)
+    stats = {"migrated": 0, "deduplicated": 0, "bytes": 0}
+    for path in paths:
+        mtime = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        entry = archive.put_file(path, archived_at=mtime)
+        stats["migrated"] += 1
+        stats["bytes"] += entry["size"]
+        if entry.get("deduplicated_from"):
+            stats["deduplicated"] += 1
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the packed chronicle archive")
+    parser.add_argument("--codec", choices=sorted(_EXTENSIONS), default="gzip")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate_p = sub.add_parser("migrate", help="pack loose archived files into segments")
+    migrate_p.add_argument("archive_dir", nargs="?", default=os.path.join("data", "chronicle", "archive"))
+    get_p = sub.add_parser("get", help="write an archived original to stdout")
+    get_p.add_argument("name")
+    get_p.add_argument("--archive-dir", default=os.path.join("data", "chronicle", "archive"))
+    list_p = sub.add_parser("list", help="list index entries")
+    list_p.add_argument("--archive-dir", default=os.path.join("data", "chronicle", "archive"))
+    verify_p = sub.add_parser("verify", help="check every stored blob against its hash")
+    verify_p.add_argument("--archive-dir", default=os.path.join("data", "chronicle", "archive"))
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        print(json.dumps(migrate_loose(args.archive_dir, ChronicleArchive(args.archive_dir, args.codec))))
+        return 0
+    archive = ChronicleArchive(args.archive_dir, args.codec)
+    if args.command == "get":
+        sys.stdout.buffer.write(archive.get(args.name))
+    elif args.command == "list":
+        for entry in archive.entries():
+            print(json.dumps(entry, sort_keys=True))
+    else:
+        bad = archive.verify()
+        for name in bad:
+            print(f"corrupt: {name}")
+        return 1 if bad else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
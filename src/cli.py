@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Unified ``codex18`` command line.
+
+Every tool in the repository is reachable as a subcommand::
+
+    python -m src.cli ingest
+    python -m src.cli handshake
+    python -m src.cli rotate-anchor --vector "[0.9, 0.9, 0.9, 0.9]"
+
+Only this module is imported at startup.  The target of a subcommand is
+imported when it is dispatched, so cron jobs and hooks pay for the modules
+they actually run and nothing else.  Arguments after the subcommand are
+passed through to the tool unchanged.
+"""
+
+import importlib
+import os
+import sys
+from typing import List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (target, help).  Targets are ``module:function`` or a script path
+# relative to the repository root.
+COMMANDS = {
+    "ingest": ("src.ingest:main", "ingest reports from data/reports_incoming"),
+    "pipeline": ("src.main:main", "run the streaming ingest/drift/braid pipeline"),
+    "handshake": ("src.codex16_validator:main", "verify the Codex16 handshake"),
+    "loopstate": ("src.loopstate_tracker:main", "track drift loop state from the drift logs"),
+    "rotate-anchor": ("scripts/rotate_anchor.py", "rotate the drift analysis anchor"),
+    "agents": ("core:main", "run the core agents through the scheduler"),
+    "gateway": ("src.gateway:main", "serve the VAULTIS HTTP gateway"),
+    "brief": ("src.output_formatter:main", "render a brief from the analysis outputs"),
+    "archive": ("src.chronicle_archive:main", "manage the packed chronicle archive"),
+    "catalog": ("src.catalog:main", "query or rebuild the SQLite report catalog"),
+    "trends": ("src.analyze:main", "backfill and query drift history rollups"),
+    "backtest": ("core.drift_backtest:main", "backtest drift thresholds and anchor policies over history"),
+    "vectors": ("src.vector_index:main", "find past truth vectors similar to a given one"),
+    "dupes": ("src.near_duplicate:main", "inspect near-duplicate report clusters"),
+    "profile": ("src.profiling:main", "profile another script"),
+    "bench": ("benchmarks.run:main", "run or compare the benchmark suite"),
+}
+
+
+def usage() -> str:
+    width = max(len(name) for name in COMMANDS)
+    lines = ["usage: codex18 <command> [args...]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {help_text}" for name, (_, help_text) in COMMANDS.items()]
+    lines += ["", "Run 'codex18 <command> --help' for the options of a command."]
+    return "\n".join(lines)
+
+
+def run(command: str, args: List[str]) -> int:
+    """Import and run ``command`` with ``args`` as its command line."""
+    target = COMMANDS[command][0]
+    saved_argv = sys.argv
+    sys.argv = [f"codex18 {command}"] + list(args)
+    try:
+        if ":" in target:
+            module_name, func_name = target.split(":")
+            result = getattr(importlib.import_module(module_name), func_name)()
+        else:
+            import runpy
+
+            runpy.run_path(os.path.join(ROOT, target), run_name="__main__")
+            result = 0
+    finally:
+        sys.argv = saved_argv
+    return result if isinstance(result, int) else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"codex18: unknown command {command!r}\n\n{usage()}", file=sys.stderr)
+        return 2
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    return run(command, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Module: codec – Shared JSON encoding with optional fast backends.
+
+Ingest records, drift logs and the Memory Braid history are all JSON, and
+encoding and decoding them is a large share of every hot path.  This module
+uses `orjson <https://github.com/ijl/orjson>`_ or `msgspec
+<https://jcristharif.com/msgspec/>`_ when one is installed and falls back to
+the standard library otherwise; ``CODEX_JSON=json|orjson|msgspec`` forces a
+backend.  Inputs the fast backends reject (integers beyond 64 bits, ``NaN``
+literals, ...) are retried with the standard library, so every backend
+accepts the same documents.  The fast encoders would silently write
+non-finite floats as ``null``; objects containing them are encoded by the
+standard library instead, which writes ``NaN``/``Infinity`` as it always has.
+
+:func:`canonical_bytes` is different: ledger hashes are SHA-256 digests of
+``json.dumps(node, sort_keys=True)``, so it always produces exactly those
+bytes, whatever the backend, and recorded ``truth_vector_hash`` values keep
+validating.
+"""
+
+import json
+import math
+import os
+from typing import Any, Callable, Optional
+
+try:  # Optional fast backends
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on environment
+    msgspec = None
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _pick_backend() -> str:
+    available = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+    wanted = os.environ.get("CODEX_JSON", "").strip().lower()
+    if available.get(wanted):
+        return wanted
+    return next(name for name in BACKENDS if available[name])
+
+
+BACKEND = _pick_backend()
+
+# json.dumps builds a new encoder for every call with non-default arguments
+_CANONICAL = json.JSONEncoder(sort_keys=True)
+
+
+def canonical_bytes(obj: Any) -> bytes:
+    """Return the bytes ledger hashes are computed over.
+
+    Identical to ``json.dumps(obj, sort_keys=True).encode("utf-8")``: ASCII
+    escapes and ``", "``/``": "`` separators, independent of the backend.
+    """
+    return _CANONICAL.encode(obj).encode("utf-8")
+
+
+def _has_non_finite(obj: Any) -> bool:
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+def _fast_output(data: bytes, obj: Any) -> Optional[bytes]:
+    # NaN and Infinity come out as null; only documents with a null need the walk
+    if b"null" in data and _has_non_finite(obj):
+        return None
+    return data
+
+
+def dumps(
+    obj: Any, *, indent: bool = False, sort_keys: bool = False, default: Optional[Callable[[Any], Any]] = None
+) -> bytes:
+    """Serialise ``obj`` to UTF-8 JSON bytes; non-ASCII text is written as is.
+
+    ``indent`` pretty-prints with two spaces.  ``default`` converts objects
+    JSON cannot represent, as for :func:`json.dumps`.
+    """
+    if BACKEND == "orjson":
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            data = _fast_output(orjson.dumps(obj, default=default, option=option), obj)
+            if data is not None:
+                return data
+        except orjson.JSONEncodeError:
+            pass
+    elif BACKEND == "msgspec":
+        try:
+            data = _fast_output(msgspec.json.encode(obj, enc_hook=default, order="sorted" if sort_keys else None), obj)
+            if data is not None:
+                return msgspec.json.format(data, indent=2) if indent else data
+        except (TypeError, ValueError, OverflowError, msgspec.EncodeError):
+            pass
+    return json.dumps(
+        obj, ensure_ascii=False, indent=2 if indent else None, sort_keys=sort_keys, default=default
+    ).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from ``bytes`` or ``str``.
+
+    Raises :class:`json.JSONDecodeError` (a :class:`ValueError`) for
+    malformed input, as the standard library does.
+    """
+    if BACKEND == "orjson":
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    elif BACKEND == "msgspec":
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError:
+            pass
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def read_json(path: str) -> Any:
+    """Return the parsed content of the JSON file at ``path``."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def write_json(path: str, obj: Any, *, indent: bool = False, sort_keys: bool = False) -> None:
+    """Write ``obj`` to ``path`` as JSON (not atomically; see :mod:`src.atomic`)."""
+    with open(path, "wb") as f:
+        f.write(dumps(obj, indent=indent, sort_keys=sort_keys))
@@ -3,6 +3,14 @@ import re
 import sys
 import logging
 import hashlib
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+if __package__ in (None, ""):
+    # Allow ``python src/codex16_validator.py`` to import sibling modules.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config_loader import loads as load_yaml
 
 HANDSHAKE_YAML = """
 activation_conditions:
@@ -24,13 +32,20 @@ EXPECTED_HASH = hashlib.sha256(HANDSHAKE_YAML.encode("utf-8")).hexdigest()
 # Strict audit mode triggers regex parsing and hash verification.
 AUDIT_MODE = os.getenv("CODEX_INTEGRITY_AUDIT", "false").lower() in ("1", "true", "yes")
 
+_COND_RE = re.compile(
+    r"activation_conditions:\s*\n((?:\s+[A-Za-z_]+\s*:\s*(?:true|false)\s*\n)+)"
+)
+_STACK_RE = re.compile(r"handshake_stack:\s*\n((?:\s*-\s*.*\n)+)")
+
+# Verification results keyed by (SHA-256 of the handshake text, audit flag).
+CACHE_SIZE = 256
+_VERIFY_CACHE: "OrderedDict[Tuple[str, bool], bool]" = OrderedDict()
+
 
 def _parse_handshake_yaml(yaml_text: str):
     """Parse handshake YAML using regex for symbolic fidelity."""
-    cond_pattern = r"activation_conditions:\s*\n((?:\s+[A-Za-z_]+\s*:\s*(?:true|false)\s*\n)+)"
-    stack_pattern = r"handshake_stack:\s*\n((?:\s*-\s*.*\n)+)"
-    cond_match = re.search(cond_pattern, yaml_text)
-    stack_match = re.search(stack_pattern, yaml_text)
+    cond_match = _COND_RE.search(yaml_text)
+    stack_match = _STACK_RE.search(yaml_text)
     if not cond_match or not stack_match:
         raise ValueError("Handshake YAML format error: missing required sections.")
 
@@ -49,31 +64,9 @@ def _parse_handshake_yaml(yaml_text: str):
     return conditions, handshake_list
 
 
-def verify_handshake(yaml_text: str = HANDSHAKE_YAML, audit: bool | None = None) -> bool:
-    """Validate the handshake YAML.
-
-    When *audit* is True, perform strict validation using the regex parser and
-    SHA-256 hash verification. By default the YAML is parsed with
-    ``yaml.safe_load`` for flexibility.
-    """
-    if audit is None:
-        audit = AUDIT_MODE
-
-    try:
-        import yaml
-    except Exception as exc:
-        if audit:
-            # Audit mode uses the regex parser and does not require PyYAML.
-            yaml = None
-            logging.warning(f"yaml module unavailable, continuing with regex parser: {exc}")
-        else:
-            # Default mode expects PyYAML; if unavailable fall back to regex parsing.
-            yaml = None
-            logging.warning(f"yaml module unavailable, falling back to regex parser: {exc}")
-
+def _verify_uncached(yaml_text: str, digest: str, audit: bool) -> bool:
     if audit:
-        actual_hash = hashlib.sha256(yaml_text.encode("utf-8")).hexdigest()
-        if actual_hash != EXPECTED_HASH:
+        if digest != EXPECTED_HASH:
             logging.critical("Handshake YAML hash mismatch! Possible tampering detected.")
             return False
         try:
@@ -82,18 +75,14 @@ def verify_handshake(yaml_text: str = HANDSHAKE_YAML, audit: bool | None = None)
             logging.critical(f"Handshake validation error: {exc}")
             return False
     else:
-        if yaml is not None:
-            try:
-                parsed = yaml.safe_load(yaml_text)
-            except Exception:
-                parsed = None
-            if isinstance(parsed, dict):
-                conditions = parsed.get("activation_conditions", {})
-                handshake_stack = parsed.get("handshake_stack", [])
-            else:
-                conditions, handshake_stack = _parse_handshake_yaml(yaml_text)
+        try:
+            parsed = load_yaml(yaml_text)
+        except Exception:
+            parsed = None
+        if isinstance(parsed, dict):
+            conditions = parsed.get("activation_conditions", {})
+            handshake_stack = parsed.get("handshake_stack", [])
         else:
-            # Fallback to regex parsing when PyYAML is unavailable.
             conditions, handshake_stack = _parse_handshake_yaml(yaml_text)
 
     for flag, value in conditions.items():
@@ -118,9 +107,58 @@ def verify_handshake(yaml_text: str = HANDSHAKE_YAML, audit: bool | None = None)
     return True
 
 
-def main() -> None:
+def verify_handshake(yaml_text: str = HANDSHAKE_YAML, audit: bool | None = None) -> bool:
+    """Validate the handshake YAML.
+
+    When *audit* is True, perform strict validation using the regex parser and
+    SHA-256 hash verification. By default the YAML is parsed with
+    :func:`src.config_loader.loads` for flexibility.
+
+    Results are cached by the SHA-256 digest of *yaml_text*, so repeated checks
+    of the same handshake cost a single hash computation.
+    """
+    if audit is None:
+        audit = AUDIT_MODE
+
+    digest = hashlib.sha256(yaml_text.encode("utf-8")).hexdigest()
+    key = (digest, audit)
+    cached = _VERIFY_CACHE.get(key)
+    if cached is not None:
+        _VERIFY_CACHE.move_to_end(key)
+        return cached
+
+    result = _verify_uncached(yaml_text, digest, audit)
+    _VERIFY_CACHE[key] = result
+    if len(_VERIFY_CACHE) > CACHE_SIZE:
+        _VERIFY_CACHE.popitem(last=False)
+    return result
+
+
+def verify_many(yaml_texts: Iterable[str], audit: bool | None = None) -> List[bool]:
+    """Validate several handshake documents, e.g. one per agent config.
+
+    Identical documents are verified once and served from the cache.
+    """
+    return [verify_handshake(text, audit=audit) for text in yaml_texts]
+
+
+def clear_cache() -> None:
+    """Drop all cached handshake verification results."""
+    _VERIFY_CACHE.clear()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Verify the Codex16 symbolic handshake")
+    parser.add_argument(
+        "--audit", action="store_true", default=None,
+        help="strict regex and hash validation (also CODEX_INTEGRITY_AUDIT=1)",
+    )
+    args = parser.parse_args(argv)
+
     logging.basicConfig(level=logging.INFO)
-    if verify_handshake():
+    if verify_handshake(audit=args.audit):
         logging.info("Loop Confirmed – Ready for Recursion")
     else:
         logging.critical("Symbolic gate failed. Execution halted.")
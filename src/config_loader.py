@@ -0,0 +1,401 @@
+"""Configuration loading for Codex18 YAML files.
+
+``load_config`` parses ``VAULTIS.yml``, ``launch.yaml``, ``config/*.yaml`` and
+similar files with the fastest parser available:
+
+* PyYAML's libyaml-backed ``CSafeLoader`` when compiled in,
+* PyYAML's pure-Python ``SafeLoader`` otherwise,
+* a built-in block parser when PyYAML is not installed at all.
+
+Parsed results are cached per ``(path, mtime, size)``; loading an unchanged
+file again returns the cached object without touching the parser.  Cached
+values are shared between callers and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_PARSER: Optional[Tuple[str, Callable[[str], Any]]] = None
+_CACHE: Dict[str, Tuple[int, int, Any]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+class ConfigError(ValueError):
+    """Raised when the built-in parser meets YAML it cannot represent."""
+
+
+# ----------------------------------------------------------------------
+# Parser selection
+# ----------------------------------------------------------------------
+def _select_parser() -> Tuple[str, Callable[[str], Any]]:
+    global _PARSER
+    if _PARSER is None:
+        try:
+            import yaml
+
+            loader = getattr(yaml, "CSafeLoader", None)
+            if loader is not None:
+                _PARSER = ("libyaml", lambda text: yaml.load(text, Loader=loader))
+            else:
+                _PARSER = ("pyyaml", yaml.safe_load)
+        except Exception:
+            _PARSER = ("builtin", _builtin_loads)
+    return _PARSER
+
+
+def parser_name() -> str:
+    """Return ``"libyaml"``, ``"pyyaml"`` or ``"builtin"``."""
+    return _select_parser()[0]
+
+
+# ----------------------------------------------------------------------
+# Built-in fallback parser
+# ----------------------------------------------------------------------
+_INT_RE = re.compile(r"[-+]?(0|[1-9][0-9_]*)$")
+_FLOAT_RE = re.compile(r"[-+]?(\.[0-9]+|[0-9][0-9_]*(\.[0-9_]*)?)([eE][-+]?[0-9]+)?$")
+_NULLS = {"", "~", "null", "Null", "NULL"}
+_TRUE = {"true", "True", "TRUE", "yes", "Yes", "YES", "on", "On", "ON"}
+_FALSE = {"false", "False", "FALSE", "no", "No", "NO", "off", "Off", "OFF"}
+
+
+def _strip_comment(text: str) -> str:
+    """Remove a trailing ``# comment`` that is not inside quotes."""
+    if "#" not in text:
+        return text.rstrip()
+    quote = ""
+    for idx, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = ""
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "#" and (idx == 0 or text[idx - 1] in " \t"):
+            return text[:idx].rstrip()
+    return text.rstrip()
+
+
+def _find_key_colon(text: str) -> int:
+    """Return the index of the mapping ``:`` in ``text`` or ``-1``."""
+    if text[:1] in "[{":
+        return -1
+    quote = ""
+    for idx, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = ""
+        elif ch in "\"'" and idx == 0:
+            quote = ch
+        elif ch == ":" and (idx + 1 == len(text) or text[idx + 1] in " \t"):
+            return idx
+    return -1
+
+
+def _plain_scalar(text: str) -> Any:
+    if text in _NULLS:
+        return None
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    if _INT_RE.match(text):
+        return int(text.replace("_", ""))
+    if _FLOAT_RE.match(text) and any(c.isdigit() for c in text):
+        return float(text.replace("_", ""))
+    lowered = text.lower()
+    if lowered in (".inf", "+.inf"):
+        return float("inf")
+    if lowered == "-.inf":
+        return float("-inf")
+    if lowered == ".nan":
+        return float("nan")
+    return text
+
+
+def _quoted_scalar(text: str) -> str:
+    if text[0] == '"':
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text[1:-1]
+    return text[1:-1].replace("''", "'")
+
+
+def _parse_flow(text: str, pos: int) -> Tuple[Any, int]:
+    """Parse a flow sequence/mapping or scalar starting at ``pos``."""
+    while pos < len(text) and text[pos] in " \t":
+        pos += 1
+    if pos >= len(text):
+        return None, pos
+    ch = text[pos]
+    if ch in "[{":
+        closing = "]" if ch == "[" else "}"
+        items: List[Any] = []
+        mapping: Dict[Any, Any] = {}
+        pos += 1
+        while True:
+            while pos < len(text) and text[pos] in " \t,":
+                pos += 1
+            if pos >= len(text):
+                raise ConfigError(f"unterminated flow collection: {text!r}")
+            if text[pos] == closing:
+                return (items if ch == "[" else mapping), pos + 1
+            value, pos = _parse_flow(text, pos)
+            while pos < len(text) and text[pos] in " \t":
+                pos += 1
+            if pos < len(text) and text[pos] == ":":
+                item_value, pos = _parse_flow(text, pos + 1)
+                if ch == "[":
+                    items.append({value: item_value})
+                else:
+                    mapping[value] = item_value
+            elif ch == "[":
+                items.append(value)
+            else:
+                mapping[value] = None
+    if ch in "\"'":
+        end = pos + 1
+        while end < len(text):
+            if text[end] == "\\" and ch == '"':
+                end += 2
+                continue
+            if text[end] == ch:
+                if ch == "'" and end + 1 < len(text) and text[end + 1] == "'":
+                    end += 2
+                    continue
+                break
+            end += 1
+        return _quoted_scalar(text[pos : end + 1]), end + 1
+    end = pos
+    while end < len(text) and text[end] not in ",]}":
+        if text[end] == ":" and (end + 1 == len(text) or text[end + 1] in " \t,]}"):
+            break
+        end += 1
+    return _plain_scalar(text[pos:end].strip()), end
+
+
+def _scalar(text: str) -> Any:
+    if not text:
+        return None
+    if text[0] in "[{":
+        value, pos = _parse_flow(text, 0)
+        if text[pos:].strip():
+            raise ConfigError(f"unexpected text after flow collection: {text!r}")
+        return value
+    if text[0] in "\"'" and len(text) > 1 and text[-1] == text[0]:
+        return _quoted_scalar(text)
+    return _plain_scalar(text)
+
+
+class _BlockParser:
+    """Single-pass recursive-descent parser for block-style YAML.
+
+    Lines are tokenised once into ``[indent, content]`` pairs and consumed
+    left to right, so nested structures never trigger look-ahead rescans.
+    Supports block mappings, sequences (including sequences of mappings),
+    flow collections, quoted and plain scalars, and ``|``/``>`` block scalars.
+    Timestamps are returned as strings.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.raw = text.splitlines()
+        self.final_newline = text.endswith("\n")
+        self.lines: List[Optional[List[Any]]] = []
+        for raw in self.raw:
+            stripped = raw.strip()
+            if not stripped or stripped.startswith("#"):
+                self.lines.append(None)
+                continue
+            if "\t" in raw[: len(raw) - len(raw.lstrip())]:
+                raise ConfigError("tabs are not allowed in YAML indentation")
+            indent = len(raw) - len(raw.lstrip(" "))
+            self.lines.append([indent, _strip_comment(raw[indent:])])
+        self.pos = 0
+
+    def _peek(self) -> Optional[List[Any]]:
+        while self.pos < len(self.lines):
+            line = self.lines[self.pos]
+            if line is not None:
+                if line[1] in ("---", "..."):
+                    self.pos += 1
+                    continue
+                return line
+            self.pos += 1
+        return None
+
+    @staticmethod
+    def _is_seq(content: str) -> bool:
+        return content == "-" or content.startswith("- ")
+
+    def parse(self) -> Any:
+        line = self._peek()
+        if line is None:
+            return None
+        value = self._block(line[0])
+        if self._peek() is not None:
+            raise ConfigError(f"unexpected content at line {self.pos + 1}")
+        return value
+
+    def _block(self, indent: int) -> Any:
+        line = self._peek()
+        if self._is_seq(line[1]):
+            return self._sequence(indent)
+        if _find_key_colon(line[1]) < 0:
+            self.pos += 1
+            return _scalar(line[1])
+        return self._mapping(indent)
+
+    def _mapping(self, indent: int) -> Dict[Any, Any]:
+        result: Dict[Any, Any] = {}
+        while True:
+            line = self._peek()
+            if line is None or line[0] < indent:
+                return result
+            if line[0] > indent:
+                raise ConfigError(f"bad indentation at line {self.pos + 1}")
+            content = line[1]
+            if self._is_seq(content):
+                return result
+            colon = _find_key_colon(content)
+            if colon < 0:
+                raise ConfigError(f"expected 'key: value' at line {self.pos + 1}")
+            key = _scalar(content[:colon].strip())
+            rest = content[colon + 1 :].strip()
+            self.pos += 1
+            if rest[:1] in ("|", ">"):
+                result[key] = self._block_scalar(indent, rest)
+            elif rest:
+                result[key] = _scalar(rest)
+            else:
+                nxt = self._peek()
+                if nxt is not None and nxt[0] > indent:
+                    result[key] = self._block(nxt[0])
+                elif nxt is not None and nxt[0] == indent and self._is_seq(nxt[1]):
+                    result[key] = self._sequence(indent)
+                else:
+                    result[key] = None
+
+    def _sequence(self, indent: int) -> List[Any]:
+        result: List[Any] = []
+        while True:
+            line = self._peek()
+            if line is None or line[0] != indent or not self._is_seq(line[1]):
+                if line is not None and line[0] > indent:
+                    raise ConfigError(f"bad indentation at line {self.pos + 1}")
+                return result
+            item = line[1][1:]
+            stripped = item.lstrip(" ")
+            if not stripped:
+                self.pos += 1
+                nxt = self._peek()
+                if nxt is not None and nxt[0] > indent:
+                    result.append(self._block(nxt[0]))
+                else:
+                    result.append(None)
+                continue
+            # Re-read the item as if it started its own (deeper) block.
+            line[0] = indent + 1 + len(item) - len(stripped)
+            line[1] = stripped
+            result.append(self._block(line[0]))
+
+    def _block_scalar(self, indent: int, header: str) -> str:
+        style = header[0]
+        chomp = "+" if "+" in header else "-" if "-" in header else ""
+        collected: List[str] = []
+        block_indent: Optional[int] = None
+        while self.pos < len(self.raw):
+            raw = self.raw[self.pos]
+            if raw.strip():
+                current = len(raw) - len(raw.lstrip(" "))
+                if current <= indent:
+                    break
+                if block_indent is None:
+                    block_indent = current
+                collected.append(raw[block_indent:])
+            else:
+                collected.append("")
+            self.pos += 1
+
+        trailing = 0
+        while collected and collected[-1] == "":
+            collected.pop()
+            trailing += 1
+
+        if style == "|":
+            body = "\n".join(collected)
+        else:
+            parts: List[str] = []
+            for idx, text in enumerate(collected):
+                if idx:
+                    prev = collected[idx - 1]
+                    if not text:
+                        parts.append("\n")
+                        continue
+                    if prev:
+                        # More-indented lines keep their line breaks
+                        indented = text.startswith(" ") or prev.startswith(" ")
+                        parts.append("\n" if indented else " ")
+                parts.append(text)
+            body = "".join(parts)
+
+        if not collected:
+            return ""
+        at_eof = self.pos >= len(self.raw) and not trailing
+        if chomp == "-" or (at_eof and not self.final_newline):
+            return body
+        if chomp == "+":
+            return body + "\n" * (trailing + 1)
+        return body + "\n"
+
+
+def _builtin_loads(text: str) -> Any:
+    stripped = text.strip()
+    if stripped[:1] in "[{":
+        try:
+            return json.loads(stripped)
+        except ValueError:
+            pass
+    return _BlockParser(text).parse()
+
+
+# ----------------------------------------------------------------------
+# Public API
+# ----------------------------------------------------------------------
+def loads(text: str) -> Any:
+    """Parse YAML ``text`` with the selected parser."""
+    return _select_parser()[1](text)
+
+
+def load_config(path: str) -> Any:
+    """Parse the YAML file at ``path``, reusing the cached result when unchanged.
+
+    Raises
+    ------
+    OSError
+        If the file cannot be read.
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with open(key, "r", encoding="utf-8") as f:
+        value = loads(f.read())
+    with _CACHE_LOCK:
+        _CACHE[key] = (stat.st_mtime_ns, stat.st_size, value)
+    return value
+
+
+def clear_cache() -> None:
+    """Forget every cached configuration."""
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+__all__ = ["ConfigError", "clear_cache", "load_config", "loads", "parser_name"]
@@ -1 +1,312 @@
-# Placeholder for ethics_monitor.py
+"""Protector ethics monitor for Codex18 releases.
+
+Every summarizer output and drift assessment is vetted against the rules in
+``config/ethics_policy.json`` before it is released.  Rules come in four
+types:
+
+``regex`` / ``keywords``
+    Text denylists.  All of them are compiled into a single alternation of
+    named groups, so each document is scanned in one pass regardless of how
+    many rules exist.  Keywords match whole words, case-insensitively, and
+    every keyword rule shares one trie-shaped group.  The alternation only
+    reports one rule per stretch of text, so the span of every match is
+    re-checked against each rule on its own; rules that match the same or
+    an overlapping span are reported too.  Patterns may not use group
+    references, which would point at the wrong group once combined.
+``field``
+    Constraints on named fields: ``required``, ``max_length`` and exact
+    ``length`` (for lists).
+``threshold``
+    Numeric ``min``/``max`` bounds on a field (every element for lists).
+
+Rule actions are ``block`` (withhold the output) or ``review`` (release it
+flagged).  Per-document cost is bounded: only the first ``max_scan_chars``
+characters of text are scanned.
+
+Usage::
+
+    monitor = EthicsMonitor()
+    verdict = monitor.evaluate(summary, kind="summary")
+    if not verdict.allowed:
+        ...
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .parse_metrics import count, timer
+
+POLICY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "ethics_policy.json"
+)
+DEFAULT_MAX_SCAN_CHARS = 50_000
+ACTIONS = ("review", "block")
+# Separates fields in the scanned text so no match spans two fields
+_FIELD_SEP = "\n\x00\n"
+# A numbered backreference or conditional group test, outside an escaped backslash
+_GROUP_REF = re.compile(r"(?<!\\)(?:\\\\)*(?:\\[1-9]|\(\?\(\d)")
+
+
+class PolicyError(ValueError):
+    """Raised when the ethics policy cannot be loaded or compiled."""
+
+
+@dataclass
+class Verdict:
+    """Outcome of vetting one document."""
+
+    action: str = "allow"
+    hits: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed: float = 0.0
+    truncated: bool = False
+
+    @property
+    def allowed(self) -> bool:
+        return self.action != "block"
+
+    @property
+    def needs_review(self) -> bool:
+        return self.action == "review"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"action": self.action, "hits": self.hits, "truncated": self.truncated}
+
+
+def _iter_strings(value: Any, path: str = "") -> Iterator[Tuple[str, str]]:
+    """Yield ``(field path, text)`` for every string inside ``value``."""
+    if isinstance(value, str):
+        yield path, value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _iter_strings(item, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, (list, tuple)):
+        for idx, item in enumerate(value):
+            yield from _iter_strings(item, f"{path}[{idx}]")
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Return a regex matching any of ``words`` with shared prefixes factored.
+
+    A trie-shaped alternation lets the regex engine reject a position after
+    one character instead of retrying every keyword there.
+    """
+    trie: Dict[str, Dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _lookup(doc: Dict, dotted: str) -> Tuple[bool, Any]:
+    current: Any = doc
+    for part in dotted.split("."):
+        if not isinstance(current, dict) or part not in current:
+            return False, None
+        current = current[part]
+    return True, current
+
+
+class EthicsMonitor:
+    """Evaluate documents against a compiled ethics policy."""
+
+    def __init__(self, policy: Optional[Dict] = None, policy_path: str = POLICY_PATH) -> None:
+        if policy is None:
+            try:
+                with open(policy_path, "r", encoding="utf-8") as f:
+                    policy = json.load(f)
+            except (OSError, ValueError) as exc:
+                raise PolicyError(f"cannot load ethics policy {policy_path}: {exc}") from exc
+        self.policy = policy
+        self.max_scan_chars = int(policy.get("max_scan_chars", DEFAULT_MAX_SCAN_CHARS))
+        self.rules: Dict[str, Dict] = {}
+        self.field_rules: List[Dict] = []
+        self.hit_counts: Counter = Counter()
+        self._groups: Dict[str, str] = {}
+        self._keywords: Dict[str, str] = {}
+        self._matcher: Optional[re.Pattern] = None
+        self._singles: Dict[str, re.Pattern] = {}
+        self._compile(policy.get("rules") or [])
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _compile(self, rules: Iterable[Dict]) -> None:
+        alternatives: List[str] = []
+        for rule in rules:
+            rule_id = rule.get("id")
+            if not rule_id or rule_id in self.rules:
+                raise PolicyError(f"rule ids must be present and unique: {rule_id!r}")
+            if rule.get("action", "block") not in ACTIONS:
+                raise PolicyError(f"rule {rule_id}: action must be one of {ACTIONS}")
+            rule = dict(rule, action=rule.get("action", "block"))
+            self.rules[rule_id] = rule
+            kind = rule.get("type")
+
+            if kind == "regex":
+                body = rule.get("pattern") or ""
+                try:
+                    compiled = re.compile(body)
+                except re.error as exc:
+                    raise PolicyError(f"rule {rule_id}: invalid pattern: {exc}") from exc
+                if not body:
+                    raise PolicyError(f"rule {rule_id}: nothing to match")
+                if compiled.groupindex:
+                    raise PolicyError(f"rule {rule_id}: named groups are not allowed in patterns")
+                if _GROUP_REF.search(body):
+                    raise PolicyError(f"rule {rule_id}: group references are not allowed in patterns")
+                if rule.get("case_sensitive"):
+                    body = f"(?-i:{body})"
+                group = f"r{len(self._groups)}"
+                self._groups[group] = rule_id
+                alternatives.append(f"(?P<{group}>{body})")
+                self._singles[group] = re.compile(body, re.IGNORECASE)
+            elif kind == "keywords":
+                words = [w.lower() for w in rule.get("keywords") or [] if w]
+                if not words:
+                    raise PolicyError(f"rule {rule_id}: nothing to match")
+                for word in words:
+                    # A keyword shared by several rules reports the strictest one
+                    owner = self._keywords.get(word)
+                    if owner is None or (self.rules[owner]["action"] != "block" and rule["action"] == "block"):
+                        self._keywords[word] = rule_id
+            elif kind in ("field", "threshold"):
+                self.field_rules.append(rule)
+            else:
+                raise PolicyError(f"rule {rule_id}: unknown type {kind!r}")
+
+        if self._keywords:
+            # Every keyword rule shares one trie-shaped group
+            keywords = r"\b" + _trie_pattern(self._keywords) + r"\b"
+            alternatives.insert(0, f"(?P<kw>{keywords})")
+            self._singles = dict(kw=re.compile(keywords, re.IGNORECASE), **self._singles)
+        if alternatives:
+            self._matcher = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def _scan(self, doc: Any, verdict: Verdict) -> None:
+        if self._matcher is None:
+            return
+        parts: List[str] = []
+        starts: List[int] = []
+        paths: List[str] = []
+        size = 0
+        for path, text in _iter_strings(doc):
+            if size >= self.max_scan_chars:
+                verdict.truncated = True
+                break
+            if size + len(text) > self.max_scan_chars:
+                text = text[: self.max_scan_chars - size]
+                verdict.truncated = True
+            starts.append(size)
+            paths.append(path)
+            parts.append(text)
+            size += len(text) + len(_FIELD_SEP)
+        blob = _FIELD_SEP.join(parts)
+
+        seen = set()
+
+        def report(group: str, match: re.Match) -> None:
+            rule_id = self._keywords[match.group().lower()] if group == "kw" else self._groups[group]
+            field_path = paths[bisect_right(starts, match.start()) - 1] if paths else ""
+            if (rule_id, field_path) not in seen:
+                seen.add((rule_id, field_path))
+                self._hit(verdict, rule_id, field=field_path, match=match.group()[:80])
+
+        for match in self._matcher.finditer(blob):
+            report(match.lastgroup, match)
+            # finditer resumes after the match, so a rule that matches at a
+            # position inside it (or at its start, behind an earlier
+            # alternative) is only found by trying each rule there
+            for pos in range(match.start(), max(match.end(), match.start() + 1)):
+                for group, pattern in self._singles.items():
+                    if pos == match.start() and group == match.lastgroup:
+                        continue
+                    other = pattern.match(blob, pos)
+                    if other is not None:
+                        report(group, other)
+
+    def _check_fields(self, doc: Dict, kind: Optional[str], verdict: Verdict) -> None:
+        for rule in self.field_rules:
+            applies = rule.get("applies_to")
+            if applies and applies != kind:
+                continue
+            if rule["type"] == "threshold":
+                present, value = _lookup(doc, rule["field"])
+                if not present:
+                    continue
+                values = value if isinstance(value, (list, tuple)) else [value]
+                for item in values:
+                    try:
+                        number = float(item)
+                    except (TypeError, ValueError):
+                        self._hit(verdict, rule["id"], field=rule["field"], reason="not a number")
+                        break
+                    if ("min" in rule and number < rule["min"]) or ("max" in rule and number > rule["max"]):
+                        self._hit(verdict, rule["id"], field=rule["field"], value=number)
+                        break
+                continue
+
+            for name in rule.get("fields") or [rule.get("field")]:
+                present, value = _lookup(doc, name)
+                if not present or value in (None, ""):
+                    if rule.get("required"):
+                        self._hit(verdict, rule["id"], field=name, reason="missing")
+                    continue
+                if "max_length" in rule and hasattr(value, "__len__") and len(value) > rule["max_length"]:
+                    self._hit(verdict, rule["id"], field=name, reason="too long")
+                elif "length" in rule and (not hasattr(value, "__len__") or len(value) != rule["length"]):
+                    self._hit(verdict, rule["id"], field=name, reason="wrong length")
+
+    def _hit(self, verdict: Verdict, rule_id: str, **details: Any) -> None:
+        action = self.rules[rule_id]["action"]
+        verdict.hits.append(dict(rule=rule_id, action=action, **details))
+        if action == "block" or verdict.action == "allow":
+            verdict.action = action
+        self.hit_counts[rule_id] += 1
+        count("codex_ethics_rule_hits_total", rule=rule_id)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def evaluate(self, doc: Any, kind: Optional[str] = None) -> Verdict:
+        """Vet ``doc`` (a dict or plain text) and return a :class:`Verdict`.
+
+        ``kind`` (``"summary"``, ``"drift"``, ...) selects the field and
+        threshold rules whose ``applies_to`` matches; text rules always apply.
+        """
+        start = time.perf_counter()
+        verdict = Verdict()
+        with timer("ethics_evaluate"):
+            self._scan(doc, verdict)
+            if isinstance(doc, dict):
+                self._check_fields(doc, kind, verdict)
+        verdict.elapsed = time.perf_counter() - start
+        return verdict
+
+    def evaluate_many(self, docs: Iterable[Any], kind: Optional[str] = None) -> List[Verdict]:
+        """Vet a batch of documents of the same ``kind``."""
+        return [self.evaluate(doc, kind) for doc in docs]
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit counts for every rule, including rules that never fired."""
+        return {rule_id: self.hit_counts.get(rule_id, 0) for rule_id in self.rules}
+
+
+__all__ = ["EthicsMonitor", "PolicyError", "Verdict", "POLICY_PATH"]
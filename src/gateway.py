@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""VAULTIS HTTP gateway for Codex18.
+
+Serves the address advertised as ``vaultis_gateway`` in ``VAULTIS.yml`` so
+tooling can submit reports, run drift analysis and query the Memory Braid
+without shelling out to scripts::
+
+    python src/gateway.py --workers 4
+
+Endpoints
+---------
+``POST /reports?filename=NAME[&ingest=true]``
+    Stream the request body into ``data/reports_incoming``; with
+    ``ingest=true`` the report is claimed and ingested immediately.  A
+    report of the same name still waiting there is answered with 409.
+``POST /drift/batch``
+    Analyze ``{"inputs": [{"quality_score": 0.8, "tags": [...]}, ...]}``.
+``GET /drift/similar?vector=0.9,0.4,0.7,0.8&k=5``
+    Past analyses with the nearest truth vectors.
+``POST /braid/nodes``
+    Integrate ``{"facts": {...}}`` into the braid as a new node.
+``GET /braid/nodes/{node_id}``, ``GET /braid/index/{index}``,
+``GET /braid/proof/{index}``, ``GET /braid/search?q=...``
+    Node lookup, inclusion proofs and keyword retrieval.
+``GET /metrics``, ``GET /health``
+    Prometheus metrics (of the worker that answers) and liveness.
+
+Each worker process builds the drift engine, braid and retriever once and
+shares them across requests.  Several workers may serve the same ``data/``
+directory: updates take a cross-process :class:`~src.locking.FileLock` and
+reload state written by other workers before touching it.  Braid reads
+never wait for that lock; they pick up only the nodes appended since the
+worker last looked.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+if __package__ in (None, ""):
+    # Allow ``python src/gateway.py`` to import sibling modules.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from src import ingest, parse_metrics
+from src.config_loader import load_config
+from src.locking import FileLock
+
+DEFAULT_GATEWAY = "http://localhost:8000"
+MAX_REPORT_BYTES = 256 * 1024 * 1024
+
+
+class DriftInput(BaseModel):
+    quality_score: float
+    tags: List[str] = []
+
+
+class DriftBatch(BaseModel):
+    inputs: List[DriftInput]
+
+
+class BraidFacts(BaseModel):
+    facts: Dict[str, Any]
+
+
+class GatewayState:
+    """Long-lived engines shared by every request of one worker process."""
+
+    def __init__(
+        self,
+        incoming_dir: str = ingest.INCOMING_DIR,
+        output_dir: str = ingest.OUTPUT_DIR,
+        archive_dir: str = ingest.ARCHIVE_DIR,
+        braid_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        from core.drift_analysis_engine import DriftAnalysisEngine
+        from src.analyze import DB_NAME, DriftRollups
+        from src.catalog import CATALOG_NAME, Catalog
+        from src.ingest_journal import JOURNAL_NAME, IngestJournal
+        from src.memory_ledger import MemoryBraid
+        from src.memory_retriever import MemoryRetriever
+        from src.near_duplicate import INDEX_NAME, NearDuplicateIndex
+        from src.vector_index import VectorIndex
+        from src.work_claim import WorkClaimer, default_worker_id
+
+        self.incoming_dir = incoming_dir
+        self.output_dir = output_dir
+        self.archive_dir = archive_dir
+        for path in (incoming_dir, output_dir, archive_dir):
+            os.makedirs(path, exist_ok=True)
+
+        # Unbatched: each request's report is queryable as soon as it returns
+        self.catalog = Catalog(os.path.join(output_dir, CATALOG_NAME), batch_size=1)
+        self.near_duplicates = NearDuplicateIndex(os.path.join(output_dir, INDEX_NAME))
+        # ingest=true claims the report like any other ingest worker, so a
+        # concurrent cron or ``ingest --claim`` run never processes it too
+        self.claimer = WorkClaimer(incoming_dir, worker_id=f"gateway-{default_worker_id()}")
+        self.journal = IngestJournal(
+            os.path.join(output_dir, f"{JOURNAL_NAME[:-6]}.{self.claimer.worker_id}.jsonl")
+        )
+        ingest.resume_journal(self.journal, incoming_dir, self.catalog)
+        self.engine = DriftAnalysisEngine()
+        self.vector_index = VectorIndex(os.path.join(output_dir, "truth_vectors.bin"))
+        self.vector_index.attach(self.engine)
+        self.rollups = DriftRollups(os.path.join(output_dir, DB_NAME))
+        self.rollups.attach(self.engine)
+        self.braid = MemoryBraid(**(braid_kwargs or {}))
+        self.retriever = MemoryRetriever(self.braid)
+        self.drift_lock = FileLock(os.path.join(os.path.dirname(self.engine.anchor_path), ".drift.lock"))
+        # Readers only need to be serialised against this worker's reloads
+        self.read_lock = threading.Lock()
+
+    def ingest_report(self, name: str) -> Optional[Dict]:
+        """Claim incoming report ``name`` and ingest it through the journal.
+
+        Returns ``None`` if another worker claimed it first.  Raises
+        :class:`RuntimeError` if ingestion fails; the report is then put
+        back for a later run.
+        """
+        path = self.claimer.claim(name)
+        if path is None:
+            return None
+        record = ingest.ingest_file(
+            path, self.output_dir, self.archive_dir, self.catalog, self.near_duplicates, self.journal
+        )
+        if record is None:
+            if os.path.exists(path):
+                self.claimer.release(path)
+            raise RuntimeError(f"ingestion of {name} failed")
+        return record
+
+    def close(self) -> None:
+        self.claimer.close()
+        # The catalog marks its reports done in the journal as it flushes
+        self.catalog.close()
+        self.journal.close()
+        self.near_duplicates.close()
+        self.rollups.close()
+
+    def braid_view(self):
+        """Pick up nodes other workers appended, then return the retriever."""
+        with self.read_lock:
+            if self.braid.reload():
+                self.retriever.refresh()
+        return self.retriever
+
+    def add_facts(self, facts: Dict[str, Any]) -> Dict[str, Any]:
+        # update() takes the braid's writer lock and catches up first
+        with self.read_lock:
+            self.braid.update(facts)
+            self.retriever.refresh()
+            node = self.braid.long_term[-1]
+        return {
+            "id": node["id"],
+            "index": len(self.braid.long_term) - 1,
+            "truth_vector_hash": node["truth_vector_hash"],
+        }
+
+    def analyze(self, batch: DriftBatch) -> List[Dict]:
+        results = []
+        with self.drift_lock:
+            self.engine.reload()
+            for item in batch.inputs:
+                vector, alarm = self.engine.analyze_input(item.quality_score, set(item.tags))
+                results.append({"vector": vector, "alarm": alarm})
+        return results
+
+
+def _safe_filename(filename: str) -> str:
+    name = os.path.basename(filename or "")
+    if not name or name.startswith(".") or name != filename:
+        raise HTTPException(status_code=400, detail="filename must be a plain, non-hidden file name")
+    return name
+
+
+def create_app(**state_kwargs: Any) -> FastAPI:
+    """Build the gateway app; ``state_kwargs`` are passed to :class:`GatewayState`."""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.codex = GatewayState(**state_kwargs)
+        yield
+        app.state.codex.close()
+
+    app = FastAPI(title="VAULTIS gateway", lifespan=lifespan)
+
+    @app.middleware("http")
+    async def record_latency(request: Request, call_next):
+        if not parse_metrics.enabled():
+            return await call_next(request)
+        start = time.perf_counter()
+        response = await call_next(request)
+        route = request.scope.get("route")
+        labels = {"stage": "gateway", "route": getattr(route, "path", "unmatched")}
+        parse_metrics.REGISTRY.histogram(parse_metrics.STAGE_SECONDS, labels).observe(time.perf_counter() - start)
+        return response
+
+    @app.get("/health")
+    def health() -> Dict[str, Any]:
+        return {"status": "ok", "pid": os.getpid()}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics() -> str:
+        return parse_metrics.REGISTRY.to_prometheus()
+
+    @app.post("/reports", status_code=201)
+    async def submit_report(
+        request: Request, filename: str, ingest_now: bool = Query(False, alias="ingest")
+    ) -> Dict[str, Any]:
+        state: GatewayState = request.app.state.codex
+        name = _safe_filename(filename)
+        target = os.path.join(state.incoming_dir, name)
+        # Stream into a hidden part file, which iter_incoming and
+        # WorkClaimer.iter_claims both skip, so no ingest sees it half-written
+        part = os.path.join(state.incoming_dir, f".{name}.{os.getpid()}.{threading.get_ident()}.part")
+        size = 0
+        try:
+            with open(part, "wb") as f:
+                async for chunk in request.stream():
+                    size += len(chunk)
+                    if size > MAX_REPORT_BYTES:
+                        raise HTTPException(status_code=413, detail="report too large")
+                    f.write(chunk)
+            try:
+                # Unlike a rename, link never replaces a report still waiting
+                os.link(part, target)
+            except FileExistsError:
+                raise HTTPException(status_code=409, detail="a report with this name is waiting to be ingested")
+        finally:
+            if os.path.exists(part):
+                os.remove(part)
+
+        result: Dict[str, Any] = {"filename": name, "bytes": size}
+        if ingest_now:
+            try:
+                record = await run_in_threadpool(state.ingest_report, name)
+            except RuntimeError as exc:
+                raise HTTPException(status_code=500, detail=str(exc))
+            result["ingested"] = record is not None
+            if record is None:
+                # Another ingest worker claimed it first and will finish it
+                return result
+            result.update(
+                ingest_timestamp=record["ingest_timestamp"], sha256=record["sha256"], metadata=record["metadata"]
+            )
+            if "near_duplicate_of" in record:
+                result["near_duplicate_of"] = record["near_duplicate_of"]
+        return result
+
+    @app.post("/drift/batch")
+    def drift_batch(batch: DriftBatch, request: Request) -> Dict[str, Any]:
+        results = request.app.state.codex.analyze(batch)
+        return {"count": len(results), "alarms": sum(r["alarm"] for r in results), "results": results}
+
+    @app.get("/drift/similar")
+    def drift_similar(vector: str, request: Request, k: int = 5) -> Dict[str, Any]:
+        try:
+            values = [float(v) for v in vector.split(",")]
+            hits = request.app.state.codex.vector_index.query(values, max(1, min(k, 100)))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return {"vector": values, "results": hits}
+
+    @app.post("/braid/nodes", status_code=201)
+    def braid_add(body: BraidFacts, request: Request) -> Dict[str, Any]:
+        return request.app.state.codex.add_facts(body.facts)
+
+    @app.get("/braid/nodes/{node_id}")
+    def braid_node(node_id: str, request: Request) -> Dict:
+        node = request.app.state.codex.braid_view().get(node_id)
+        if node is None:
+            raise HTTPException(status_code=404, detail="node not found")
+        return node
+
+    @app.get("/braid/index/{index}")
+    def braid_index(index: int, request: Request) -> Dict:
+        nodes = request.app.state.codex.braid_view().braid.long_term
+        if not -len(nodes) <= index < len(nodes):
+            raise HTTPException(status_code=404, detail="index out of range")
+        return nodes[index]
+
+    @app.get("/braid/proof/{index}")
+    def braid_proof(index: int, request: Request) -> Dict:
+        braid = request.app.state.codex.braid_view().braid
+        if not 0 <= index < len(braid.long_term):
+            raise HTTPException(status_code=404, detail="index out of range")
+        return braid.prove(index)
+
+    @app.get("/braid/search")
+    def braid_search(q: str, request: Request, limit: int = 10) -> Dict[str, Any]:
+        hits = request.app.state.codex.braid_view().search(q, max(1, min(limit, 100)))
+        return {"query": q, "results": hits}
+
+    return app
+
+
+app = create_app()
+
+
+def _default_bind() -> tuple:
+    try:
+        gateway = load_config("VAULTIS.yml").get("vaultis_gateway") or DEFAULT_GATEWAY
+    except Exception:
+        gateway = DEFAULT_GATEWAY
+    parsed = urlparse(gateway)
+    return parsed.hostname or "localhost", parsed.port or 8000
+
+
+def main() -> None:
+    import uvicorn
+
+    host, port = _default_bind()
+    parser = argparse.ArgumentParser(description="Run the VAULTIS HTTP gateway")
+    parser.add_argument("--host", default=host)
+    parser.add_argument("--port", type=int, default=port)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--metrics", action="store_true", help="record request and stage latency metrics")
+    args = parser.parse_args()
+
+    if args.metrics:
+        # Inherited by the worker processes
+        os.environ["CODEX_METRICS"] = "1"
+        parse_metrics.enable()
+    uvicorn.run("src.gateway:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,42 +6,72 @@ outputs structured JSON, and archives the original reports.
 
 Timestamps are recorded in UTC using the ISO 8601 format
 ``YYYY-MM-DDTHH:MM:SSZ``.
+
+The individual steps are exposed as functions so the streaming pipeline in
+``src/main.py`` can hand records from one stage to the next in memory.
+
+Outputs are replaced atomically, and a stage journal
+(:mod:`src.ingest_journal`) lets a run that crashed resume every report at
+its last completed stage.
 """
 
 import os
+import sys
 import json
 import hashlib
+import shutil
 from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Tuple
 
-try:
-    import yaml  # Use PyYAML if available
-except Exception:
-    yaml = None
-import shutil
+if __package__ in (None, ""):
+    # Allow ``python src/ingest.py`` to import sibling modules.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import codec
+from src.atomic import atomic_write
+from src.config_loader import loads as load_yaml
+from src.parse_metrics import timed, timer
+
+if TYPE_CHECKING:
+    from src.catalog import Catalog
+    from src.chronicle_archive import ChronicleArchive
+    from src.ingest_journal import IngestJournal
+    from src.near_duplicate import NearDuplicateIndex
 
 # Define directories
 INCOMING_DIR = "data/reports_incoming"
 OUTPUT_DIR = "data/analysis_output"
 ARCHIVE_DIR = "data/chronicle/archive"
 
-# Ensure output and archive directories exist
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-os.makedirs(ARCHIVE_DIR, exist_ok=True)
+# "loose" moves originals into ARCHIVE_DIR; "packed" appends them to the
+# compressed segment archive in src/chronicle_archive.py
+ARCHIVE_BACKENDS = ("loose", "packed")
+ARCHIVE_BACKEND = os.getenv("CODEX_ARCHIVE_BACKEND", "loose")
 
-# Process each new report in the incoming directory
-for filename in os.listdir(INCOMING_DIR):
-    file_path = os.path.join(INCOMING_DIR, filename)
-    if not os.path.isfile(file_path):
-        continue  # skip directories or non-files
+_packed_archives: Dict[str, "ChronicleArchive"] = {}
 
-    try:
-        # Read the entire file content
-        with open(file_path, 'r', encoding='utf-8') as f:
-            text = f.read()
-    except Exception as e:
-        print(f"Error reading file {filename}: {e}")
-        continue
 
+def iter_incoming(incoming_dir: str = INCOMING_DIR) -> Iterator[str]:
+    """Yield the path of every report file waiting in ``incoming_dir``.
+
+    Hidden files are skipped: uploads in progress are streamed into them and
+    only renamed to their report name once complete.
+    """
+    for filename in os.listdir(incoming_dir):
+        if filename.startswith("."):
+            continue
+        file_path = os.path.join(incoming_dir, filename)
+        if not os.path.isfile(file_path):
+            continue  # skip directories or non-files
+        yield file_path
+
+
+def parse_report(text: str, filename: str = "") -> Tuple[Dict, str]:
+    """Split a report into ``(metadata, content)``.
+
+    YAML front matter between ``---`` markers becomes the metadata; the rest
+    of the file is the content.
+    """
     # Initialize metadata and content
     metadata = {}
     content = text
@@ -60,21 +90,11 @@ for filename in os.listdir(INCOMING_DIR):
                 # Extract YAML front matter and parse it
                 yaml_lines = lines[1:end_idx]
                 yaml_text = "\n".join(yaml_lines)
-                if yaml is not None:
-                    try:
-                        metadata = yaml.safe_load(yaml_text) or {}
-                    except Exception as e:
-                        print(f"Warning: Failed to parse YAML front matter in {filename}: {e}")
-                        metadata = {}
-                else:
-                    # Simple YAML parsing fallback (key: value pairs)
+                try:
+                    metadata = load_yaml(yaml_text) or {}
+                except Exception as e:
+                    print(f"Warning: Failed to parse YAML front matter in {filename}: {e}")
                     metadata = {}
-                    for line in yaml_lines:
-                        if not line.strip() or line.lstrip().startswith('#'):
-                            continue
-                        if ':' in line:
-                            key, val = line.split(':', 1)
-                            metadata[key.strip()] = val.strip()
                 # The rest of the file after the second '---' is the content
                 content = "\n".join(lines[end_idx+1:]).lstrip()
             else:
@@ -84,43 +104,309 @@ for filename in os.listdir(INCOMING_DIR):
         # No front matter present
         content = text.lstrip()
 
-    # Generate a secure UTC timestamp for ingestion in ISO 8601 format
-    timestamp_utc = datetime.utcnow().replace(microsecond=0)
+    return metadata, content
+
+
+def build_record(metadata: Dict, content: str, timestamp_utc: datetime) -> Dict:
+    """Return the structured JSON record for a parsed report."""
     ingest_timestamp = timestamp_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
 
     # Compute SHA-256 hash of the report content (as a check for integrity or duplicates)
     content_bytes = content.encode('utf-8')
     content_hash = hashlib.sha256(content_bytes).hexdigest()
 
-    # Prepare the structured record
-    record = {
+    return {
         "ingest_timestamp": ingest_timestamp,
         "sha256": content_hash,
         "metadata": metadata,
         "content": content
     }
 
+
+def write_record(record: Dict, filename: str, output_dir: str = OUTPUT_DIR) -> str:
+    """Write ``record`` next to other outputs as ``<base name>.json``.
+
+    The file is replaced atomically, so readers never see a partial record.
+    """
     # Determine output file path (same base name with .json extension)
     base_name, _ = os.path.splitext(filename)
-    output_path = os.path.join(OUTPUT_DIR, f"{base_name}.json")
+    output_path = os.path.join(output_dir, f"{base_name}.json")
 
+    # Write the JSON record to the analysis output directory
+    atomic_write(output_path, codec.dumps(record, indent=True))
+    return output_path
+
+
+def _source_signature(file_path: str) -> Optional[list]:
     try:
-        # Write the JSON record to the analysis output directory
-        with open(output_path, 'w', encoding='utf-8') as json_file:
-            json.dump(record, json_file, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print(f"Error writing JSON output for {filename}: {e}")
-        # If writing fails, skip archiving so it can be retried
-        continue
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _load_output(output_path: str) -> Optional[Dict]:
+    try:
+        record = codec.read_json(output_path)
+    except (OSError, ValueError):
+        return None
+    return record if isinstance(record, dict) and "sha256" in record else None
+
+
+def _packed_archive(archive_dir: str) -> "ChronicleArchive":
+    archive = _packed_archives.get(archive_dir)
+    if archive is None:
+        from src.chronicle_archive import ChronicleArchive
+
+        archive = _packed_archives.setdefault(archive_dir, ChronicleArchive(archive_dir))
+    return archive
+
+
+def archive_report(
+    file_path: str,
+    filename: str,
+    timestamp_utc: datetime,
+    archive_dir: str = ARCHIVE_DIR,
+    backend: Optional[str] = None,
+) -> str:
+    """Move the original report into the chronicle archive.
+
+    With the ``packed`` backend the original is appended to a compressed
+    segment instead, and the returned location is ``<segment>#<offset>``.
+    """
+    backend = backend or ARCHIVE_BACKEND
+    if backend == "packed":
+        entry = _packed_archive(archive_dir).put_file(
+            file_path, filename, timestamp_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+        )
+        return f"{entry['segment']}#{entry['offset']}"
+    if backend != "loose":
+        raise ValueError(f"unknown archive backend {backend!r}")
+
+    # Define archive path (add timestamp if file exists to avoid name collisions)
+    archive_path = os.path.join(archive_dir, filename)
+    if os.path.exists(archive_path):
+        timestamp_tag = timestamp_utc.strftime("%Y%m%dT%H%M%SZ")
+        root, ext = os.path.splitext(filename)
+        archive_path = os.path.join(archive_dir, f"{root}_{timestamp_tag}{ext}")
+    shutil.move(file_path, archive_path)
+    return archive_path
+
+
+def _catalog_and_finish(
+    record: Dict,
+    filename: str,
+    output_path: str,
+    archive_location: Optional[str],
+    catalog: Optional["Catalog"],
+    journal: Optional["IngestJournal"],
+) -> None:
+    """Add ``record`` to the catalog, then mark the report done in the journal."""
+    done = None if journal is None else (lambda: journal.record(filename, "done"))
+    if catalog is not None:
+        with timer("ingest_catalog"):
+            # Catalog rows are batched; the report is only done once its row commits
+            catalog.add(record, output_path, archive_location, on_commit=done)
+    elif done is not None:
+        done()
+
+
+@timed("ingest_file")
+def ingest_file(
+    file_path: str,
+    output_dir: str = OUTPUT_DIR,
+    archive_dir: str = ARCHIVE_DIR,
+    catalog: Optional["Catalog"] = None,
+    near_duplicates: Optional["NearDuplicateIndex"] = None,
+    journal: Optional["IngestJournal"] = None,
+) -> Optional[Dict]:
+    """Run every ingestion step for one report.
+
+    Returns the structured record, or ``None`` if the report could not be
+    read or its JSON output could not be written.  With a ``catalog`` the
+    record is also queued for the SQLite report catalog.  With a
+    ``near_duplicates`` index, a report that closely matches an earlier one
+    is tagged with ``near_duplicate_of`` (the base name of its cluster's
+    representative) and ``near_duplicate_similarity``.  With a ``journal``,
+    each completed stage is recorded, and a report whose output was already
+    written by an interrupted run is archived without being parsed again.
+    """
+    filename = os.path.basename(file_path)
+    source = _source_signature(file_path)
+    record = output_path = None
+    entry = journal.entry(filename) if journal is not None else None
+    if entry and entry.get("stage") == "written" and entry.get("source") == source:
+        # Same original as the interrupted run: reuse its output
+        record = _load_output(entry["output"])
+        output_path = entry["output"]
+
+    if record is None:
+        try:
+            # Read the entire file content
+            with timer("ingest_read"), open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except Exception as e:
+            print(f"Error reading file {filename}: {e}")
+            return None
+
+        with timer("ingest_parse"):
+            metadata, content = parse_report(text, filename)
+
+        # Generate a secure UTC timestamp for ingestion in ISO 8601 format
+        timestamp_utc = datetime.utcnow().replace(microsecond=0)
+        with timer("ingest_hash"):
+            record = build_record(metadata, content, timestamp_utc)
+
+        if near_duplicates is not None:
+            with timer("ingest_near_duplicate"):
+                match = near_duplicates.assign(os.path.splitext(filename)[0], content)
+            if match is not None:
+                record["near_duplicate_of"] = match.representative
+                record["near_duplicate_similarity"] = round(match.similarity, 4)
+
+        try:
+            with timer("ingest_write"):
+                output_path = write_record(record, filename, output_dir)
+        except Exception as e:
+            print(f"Error writing JSON output for {filename}: {e}")
+            # If writing fails, skip archiving so it can be retried
+            return None
+        if journal is not None:
+            journal.record(filename, "written", output=output_path, source=source, path=file_path)
+    else:
+        timestamp_utc = datetime.strptime(record["ingest_timestamp"], "%Y-%m-%dT%H:%M:%SZ")
 
     # Archive the original report file
+    archive_location = None
     try:
-        # Define archive path (add timestamp if file exists to avoid name collisions)
-        archive_path = os.path.join(ARCHIVE_DIR, filename)
-        if os.path.exists(archive_path):
-            timestamp_tag = timestamp_utc.strftime("%Y%m%dT%H%M%SZ")
-            root, ext = os.path.splitext(filename)
-            archive_path = os.path.join(ARCHIVE_DIR, f"{root}_{timestamp_tag}{ext}")
-        shutil.move(file_path, archive_path)
+        with timer("ingest_archive"):
+            archive_location = archive_report(file_path, filename, timestamp_utc, archive_dir)
     except Exception as e:
         print(f"Error archiving file {filename}: {e}")
+        # Leave the journal at "written" so the next run retries only this
+        return record
+    if journal is not None:
+        journal.record(filename, "archived", location=archive_location)
+
+    _catalog_and_finish(record, filename, output_path, archive_location, catalog, journal)
+    return record
+
+
+def resume_journal(
+    journal: "IngestJournal", incoming_dir: str = INCOMING_DIR, catalog: Optional["Catalog"] = None
+) -> int:
+    """Finish reports an interrupted run left past the point of no return.
+
+    Reports whose original is still waiting are left for the normal ingest
+    loop, which resumes them from the journal.  Reports whose original is
+    already gone (archived before the crash) only need their catalog row.
+    Returns how many reports were finished here.
+    """
+    finished = 0
+    for name, entry in journal.incomplete().items():
+        if entry.get("stage") == "written" and (
+            os.path.exists(entry.get("path", "")) or os.path.exists(os.path.join(incoming_dir, name))
+        ):
+            continue
+        record = _load_output(entry.get("output", ""))
+        if record is None:
+            continue  # output lost as well; nothing left to finish
+        _catalog_and_finish(record, name, entry["output"], entry.get("location"), catalog, journal)
+        finished += 1
+    return finished
+
+
+def main() -> None:
+    # Imported here so importing the ingest steps stays cheap
+    import argparse
+    from src.profiling import MODES as PROFILE_MODES, from_env as profiler_from_env
+
+    parser = argparse.ArgumentParser(description="Ingest Founder's Reports")
+    parser.add_argument("--profile", choices=PROFILE_MODES, help="profile the run (see src/profiling.py)")
+    parser.add_argument(
+        "--archive-backend", choices=ARCHIVE_BACKENDS, help="override CODEX_ARCHIVE_BACKEND for this run"
+    )
+    parser.add_argument("--no-catalog", action="store_true", help="do not update the SQLite report catalog")
+    parser.add_argument("--no-dedupe", action="store_true", help="skip near-duplicate detection")
+    claim_group = parser.add_argument_group("multi-worker ingest (see src/work_claim.py)")
+    claim_group.add_argument(
+        "--claim", action="store_true", help="claim reports atomically so several workers can share the incoming dir"
+    )
+    claim_group.add_argument(
+        "--worker-id", help="unique worker name (default: <host>-<pid>); keep it stable so a restart can resume"
+    )
+    claim_group.add_argument("--partitions", type=int, default=1, help="number of filename-hash partitions")
+    claim_group.add_argument("--partition", type=int, default=0, help="partition this worker owns")
+    claim_group.add_argument("--lease-seconds", type=float, default=300.0, help="lease lifetime before recovery")
+    claim_group.add_argument(
+        "--steal-after", type=float, help="also take other partitions' reports waiting this many seconds"
+    )
+    args = parser.parse_args()
+
+    global ARCHIVE_BACKEND
+    if args.archive_backend:
+        ARCHIVE_BACKEND = args.archive_backend
+
+    # Ensure output and archive directories exist
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+
+    profiler = profiler_from_env("ingest", args.profile)
+    if profiler is not None:
+        profiler.start()
+
+    catalog = None
+    if not args.no_catalog:
+        from src.catalog import CATALOG_NAME, Catalog
+
+        catalog = Catalog(os.path.join(OUTPUT_DIR, CATALOG_NAME))
+    near_duplicates = None
+    if not args.no_dedupe:
+        from src.near_duplicate import INDEX_NAME, NearDuplicateIndex
+
+        near_duplicates = NearDuplicateIndex(os.path.join(OUTPUT_DIR, INDEX_NAME))
+
+    claimer = None
+    if args.claim or args.partitions > 1:
+        from src.work_claim import WorkClaimer
+
+        claimer = WorkClaimer(
+            INCOMING_DIR,
+            worker_id=args.worker_id,
+            lease_seconds=args.lease_seconds,
+            partitions=args.partitions,
+            partition=args.partition,
+            steal_after=args.steal_after,
+        )
+
+    from src.ingest_journal import JOURNAL_NAME, IngestJournal
+
+    # Each claiming worker keeps its own journal; only it resumes its work
+    journal_name = JOURNAL_NAME if claimer is None else f"{JOURNAL_NAME[:-6]}.{claimer.worker_id}.jsonl"
+    journal = IngestJournal(os.path.join(OUTPUT_DIR, journal_name))
+    resume_journal(journal, INCOMING_DIR, catalog)
+
+    # Process each new report in the incoming directory
+    try:
+        for file_path in claimer.iter_claims() if claimer else iter_incoming(INCOMING_DIR):
+            record = ingest_file(file_path, OUTPUT_DIR, ARCHIVE_DIR, catalog, near_duplicates, journal)
+            if record is None and claimer is not None and os.path.exists(file_path):
+                # Leave the report for a later run, as single-worker ingest does
+                claimer.release(file_path)
+    finally:
+        if claimer is not None:
+            claimer.close()
+    if catalog is not None:
+        # Flushing the catalog marks its reports done in the journal
+        catalog.close()
+    journal.close()
+    if near_duplicates is not None:
+        near_duplicates.close()
+
+    if profiler is not None:
+        profiler.stop()
+        print(json.dumps({"profile": profiler.report()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
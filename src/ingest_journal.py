@@ -0,0 +1,104 @@
+"""
+Module: ingest_journal – Per-file stage journal for resumable ingest runs.
+
+Ingest appends one JSON line per completed stage of each report::
+
+    {"name": "r1.md", "stage": "written", "output": ".../r1.json", "source": [size, mtime_ns], ...}
+    {"name": "r1.md", "stage": "archived", "location": ".../archive/r1.md"}
+    {"name": "r1.md", "stage": "done"}
+
+After a crash, :meth:`IngestJournal.entry` tells the next run where each
+report stopped, so finished stages are skipped rather than redone.  Only
+unfinished reports are kept when the journal is compacted at the end of a
+run, so recovery reads a short file instead of rescanning the outputs.
+
+Lines are flushed but not fsynced: a lost line only means a stage is redone,
+and every stage is safe to repeat.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from .atomic import atomic_write
+
+STAGES = ("written", "archived", "done")
+JOURNAL_NAME = ".ingest_journal.jsonl"
+
+
+class IngestJournal:
+    """Append-only log of the last completed ingest stage per report."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._load()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # Drop the torn final line of a crashed run, or the next
+            # record would be glued onto it and lost as well
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            name = event.pop("name", None)
+            if name is not None:
+                # Later stages add to what earlier stages recorded
+                merged = {} if event.get("stage") == STAGES[0] else self._entries.get(name, {})
+                self._entries[name] = dict(merged, **event)
+
+    def entry(self, name: str) -> Optional[Dict]:
+        """Return the merged journal entry for report ``name``, if any."""
+        with self._lock:
+            entry = self._entries.get(name)
+            return dict(entry) if entry else None
+
+    def record(self, name: str, stage: str, **fields) -> None:
+        """Record that report ``name`` completed ``stage``."""
+        if stage not in STAGES:
+            raise ValueError(f"unknown stage {stage!r}; expected one of {STAGES}")
+        event = dict(fields, stage=stage)
+        line = json.dumps(dict(event, name=name), ensure_ascii=False) + "\n"
+        with self._lock:
+            merged = {} if stage == STAGES[0] else self._entries.get(name, {})
+            self._entries[name] = dict(merged, **event)
+            self._file.write(line)
+            self._file.flush()
+
+    def incomplete(self) -> Dict[str, Dict]:
+        """Return the entries of every report that has not reached ``done``."""
+        with self._lock:
+            return {name: dict(e) for name, e in self._entries.items() if e.get("stage") != "done"}
+
+    def compact(self) -> int:
+        """Rewrite the journal with only unfinished reports; return how many remain."""
+        with self._lock:
+            self._entries = {name: e for name, e in self._entries.items() if e.get("stage") != "done"}
+            lines = "".join(
+                json.dumps(dict(e, name=name), ensure_ascii=False) + "\n" for name, e in self._entries.items()
+            )
+            self._file.close()
+            atomic_write(self.path, lines)
+            self._file = open(self.path, "a", encoding="utf-8")
+            return len(self._entries)
+
+    def close(self, compact: bool = True) -> None:
+        if compact:
+            self.compact()
+        with self._lock:
+            self._file.close()
@@ -1,20 +1,183 @@
-import time
-import random
+"""Loopstate tracker for Codex18 drift monitoring.
+
+The tracker subscribes to :class:`core.drift_analysis_engine.DriftAnalysisEngine`
+and receives every drift result the moment it is produced.  It keeps rolling
+aggregates (alarm rate and per-axis drift percentiles) over a fixed-size window
+and evaluates the RI-2048 trigger thresholds on each event.
+
+Run standalone to follow the drift log directory written by another process::
+
+    python src/loopstate_tracker.py --follow
+"""
+
+import argparse
+import json
 import logging
+import os
+import sys
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Mapping, Optional
+
+if __package__ in (None, ""):
+    # Allow ``python src/loopstate_tracker.py`` to import sibling modules.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trigger_engine import TriggerEngine
+
+logger = logging.getLogger(__name__)
+
+LOGS_DIR = os.path.join("data", "analysis_output", "drift_logs")
+
+
+class LoopstateTracker:
+    """Rolling drift aggregates with per-event trigger evaluation.
+
+    Memory use is bounded by ``window``: only the most recent ``window``
+    events contribute to the windowed alarm rate and percentiles, while
+    lifetime totals are plain counters.
+    """
+
+    def __init__(self, window: int = 1024, triggers: Optional[Mapping[str, Mapping]] = None) -> None:
+        self.window = window
+        self.total_events = 0
+        self.total_alarms = 0
+        self.recent_alarms: Deque[bool] = deque(maxlen=window)
+        self.axis_drift: List[Deque[float]] = [deque(maxlen=window) for _ in range(4)]
+        self.metrics: Dict[str, float] = {}
+        self.fired: Deque[Dict] = deque(maxlen=window)
+        self.triggers = TriggerEngine(triggers)
+        self.triggers.on(None, self._record_trigger)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _record_trigger(self, event: Dict) -> None:
+        self.fired.append(event)
+        logger.warning(f"Trigger {event['trigger']} fired {event['metrics']}: {event['action']}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def attach(self, engine) -> None:
+        """Subscribe to drift results produced by ``engine``."""
+        engine.subscribe(self.observe)
+
+    def observe(self, event: Dict) -> None:
+        """Fold a single drift log entry into the aggregates."""
+        alarm = bool(event.get("alarm"))
+        diffs = event.get("diff_anchor") or [0.0] * 4
+        self.total_events += 1
+        self.total_alarms += alarm
+        self.recent_alarms.append(alarm)
+        for axis, diff in enumerate(diffs[:4]):
+            self.axis_drift[axis].append(float(diff))
+        self.update_metric("drift_index", max(float(d) for d in diffs) if diffs else 0.0)
+
+    def update_metric(self, metric: str, value: float) -> None:
+        """Record ``metric`` and evaluate the triggers that watch it."""
+        self.metrics[metric] = value
+        self.triggers.update(metric, value)
+
+    def alarm_rate(self) -> float:
+        """Fraction of events within the window that raised an alarm."""
+        if not self.recent_alarms:
+            return 0.0
+        return sum(self.recent_alarms) / len(self.recent_alarms)
+
+    def percentiles(self, qs: Iterable[float] = (50, 90, 99)) -> List[Dict[str, float]]:
+        """Return nearest-rank drift percentiles for each axis within the window."""
+        result = []
+        for values in self.axis_drift:
+            ordered = sorted(values)
+            axis: Dict[str, float] = {}
+            for q in qs:
+                if ordered:
+                    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered))) - 1))
+                    axis[f"p{q:g}"] = ordered[rank]
+                else:
+                    axis[f"p{q:g}"] = 0.0
+            result.append(axis)
+        return result
+
+    def snapshot(self) -> Dict:
+        """Summarise the current loop state."""
+        return {
+            "events": self.total_events,
+            "alarms": self.total_alarms,
+            "alarm_rate": self.alarm_rate(),
+            "axis_percentiles": self.percentiles(),
+            "metrics": dict(self.metrics),
+            "triggers_fired": len(self.fired),
+        }
+
+
+def _read_log(path: str) -> Optional[Dict]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def follow_logs(tracker: LoopstateTracker, logs_dir: str, follow: bool, interval: float) -> None:
+    """Replay drift logs from ``logs_dir`` and optionally tail new entries.
+
+    Log names sort by timestamp, so each poll only reads names past the last
+    one processed.  The directory is listed on every poll rather than gated
+    on its mtime, which filesystems with coarse timestamps do not bump for a
+    log created in the same tick as the previous listing.  When following,
+    an unreadable log (possibly still being written) stays pending and is
+    retried on every poll until it can be read.
+    """
+    last = ""
+    pending: set = set()
+    while True:
+        try:
+            names = sorted(pending.union(n for n in os.listdir(logs_dir) if n.endswith(".json") and n > last))
+        except FileNotFoundError:
+            names = []
+        observed = 0
+        for name in names:
+            last = max(last, name)
+            event = _read_log(os.path.join(logs_dir, name))
+            if event is None:
+                if not follow:
+                    logger.warning(f"Skipping unreadable drift log {name}")
+                elif os.path.exists(os.path.join(logs_dir, name)):
+                    pending.add(name)
+                else:
+                    pending.discard(name)
+                continue
+            pending.discard(name)
+            tracker.observe(event)
+            observed += 1
+        if observed:
+            state = tracker.snapshot()
+            logger.info(
+                f"Events: {state['events']}, Alarm rate: {state['alarm_rate']:.3f}, "
+                f"Drift index: {state['metrics'].get('drift_index', 0.0):.3f}"
+            )
+        if not follow:
+            return
+        time.sleep(interval)
 
-def simulate_drift_check():
-    return {
-        "emotional_vector": random.choice(["stable", "minor_wave", "spike"]),
-        "ethics_alignment": round(random.uniform(0.78, 0.99), 3),
-        "drift_index": round(random.uniform(0.01, 0.25), 3)
-    }
 
 def main():
+    parser = argparse.ArgumentParser(description="Track Codex18 drift loop state")
+    parser.add_argument("--logs-dir", default=LOGS_DIR)
+    parser.add_argument("--window", type=int, default=1024)
+    parser.add_argument("--follow", action="store_true", help="keep tailing the drift log directory")
+    parser.add_argument("--interval", type=float, default=0.5, help="tail polling interval in seconds")
+    args = parser.parse_args()
+
     logging.basicConfig(level=logging.INFO)
-    while True:
-        status = simulate_drift_check()
-        logging.info(f"Vector: {status['emotional_vector']}, Alignment: {status['ethics_alignment']}, Drift: {status['drift_index']}")
-        time.sleep(3)
+    tracker = LoopstateTracker(window=args.window)
+    try:
+        follow_logs(tracker, args.logs_dir, args.follow, args.interval)
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(tracker.snapshot(), indent=2))
 
 if __name__ == "__main__":
     main()
@@ -1 +1,444 @@
-# Placeholder for main.py
+#!/usr/bin/env python3
+"""Streaming pipeline runner for Codex18.
+
+Chains the ingestion steps, drift analysis, memory braid updates and the
+optional summarizer as stages connected by bounded queues::
+
+    reports_incoming -> ingest -> drift -> braid -> summarize -> release
+
+Every stage runs its own pool of worker threads.  Records are handed from one
+stage to the next in memory; when a downstream queue is full the upstream
+workers block, which applies backpressure all the way to the report source.
+A run ends with a per-stage report of throughput and queue depths::
+
+    python src/main.py --ingest-workers 4 --queue-size 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+if __package__ in (None, ""):
+    # Allow ``python src/main.py`` to import sibling modules.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class Stage:
+    """A pipeline step executed by ``workers`` threads.
+
+    ``func`` receives one item and returns the item to pass downstream, or
+    ``None`` to drop it.  Exceptions are counted and the item is dropped.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1, maxsize: int = 64) -> None:
+        if workers < 1:
+            raise ValueError(f"stage {name} needs at least one worker")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.inbox: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+        self._lock = threading.Lock()
+        self._running = 0
+
+    def put(self, item: Any) -> None:
+        """Enqueue ``item``, blocking while the inbox is full."""
+        self.inbox.put(item)
+        depth = self.inbox.qsize()
+        with self._lock:
+            self._depth_total += depth
+            self._depth_samples += 1
+            if depth > self.max_depth:
+                self.max_depth = depth
+
+    def stats(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 6),
+            "throughput_per_s": round(self.processed / elapsed, 3) if elapsed > 0 else 0.0,
+            "max_queue_depth": self.max_depth,
+            "mean_queue_depth": round(self._depth_total / self._depth_samples, 3) if self._depth_samples else 0.0,
+        }
+
+
+class Pipeline:
+    """Run items through a chain of :class:`Stage` objects."""
+
+    def __init__(self, stages: List[Stage]) -> None:
+        if not stages:
+            raise ValueError("pipeline needs at least one stage")
+        self.stages = stages
+        self.completed = 0
+        self._done_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _worker(self, index: int) -> None:
+        stage = self.stages[index]
+        downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            item = stage.inbox.get()
+            if item is _STOP:
+                break
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception as exc:
+                result = None
+                with stage._lock:
+                    stage.errors += 1
+                logger.error("Stage %s failed: %s", stage.name, exc, exc_info=True)
+            elapsed = time.perf_counter() - start
+            with stage._lock:
+                stage.busy_seconds += elapsed
+                stage.processed += 1
+                if result is None:
+                    stage.dropped += 1
+            if result is None:
+                continue
+            if downstream is not None:
+                downstream.put(result)
+            else:
+                with self._done_lock:
+                    self.completed += 1
+
+        with stage._lock:
+            stage._running -= 1
+            last = stage._running == 0
+        if last and downstream is not None:
+            # The last worker to finish closes the next stage.
+            for _ in range(downstream.workers):
+                downstream.inbox.put(_STOP)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def run(self, source: Iterable[Any]) -> Dict[str, Any]:
+        """Feed ``source`` through every stage and return the run report."""
+        threads: List[threading.Thread] = []
+        for index, stage in enumerate(self.stages):
+            stage._running = stage.workers
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker, args=(index,), name=f"{stage.name}-{n}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        start = time.perf_counter()
+        first = self.stages[0]
+        fed = 0
+        for item in source:
+            first.put(item)
+            fed += 1
+        for _ in range(first.workers):
+            first.inbox.put(_STOP)
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        return {
+            "items_in": fed,
+            "items_out": self.completed,
+            "elapsed_seconds": round(elapsed, 6),
+            "stages": {stage.name: stage.stats(elapsed) for stage in self.stages},
+        }
+
+
+def build_codex_pipeline(
+    *,
+    ingest_workers: int = 2,
+    drift_workers: int = 1,
+    braid_workers: int = 1,
+    summarize_workers: int = 0,
+    queue_size: int = 64,
+    output_dir: Optional[str] = None,
+    archive_dir: Optional[str] = None,
+    braid_kwargs: Optional[Dict[str, Any]] = None,
+    ethics: bool = True,
+    catalog: Optional[Any] = None,
+    vector_index: Optional[Any] = None,
+    rollups: Optional[Any] = None,
+    near_duplicates: Optional[Any] = None,
+    journal: Optional[Any] = None,
+) -> Pipeline:
+    """Assemble the ingest -> drift -> braid (-> summarize) -> release pipeline.
+
+    Drift analysis and braid updates share one engine/braid instance each and
+    are serialised by a lock, so extra workers there only overlap the work
+    around the critical section.  The optional indexes are owned by the
+    caller, who closes them after the run.
+
+    Parameters
+    ----------
+    ingest_workers, drift_workers, braid_workers : int
+        Worker threads per stage.
+    summarize_workers : int
+        Summarizer threads; ``0`` leaves the summarize stage out.  Released
+        summaries are saved under ``<output_dir>/summaries/`` for the brief
+        formatter.
+    queue_size : int
+        Bound on each stage's input queue.
+    output_dir, archive_dir : str, optional
+        Defaults to the ingest module's directories.
+    braid_kwargs : dict, optional
+        Passed to :class:`~src.memory_ledger.MemoryBraid`.
+    ethics : bool
+        Vet drift assessments and summaries against the Protector ethics
+        policy in a release stage that drops blocked records.
+    catalog : Catalog, optional
+        :class:`~src.catalog.Catalog` that ingested records are added to.
+    vector_index : VectorIndex, optional
+        :class:`~src.vector_index.VectorIndex` of every truth vector; alarmed
+        records list their most similar past analyses.
+    rollups : DriftRollups, optional
+        :class:`~src.analyze.DriftRollups` kept current with every analysis.
+    near_duplicates : NearDuplicateIndex, optional
+        :class:`~src.near_duplicate.NearDuplicateIndex` behind a dedupe stage
+        that passes on only the first report of each near-duplicate cluster.
+        Later copies are still ingested and archived, tagged with
+        ``near_duplicate_of``.
+    journal : IngestJournal, optional
+        :class:`~src.ingest_journal.IngestJournal` that makes ingest
+        resumable after a crash.
+    """
+    from core.drift_analysis_engine import DriftAnalysisEngine
+    from src import codec, ingest
+    from src.atomic import atomic_write
+    from src.memory_ledger import MemoryBraid
+
+    output_dir = output_dir or ingest.OUTPUT_DIR
+    archive_dir = archive_dir or ingest.ARCHIVE_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(archive_dir, exist_ok=True)
+
+    engine = DriftAnalysisEngine()
+    braid = MemoryBraid(**(braid_kwargs or {}))
+    drift_lock = threading.Lock()
+    braid_lock = threading.Lock()
+    if vector_index is not None:
+        vector_index.attach(engine)
+    if rollups is not None:
+        rollups.attach(engine)
+
+    def ingest_stage(path: str) -> Optional[Dict]:
+        record = ingest.ingest_file(path, output_dir, archive_dir, catalog, near_duplicates, journal)
+        if record is not None:
+            record["source"] = os.path.basename(path)
+        return record
+
+    def drift_stage(record: Dict) -> Dict:
+        metadata = record.get("metadata") if isinstance(record.get("metadata"), dict) else {}
+        quality = float(metadata.get("quality_score", 1.0))
+        tags = set(metadata.get("tags") or [])
+        with drift_lock:
+            vector, alarm = engine.analyze_input(quality, tags)
+            anchor = engine.anchor_vector or vector
+            # The record this analysis was indexed as; the file is shared
+            number = vector_index.take_event_record() if vector_index is not None else None
+        max_drift = max(abs(v - a) for v, a in zip(vector, anchor))
+        record["drift"] = {"vector": vector, "alarm": alarm, "max_drift": max_drift}
+        if alarm and vector_index is not None:
+            if number is not None:
+                hits = vector_index.neighbours(number, k=3)
+            else:
+                hits = vector_index.query(vector, k=3)
+            record["drift"]["similar"] = [{"ref": hit["ref"], "distance": hit["distance"]} for hit in hits]
+        return record
+
+    def braid_stage(record: Dict) -> Dict:
+        fact = {
+            "latest_report": {
+                "source": record.get("source"),
+                "sha256": record["sha256"],
+                "ingest_timestamp": record["ingest_timestamp"],
+                "drift_alarm": record["drift"]["alarm"],
+            }
+        }
+        with braid_lock:
+            braid.update(fact)
+            record["braid_node"] = braid.long_term[-1]["id"]
+        return record
+
+    stages = [Stage("ingest", ingest_stage, ingest_workers, queue_size)]
+    if near_duplicates is not None:
+
+        def dedupe_stage(record: Dict) -> Optional[Dict]:
+            if "near_duplicate_of" in record:
+                logger.info("Skipping %s: near-duplicate of %s", record.get("source"), record["near_duplicate_of"])
+                return None
+            return record
+
+        stages.append(Stage("dedupe", dedupe_stage, 1, queue_size))
+    stages += [
+        Stage("drift", drift_stage, drift_workers, queue_size),
+        Stage("braid", braid_stage, braid_workers, queue_size),
+    ]
+
+    summaries_dir = os.path.join(output_dir, "summaries")
+
+    def save_summary(record: Dict) -> None:
+        if not isinstance(record.get("summary"), dict):
+            return
+        source = str(record.get("source") or record.get("sha256"))
+        entry = dict(record["summary"], source=source, timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+        os.makedirs(summaries_dir, exist_ok=True)
+        atomic_write(
+            os.path.join(summaries_dir, os.path.splitext(source)[0] + ".json"),
+            codec.dumps(entry, indent=True),
+            fsync=False,
+        )
+
+    if summarize_workers > 0:
+        from src.summarizer import Summarizer
+
+        summarizer = Summarizer()
+
+        def summarize_stage(record: Dict) -> Dict:
+            record["summary"] = summarizer.summarize({"text": record.get("content", "")})
+            if not ethics:
+                save_summary(record)
+            return record
+
+        stages.append(Stage("summarize", summarize_stage, summarize_workers, queue_size))
+
+    if ethics:
+        from src.ethics_monitor import EthicsMonitor
+
+        monitor = EthicsMonitor()
+
+        def release_stage(record: Dict) -> Optional[Dict]:
+            verdicts = {"drift": monitor.evaluate(record["drift"], kind="drift")}
+            if "summary" in record:
+                verdicts["summary"] = monitor.evaluate(record["summary"], kind="summary")
+            record["ethics"] = {name: verdict.to_dict() for name, verdict in verdicts.items()}
+            blocked = [name for name, verdict in verdicts.items() if not verdict.allowed]
+            if blocked:
+                logger.warning("Withheld %s: ethics policy blocked %s", record.get("source"), ", ".join(blocked))
+                return None
+            # Only summaries that passed review reach the briefs
+            save_summary(record)
+            return record
+
+        stages.append(Stage("release", release_stage, 1, queue_size))
+
+    return Pipeline(stages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Codex18 streaming pipeline")
+    parser.add_argument("--incoming-dir", default=None)
+    parser.add_argument("--ingest-workers", type=int, default=2)
+    parser.add_argument("--drift-workers", type=int, default=1)
+    parser.add_argument("--braid-workers", type=int, default=1)
+    parser.add_argument("--summarize-workers", type=int, default=0, help="0 disables summarization")
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--no-ethics", action="store_true", help="skip the Protector release checks")
+    parser.add_argument("--no-catalog", action="store_true", help="do not update the SQLite report catalog")
+    parser.add_argument("--no-vector-index", action="store_true", help="do not index truth vectors for k-NN")
+    parser.add_argument("--no-rollups", action="store_true", help="do not update the drift trend rollups")
+    parser.add_argument("--no-dedupe", action="store_true", help="process near-duplicate reports too")
+    parser.add_argument("--metrics", action="store_true", help="record per-stage latency metrics")
+    parser.add_argument("--metrics-prom", help="write Prometheus text metrics to this path")
+    parser.add_argument(
+        "--profile",
+        choices=("sample", "cprofile"),
+        help="profile the run; cprofile only sees the feeding thread, sample sees every stage",
+    )
+    parser.add_argument("--profile-top", type=int, default=20, help="hottest functions to include in the report")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from src import ingest
+    from src import parse_metrics
+    from src import profiling
+
+    if args.metrics or args.metrics_prom:
+        parse_metrics.enable()
+
+    from src.ingest_journal import JOURNAL_NAME, IngestJournal
+
+    incoming_dir = args.incoming_dir or ingest.INCOMING_DIR
+    catalog = None
+    if not args.no_catalog:
+        from src.catalog import CATALOG_NAME, Catalog
+
+        catalog = Catalog(os.path.join(ingest.OUTPUT_DIR, CATALOG_NAME))
+    vector_index = None
+    if not args.no_vector_index:
+        from src.vector_index import VectorIndex
+
+        vector_index = VectorIndex()
+    rollups = None
+    if not args.no_rollups:
+        from src.analyze import DB_NAME, DriftRollups
+
+        rollups = DriftRollups(os.path.join(ingest.OUTPUT_DIR, DB_NAME))
+    near_duplicates = None
+    if not args.no_dedupe:
+        from src.near_duplicate import INDEX_NAME, NearDuplicateIndex
+
+        near_duplicates = NearDuplicateIndex(os.path.join(ingest.OUTPUT_DIR, INDEX_NAME))
+    journal = IngestJournal(os.path.join(ingest.OUTPUT_DIR, JOURNAL_NAME))
+    ingest.resume_journal(journal, incoming_dir, catalog)
+    pipeline = build_codex_pipeline(
+        ingest_workers=args.ingest_workers,
+        drift_workers=args.drift_workers,
+        braid_workers=args.braid_workers,
+        summarize_workers=args.summarize_workers,
+        queue_size=args.queue_size,
+        ethics=not args.no_ethics,
+        catalog=catalog,
+        vector_index=vector_index,
+        rollups=rollups,
+        near_duplicates=near_duplicates,
+        journal=journal,
+    )
+    profiler = profiling.from_env("pipeline", args.profile)
+    if profiler is not None:
+        profiler.start()
+    report = pipeline.run(ingest.iter_incoming(incoming_dir))
+    if catalog is not None:
+        catalog.close()
+    journal.close()
+    if vector_index is not None:
+        vector_index.close()
+    if rollups is not None:
+        rollups.close()
+    if near_duplicates is not None:
+        near_duplicates.close()
+    if profiler is not None:
+        profiler.stop()
+        report["profile"] = profiler.report(args.profile_top)
+    if parse_metrics.enabled():
+        report["metrics"] = parse_metrics.REGISTRY.snapshot()
+    if args.metrics_prom:
+        with open(args.metrics_prom, "w", encoding="utf-8") as f:
+            f.write(parse_metrics.REGISTRY.to_prometheus())
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
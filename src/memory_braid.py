@@ -1,3 +1,3 @@
-from .memory_ledger import MemoryBraid
+from .memory_ledger import BraidCorruptionError, BraidReader, MemoryBraid
 
-__all__ = ["MemoryBraid"]
+__all__ = ["BraidCorruptionError", "BraidReader", "MemoryBraid"]
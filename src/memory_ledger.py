@@ -1,12 +1,139 @@
 """
 Module: memory_braid – Maintains continuity of facts and themes across interactions.
+
+Concurrency model: one writer at a time, any number of readers.  Nodes are
+appended, one compact JSON object per line, to ``braid_history.jsonl``.
+Writers hold the ``.braid.lock`` :class:`~src.locking.FileLock` while they
+append; readers never take it.  A line becomes part of the ledger once its
+newline is on disk, so a reader that stops at the last complete line always
+sees a consistent prefix of the history, and each refresh reads only the bytes
+appended since its previous one.  ``braid_history.json`` is kept as a
+periodic, atomically replaced snapshot for tools that want a single JSON
+document, and a directory holding only that legacy file is migrated to the
+log by the first update.
 """
 
-import json
-import os
 import hashlib
+import logging
+import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+
+from . import codec
+from .atomic import atomic_write
+from .config_loader import load_config, loads
+from .locking import FileLock
+from .merkle import MerkleLog, verify_proof
+from .parse_metrics import timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_DIR = os.path.join("data", "memory_braid")
+HISTORY_LOG = "braid_history.jsonl"
+HISTORY_SNAPSHOT = "braid_history.json"
+LOCK_NAME = ".braid.lock"
+# Rewriting the snapshot costs O(history); the log append is O(1)
+SNAPSHOT_EVERY = 100
+
+
+class BraidCorruptionError(ValueError):
+    """Raised when the history is unreadable or fails verification."""
+
+
+class BraidReader:
+    """Lock-free, incrementally refreshed view of a braid history.
+
+    ``nodes`` holds every complete node read so far.  :meth:`refresh` reads
+    only what was appended since the previous call; if the log was replaced
+    rather than appended to, it is re-read from the start and ``generation``
+    is incremented.  Reading stops before a complete line that cannot be
+    parsed and ``corrupt_at`` records its byte offset.
+    """
+
+    def __init__(self, memory_dir: str = DEFAULT_MEMORY_DIR) -> None:
+        self.memory_dir = memory_dir
+        self.log_path = os.path.join(memory_dir, HISTORY_LOG)
+        self.snapshot_path = os.path.join(memory_dir, HISTORY_SNAPSHOT)
+        self.nodes: List[Dict] = []
+        self.generation = 0
+        self._log_id: Optional[tuple] = None
+        self._offset = 0
+        self._snapshot_seen: Optional[tuple] = None
+        self.corrupt_at: Optional[int] = None
+        self.refresh()
+
+    @property
+    def long_term(self) -> List[Dict]:
+        return self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def _reset(self) -> None:
+        self.nodes = []
+        self.generation += 1
+        self._log_id = None
+        self._offset = 0
+        self._snapshot_seen = None
+        self.corrupt_at = None
+
+    def _refresh_snapshot(self) -> int:
+        # No log yet: fall back to the legacy single-document history
+        try:
+            st = os.stat(self.snapshot_path)
+        except OSError:
+            if self.nodes or self._log_id is not None:
+                self._reset()
+            return 0
+        seen = (st.st_mtime_ns, st.st_size)
+        if seen == self._snapshot_seen and self._log_id is None:
+            return 0
+        try:
+            data = codec.read_json(self.snapshot_path)
+        except (OSError, ValueError):
+            return 0
+        self._reset()
+        self._snapshot_seen = seen
+        if isinstance(data, list):
+            self.nodes = data
+        return len(self.nodes)
+
+    def refresh(self) -> int:
+        """Read nodes appended since the last refresh and return how many."""
+        try:
+            st = os.stat(self.log_path)
+        except OSError:
+            return self._refresh_snapshot()
+        log_id = (st.st_dev, st.st_ino)
+        if log_id != self._log_id or st.st_size < self._offset:
+            self._reset()
+            self._log_id = log_id
+        if st.st_size == self._offset or self.corrupt_at is not None:
+            return 0
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(st.st_size - self._offset)
+        # A line without its newline is still being written
+        end = data.rfind(b"\n") + 1
+        added = 0
+        start = 0
+        while start < end:
+            stop = data.index(b"\n", start) + 1
+            line = data[start:stop]
+            if line.strip():
+                try:
+                    node = codec.loads(line)
+                except ValueError:
+                    self.corrupt_at = self._offset + start
+                    logger.error("Corrupt braid history line at byte %d of %s", self.corrupt_at, self.log_path)
+                    break
+                self.nodes.append(node)
+                added += 1
+            start = stop
+        self._offset += start
+        return added
 
 
 class MemoryBraid:
@@ -14,20 +141,25 @@ class MemoryBraid:
 
     The braid integrates new facts across agent interactions while preserving a
     chain of symbolic anchors defined in ``VAULTIS.yml``.  Long-term state is
-    stored as a sequence of nodes in ``braid_history.json``.
+    appended to ``braid_history.jsonl``; :meth:`update` and :meth:`checkpoint`
+    take the cross-process writer lock themselves, so several processes may
+    update the same ``memory_dir``.  ``snapshot_every`` controls how often
+    ``braid_history.json`` is rewritten (``0`` only on :meth:`checkpoint`).
     """
 
     def __init__(
         self,
         config_path: str = "VAULTIS.yml",
-        memory_dir: str = os.path.join("data", "memory_braid"),
+        memory_dir: str = DEFAULT_MEMORY_DIR,
         short_term_limit: int = 5,
         truth_files: Optional[List[str]] | None = None,
         template_files: Optional[List[str]] | None = None,
         gpt_config_files: Optional[List[str]] | None = None,
+        snapshot_every: int = SNAPSHOT_EVERY,
     ) -> None:
         self.memory_dir = memory_dir
         self.short_term_limit = short_term_limit
+        self.snapshot_every = snapshot_every
 
         self.truth_files = truth_files or []
         self.template_files = template_files or []
@@ -47,30 +179,32 @@ class MemoryBraid:
         )
 
         self.short_term: List[Dict] = []
-        self.history_path = os.path.join(self.memory_dir, "braid_history.json")
-        self.long_term: List[Dict] = self._load_history()
+        self._reader = BraidReader(self.memory_dir)
+        self.log_path = self._reader.log_path
+        self.history_path = self._reader.snapshot_path
+        self.checkpoints_path = os.path.join(self.memory_dir, "braid_checkpoints.json")
+        self._lock = FileLock(os.path.join(self.memory_dir, LOCK_NAME))
+        self._write_guard = threading.RLock()
+        self._write_depth = 0
+        self._updates = 0
+        self._generation = self._reader.generation
+        self.merkle = MerkleLog(
+            node.get("truth_vector_hash", "") for node in self.long_term
+        )
+
+    @property
+    def long_term(self) -> List[Dict]:
+        return self._reader.nodes
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
     def _load_config(self, path: str) -> Dict:
         try:
-            import yaml
-
-            with open(path, "r", encoding="utf-8") as f:
-                return yaml.safe_load(f) or {}
+            data = load_config(path)
         except Exception:
             return {}
-
-    def _load_history(self) -> List[Dict]:
-        try:
-            with open(self.history_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                return data
-        except Exception:
-            pass
-        return []
+        return data if isinstance(data, dict) else {}
 
     def _load_files(self, paths: List[str]) -> Dict[str, str]:
         """Return mapping of basename -> file contents for ``paths``."""
@@ -110,9 +244,55 @@ class MemoryBraid:
             .replace("+00:00", "Z")
         )
 
-    def _save_history(self) -> None:
-        with open(self.history_path, "w", encoding="utf-8") as f:
-            json.dump(self.long_term, f, indent=2)
+    def _sync(self) -> bool:
+        """Catch up with the log; return ``True`` if ``long_term`` changed."""
+        added = self._reader.refresh()
+        if self._reader.generation != self._generation:
+            self._generation = self._reader.generation
+            self.merkle = MerkleLog(node.get("truth_vector_hash", "") for node in self.long_term)
+            return True
+        if added:
+            for node in self.long_term[-added:]:
+                self.merkle.append(node.get("truth_vector_hash", ""))
+        return bool(added)
+
+    def _prepare_log(self) -> None:
+        # Called with the writer lock held: nobody else can append now
+        self._sync()
+        if not os.path.exists(self.log_path):
+            # First write, or a directory with only a legacy braid_history.json
+            atomic_write(self.log_path, b"".join(codec.dumps(node) + b"\n" for node in self.long_term))
+            self._sync()
+        offset = self._reader._offset
+        with open(self.log_path, "r+b") as f:
+            f.seek(offset)
+            tail = f.read()
+            if b"\n" in tail:
+                # Never cut away complete records behind an unreadable one
+                raise BraidCorruptionError(
+                    f"{self.log_path}: unparseable node at byte {offset}; "
+                    "repair or remove that line before writing"
+                )
+            if tail:
+                # A writer died mid-append; drop the fragment so our line starts clean
+                f.truncate(offset)
+
+    def _append(self, node: Dict) -> None:
+        line = codec.dumps(node) + b"\n"
+        with open(self.log_path, "ab") as f:
+            f.write(line)
+        self._reader.nodes.append(node)
+        self._reader._offset += len(line)
+        self.merkle.append(node["truth_vector_hash"])
+
+    def _load_checkpoints(self) -> List[Dict]:
+        try:
+            data = codec.read_json(self.checkpoints_path)
+            if isinstance(data, list):
+                return data
+        except Exception:
+            pass
+        return []
 
     def _latest_node(self) -> Dict:
         return self.long_term[-1] if self.long_term else {}
@@ -120,13 +300,48 @@ class MemoryBraid:
     def _hash_node(self, node: Dict) -> str:
         copy = dict(node)
         copy.pop("truth_vector_hash", None)
-        serialized = json.dumps(copy, sort_keys=True).encode("utf-8")
-        return hashlib.sha256(serialized).hexdigest()
+        return hashlib.sha256(codec.canonical_bytes(copy)).hexdigest()
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
+    def reload(self) -> bool:
+        """Read nodes other processes have appended since the last call.
+
+        Only the new part of the log is read.  Returns ``True`` when the
+        in-memory ledger changed.
+        """
+        return self._sync()
+
+    @contextmanager
+    def writing(self) -> Iterator["MemoryBraid"]:
+        """Hold the writer lock, caught up with every node appended so far.
+
+        :meth:`update` and :meth:`checkpoint` enter it themselves; wrap
+        several calls in it to make them one uninterrupted sequence.
+        Readers are never blocked.
+        """
+        with self._write_guard:
+            if not self._write_depth:
+                self._lock.acquire()
+            self._write_depth += 1
+            try:
+                if self._write_depth == 1:
+                    self._prepare_log()
+                yield self
+            finally:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._lock.release()
+
+    def snapshot(self) -> str:
+        """Atomically rewrite ``braid_history.json`` and return its path."""
+        with self.writing():
+            atomic_write(self.history_path, codec.dumps(self.long_term, indent=True), fsync=False)
+        return self.history_path
+
+    @timed("braid_update")
     def update(
         self,
         new_facts: Dict,
@@ -140,6 +355,19 @@ class MemoryBraid:
         if not isinstance(new_facts, dict):
             raise TypeError("new_facts must be a dictionary")
 
+        with self.writing():
+            self._update(new_facts, truth_files, template_files, gpt_config_files)
+            self._updates += 1
+            if self.snapshot_every and self._updates % self.snapshot_every == 0:
+                self.snapshot()
+
+    def _update(
+        self,
+        new_facts: Dict,
+        truth_files: Optional[List[str]],
+        template_files: Optional[List[str]],
+        gpt_config_files: Optional[List[str]],
+    ) -> None:
         self.short_term.append(new_facts)
         if len(self.short_term) > self.short_term_limit:
             self.short_term = self.short_term[-self.short_term_limit :]
@@ -175,13 +403,11 @@ class MemoryBraid:
             node["templates"] = templates
 
         if cfg_paths:
-            import yaml
-
             configs: Dict[str, Dict] = {}
             raw_configs = self._load_files(cfg_paths)
             for name, text in raw_configs.items():
                 try:
-                    data = yaml.safe_load(text) if text else {}
+                    data = loads(text) if text else {}
                 except Exception:
                     data = {}
                 handshake = self._extract_handshake(data)
@@ -190,6 +416,85 @@ class MemoryBraid:
                 node["gpt_configs"] = configs
 
         node["truth_vector_hash"] = self._hash_node(node)
+        self._append(node)
+
+    def checkpoint(self) -> Dict:
+        """Record the Merkle root over the current ledger in ``braid_checkpoints.json``.
+
+        The nodes added since the previous checkpoint are verified first (see
+        :meth:`verify`), so a tampered ledger is never sealed under a new root.
+        The ``braid_history.json`` snapshot is refreshed at the same time.
+
+        Returns
+        -------
+        Dict
+            The checkpoint entry with ``size``, ``root`` and ``timestamp``.
+
+        Raises
+        ------
+        BraidCorruptionError
+            If the ledger fails verification against the previous checkpoint.
+        """
+        with self.writing():
+            if not self.verify():
+                raise BraidCorruptionError(
+                    f"{self.log_path}: ledger fails verification; refusing to checkpoint"
+                )
+            entry = {
+                "size": len(self.merkle),
+                "root": self.merkle.root(),
+                "timestamp": self._current_time(),
+            }
+            checkpoints = self._load_checkpoints()
+            checkpoints.append(entry)
+            atomic_write(self.checkpoints_path, codec.dumps(checkpoints, indent=True), fsync=False)
+            self.snapshot()
+        return entry
+
+    def verify(self, checkpoint: Optional[int] = -1) -> bool:
+        """Verify ledger integrity since a recorded checkpoint.
+
+        The stored node hashes up to the checkpoint must reproduce its Merkle
+        root; only nodes appended afterwards are rehashed and checked for
+        parent linkage.  Pass ``None`` (or use a ledger without checkpoints) to
+        rehash every node from genesis.
+
+        Parameters
+        ----------
+        checkpoint:
+            Index into the recorded checkpoints, ``-1`` for the latest.
+        """
+        start = 0
+        if checkpoint is not None:
+            checkpoints = self._load_checkpoints()
+            if checkpoints:
+                try:
+                    entry = checkpoints[checkpoint]
+                except IndexError:
+                    return False
+                start = int(entry["size"])
+                if start > len(self.long_term):
+                    return False
+                if self.merkle.root(start) != entry["root"]:
+                    return False
+
+        for idx in range(start, len(self.long_term)):
+            node = self.long_term[idx]
+            if node.get("truth_vector_hash") != self._hash_node(node):
+                return False
+            expected_parent = self.long_term[idx - 1].get("id") if idx else None
+            if node.get("parent_node") != expected_parent:
+                return False
+        return True
+
+    def prove(self, index: int) -> Dict:
+        """Return an O(log n) inclusion proof for the node at ``index``."""
+        proof = self.merkle.proof(index)
+        proof["node_hash"] = self.long_term[index]["truth_vector_hash"]
+        proof["root"] = self.merkle.root()
+        return proof
 
-        self.long_term.append(node)
-        self._save_history()
+    @staticmethod
+    def verify_proof(proof: Dict) -> bool:
+        """Check a proof produced by :meth:`prove` against its recorded root."""
+        return verify_proof(proof.get("node_hash", ""), proof, proof.get("root", ""))
@@ -1 +1,86 @@
-# Placeholder for memory_retriever.py
+"""
+Module: memory_retriever – Look up and search Memory Braid nodes.
+
+Node ids map to ledger positions and fact values are tokenised into an
+inverted index, so lookups and keyword queries do not scan the whole
+history.  The index is extended incrementally as the braid grows.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from .memory_ledger import BraidReader, MemoryBraid
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+def _tokens(value) -> Iterable[str]:
+    """Yield lower-case word tokens from nested fact keys and values."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _TOKEN_RE.findall(str(key).lower())
+            yield from _tokens(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _tokens(item)
+    elif value is not None:
+        yield from _TOKEN_RE.findall(str(value).lower())
+
+
+class MemoryRetriever:
+    """Index the long-term nodes of a :class:`MemoryBraid` for retrieval.
+
+    A read-only :class:`BraidReader` works too, so retrieval processes need
+    not construct a writer.
+    """
+
+    def __init__(self, braid: Union[MemoryBraid, BraidReader]) -> None:
+        self.braid = braid
+        self._positions: Dict[str, int] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._indexed = 0
+
+    def refresh(self) -> int:
+        """Index nodes appended since the last call; returns how many were added.
+
+        If the ledger was replaced by a shorter one (e.g. reloaded from
+        disk), the index is rebuilt from scratch.
+        """
+        nodes = self.braid.long_term
+        if len(nodes) < self._indexed:
+            self._positions.clear()
+            self._postings.clear()
+            self._indexed = 0
+        start = self._indexed
+        for position in range(start, len(nodes)):
+            node = nodes[position]
+            # Ids are second-resolution timestamps; the latest node wins
+            self._positions[str(node.get("id"))] = position
+            for token in set(_tokens(node.get("facts", {}))):
+                self._postings[token].add(position)
+        self._indexed = len(nodes)
+        return self._indexed - start
+
+    def get(self, node_id: str) -> Optional[Dict]:
+        """Return the node with ``node_id`` or ``None``."""
+        self.refresh()
+        position = self._positions.get(node_id)
+        return self.braid.long_term[position] if position is not None else None
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Return up to ``limit`` nodes ranked by matching query tokens.
+
+        Ties are broken in favour of newer nodes.  Each result carries the
+        node's ledger ``index`` and its ``score``.
+        """
+        self.refresh()
+        scores: Dict[int, int] = defaultdict(int)
+        for token in set(_TOKEN_RE.findall(query.lower())):
+            for position in self._postings.get(token, ()):
+                scores[position] += 1
+        ranked = sorted(scores.items(), key=lambda kv: (kv[1], kv[0]), reverse=True)[:limit]
+        return [
+            {"index": position, "score": score, "node": self.braid.long_term[position]}
+            for position, score in ranked
+        ]
@@ -0,0 +1,154 @@
+"""Append-only Merkle log over memory braid node hashes.
+
+The log is a Merkle Mountain Range: every appended leaf joins a forest of
+perfect binary trees ("peaks") whose sizes follow the binary representation of
+the leaf count.  Appending is amortised O(1), the root for any historical size
+is available in O(log n) and inclusion proofs are O(log n) hashes long.
+
+Leaves are the ``truth_vector_hash`` values stored on each braid node, so the
+log never re-serializes node JSON; only the nodes appended after a checkpoint
+have to be rehashed to confirm the ledger is intact.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+PEAK_PREFIX = b"\x02"
+
+
+def hash_leaf(node_hash: str) -> bytes:
+    """Return the Merkle leaf digest for a hex ``truth_vector_hash``."""
+    try:
+        raw = bytes.fromhex(node_hash)
+    except (TypeError, ValueError):
+        # Malformed hashes still get a leaf so tampering shows up in the root
+        raw = str(node_hash).encode("utf-8")
+    return hashlib.sha256(LEAF_PREFIX + raw).digest()
+
+
+def _hash_pair(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _bag_peaks(peaks: List[bytes]) -> bytes:
+    """Fold peaks (highest first) into a single root digest."""
+    if not peaks:
+        return hashlib.sha256(PEAK_PREFIX).digest()
+    root = peaks[-1]
+    for peak in reversed(peaks[:-1]):
+        root = hashlib.sha256(PEAK_PREFIX + peak + root).digest()
+    return root
+
+
+class MerkleLog:
+    """Incrementally maintained Merkle Mountain Range.
+
+    ``levels[h][j]`` holds the digest of the perfect subtree covering leaves
+    ``[j * 2**h, (j + 1) * 2**h)``.  Keeping every level costs roughly two
+    digests per leaf and makes historical roots and proofs cheap.
+    """
+
+    def __init__(self, leaves: Iterable[str] = ()) -> None:
+        self.levels: List[List[bytes]] = [[]]
+        for leaf in leaves:
+            self.append(leaf)
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _peak_positions(self, size: int) -> List[Tuple[int, int]]:
+        """Return ``(level, index)`` of every peak for a log of ``size``."""
+        positions: List[Tuple[int, int]] = []
+        offset = 0
+        for height in range(size.bit_length() - 1, -1, -1):
+            if size & (1 << height):
+                positions.append((height, offset >> height))
+                offset += 1 << height
+        return positions
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def append(self, node_hash: str) -> None:
+        """Append the ``truth_vector_hash`` of a new braid node."""
+        digest = hash_leaf(node_hash)
+        height = 0
+        self.levels[0].append(digest)
+        while len(self.levels[height]) % 2 == 0:
+            level = self.levels[height]
+            if height + 1 == len(self.levels):
+                self.levels.append([])
+            self.levels[height + 1].append(_hash_pair(level[-2], level[-1]))
+            height += 1
+
+    def peaks(self, size: Optional[int] = None) -> List[bytes]:
+        """Return the peak digests (highest first) for the first ``size`` leaves."""
+        size = len(self) if size is None else size
+        if size < 0 or size > len(self):
+            raise ValueError(f"size {size} outside log of {len(self)} leaves")
+        return [self.levels[h][i] for h, i in self._peak_positions(size)]
+
+    def root(self, size: Optional[int] = None) -> str:
+        """Return the hex root committing to the first ``size`` leaves."""
+        return _bag_peaks(self.peaks(size)).hex()
+
+    def proof(self, index: int, size: Optional[int] = None) -> Dict:
+        """Return an inclusion proof for leaf ``index`` in a log of ``size``.
+
+        The proof holds the sibling path up to the leaf's peak plus the other
+        peaks of the range, both O(log n) in length.
+        """
+        size = len(self) if size is None else size
+        if not 0 <= index < size <= len(self):
+            raise IndexError(f"leaf {index} not in log of {size} leaves")
+
+        positions = self._peak_positions(size)
+        offset = 0
+        for peak_pos, (height, _) in enumerate(positions):
+            if index < offset + (1 << height):
+                break
+            offset += 1 << height
+
+        path: List[Tuple[str, str]] = []
+        pos = index
+        for level in range(height):
+            sibling = pos ^ 1
+            side = "left" if sibling < pos else "right"
+            path.append((side, self.levels[level][sibling].hex()))
+            pos >>= 1
+
+        return {
+            "index": index,
+            "size": size,
+            "path": path,
+            "peak_position": peak_pos,
+            "peaks": [self.levels[h][i].hex() for h, i in positions],
+        }
+
+
+def verify_proof(node_hash: str, proof: Dict, root: str) -> bool:
+    """Check that ``node_hash`` is included under ``root`` according to ``proof``."""
+    try:
+        digest = hash_leaf(node_hash)
+        for side, sibling_hex in proof["path"]:
+            sibling = bytes.fromhex(sibling_hex)
+            if side == "left":
+                digest = _hash_pair(sibling, digest)
+            else:
+                digest = _hash_pair(digest, sibling)
+        peaks = [bytes.fromhex(p) for p in proof["peaks"]]
+        if peaks[proof["peak_position"]] != digest:
+            return False
+        return _bag_peaks(peaks).hex() == root
+    except (KeyError, IndexError, TypeError, ValueError):
+        return False
+
+
+__all__ = ["MerkleLog", "hash_leaf", "verify_proof"]
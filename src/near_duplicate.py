@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""Near-duplicate report detection with MinHash and a persistent LSH index.
+
+SHA-256 only catches byte-identical copies; feeds that republish a story
+with trivial edits produce a new hash every time.  Each report is reduced to
+a set of word shingles, summarised as a MinHash signature (``NUM_PERM``
+values whose agreement rate estimates the Jaccard similarity of two shingle
+sets) and split into ``BANDS`` bands.  Reports sharing any band bucket are
+candidates; candidates whose estimated similarity reaches ``threshold`` are
+near-duplicates.  Bucket lookups go through an SQLite index, so finding
+candidates costs ``BANDS`` index probes however large the corpus grows.
+
+Every report joins a cluster: the first report of a story is its
+representative, and later near-duplicates point at it, so downstream stages
+can process one report per cluster::
+
+    index = NearDuplicateIndex()
+    match = index.assign("report_b", text)
+    if match is not None:
+        print(match.representative, match.similarity)
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Set
+
+try:  # Optional, vectorised signatures
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+
+INDEX_NAME = "near_duplicates.sqlite3"
+INDEX_PATH = os.path.join("data", "analysis_output", INDEX_NAME)
+SHINGLE_WORDS = 5
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+DEFAULT_THRESHOLD = 0.8
+
+# Universal hashing h(x) = (a*x + b) mod p over 32-bit shingle hashes; with
+# a, b < 2**32 the products fit in uint64, so NumPy and Python agree exactly
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED18)
+_A = [_rng.randrange(1, 1 << 32) for _ in range(NUM_PERM)]
+_B = [_rng.randrange(0, 1 << 32) for _ in range(NUM_PERM)]
+del _rng
+_SIG = struct.Struct(f"<{NUM_PERM}Q")
+_CHUNK = 4096
+_WORD_RE = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    representative TEXT NOT NULL,
+    similarity REAL NOT NULL,
+    signature BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_representative ON documents (representative);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    doc_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_lookup ON bands (band, bucket);
+"""
+
+
+@dataclass
+class Match:
+    """A report's closest earlier near-duplicate and its cluster."""
+
+    duplicate_of: str
+    representative: str
+    similarity: float
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> Set[int]:
+    """Return 32-bit hashes of the ``size``-word shingles of ``text``.
+
+    Case, punctuation and whitespace are ignored, so reformatting a report
+    does not change its shingles.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return set()
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+
+def signature(shingle_hashes: Set[int]) -> List[int]:
+    """Return the MinHash signature of a non-empty shingle set."""
+    if not shingle_hashes:
+        raise ValueError("cannot sign an empty shingle set")
+    if np is None:
+        values = list(shingle_hashes)
+        return [min((a * x + b) % _PRIME for x in values) for a, b in zip(_A, _B)]
+    values = np.fromiter(shingle_hashes, dtype=np.uint64, count=len(shingle_hashes))
+    a = np.array(_A, dtype=np.uint64)[:, None]
+    b = np.array(_B, dtype=np.uint64)[:, None]
+    mins = np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(values), _CHUNK):
+        hashed = (a * values[start:start + _CHUNK] + b) % np.uint64(_PRIME)
+        np.minimum(mins, hashed.min(axis=1), out=mins)
+    return [int(v) for v in mins]
+
+
+def similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """Estimate the Jaccard similarity of two documents from their signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def _buckets(sig: Sequence[int]) -> List[int]:
+    """Hash each band of ``sig`` to a signed 64-bit bucket id."""
+    buckets = []
+    for band in range(BANDS):
+        rows = struct.pack(f"<{ROWS}Q", *sig[band * ROWS:(band + 1) * ROWS])
+        buckets.append(int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), "little", signed=True))
+    return buckets
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash LSH index that clusters near-identical reports."""
+
+    def __init__(self, path: str = INDEX_PATH, threshold: float = DEFAULT_THRESHOLD) -> None:
+        self.path = path
+        self.threshold = threshold
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _best_match(self, doc_id: str, sig: List[int], buckets: List[int]) -> Optional[Match]:
+        candidates = set()
+        for band, bucket in enumerate(buckets):
+            for (other,) in self._conn.execute(
+                "SELECT doc_id FROM bands WHERE band = ? AND bucket = ?", (band, bucket)
+            ):
+                candidates.add(other)
+        candidates.discard(doc_id)
+        best: Optional[Match] = None
+        for other in sorted(candidates):
+            row = self._conn.execute(
+                "SELECT representative, signature FROM documents WHERE doc_id = ?", (other,)
+            ).fetchone()
+            if row is None:
+                continue
+            score = similarity(sig, _SIG.unpack(row[1]))
+            if score >= self.threshold and (best is None or score > best.similarity):
+                best = Match(duplicate_of=other, representative=row[0], similarity=score)
+        return best
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def find(self, text: str, doc_id: str = "") -> Optional[Match]:
+        """Return the closest indexed near-duplicate of ``text`` without adding it."""
+        shingle_hashes = shingles(text)
+        if not shingle_hashes:
+            return None
+        sig = signature(shingle_hashes)
+        with self._lock:
+            return self._best_match(doc_id, sig, _buckets(sig))
+
+    def assign(self, doc_id: str, text: str) -> Optional[Match]:
+        """Index ``text`` as ``doc_id`` and return its near-duplicate match.
+
+        ``None`` means the report starts a new cluster (or has no words to
+        compare).  Re-assigning an existing ``doc_id`` replaces its entry.
+        """
+        shingle_hashes = shingles(text)
+        if not shingle_hashes:
+            return None
+        sig = signature(shingle_hashes)
+        buckets = _buckets(sig)
+        with self._lock:
+            # IMMEDIATE serialises concurrent writers (threads or processes),
+            # so two copies of one story cannot both become representatives.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                match = self._best_match(doc_id, sig, buckets)
+                if match is not None and match.representative == doc_id:
+                    match = None  # re-assigned representative of its own cluster
+                representative = match.representative if match else doc_id
+                self._conn.execute("DELETE FROM bands WHERE doc_id = ?", (doc_id,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                    (doc_id, representative, match.similarity if match else 1.0, _SIG.pack(*sig)),
+                )
+                self._conn.executemany(
+                    "INSERT INTO bands VALUES (?, ?, ?)",
+                    [(band, bucket, doc_id) for band, bucket in enumerate(buckets)],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return match
+
+    def representative(self, doc_id: str) -> Optional[str]:
+        """Return the representative of ``doc_id``'s cluster, if indexed."""
+        row = self._conn.execute("SELECT representative FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+        return row[0] if row else None
+
+    def cluster(self, doc_id: str) -> List[str]:
+        """Return every member of ``doc_id``'s cluster, representative first."""
+        representative = self.representative(doc_id)
+        if representative is None:
+            return []
+        rows = self._conn.execute(
+            "SELECT doc_id FROM documents WHERE representative = ? AND doc_id != ? ORDER BY doc_id",
+            (representative, representative),
+        )
+        return [representative] + [row[0] for row in rows]
+
+    def clusters(self, min_size: int = 2) -> List[List[str]]:
+        """Return all clusters with at least ``min_size`` members."""
+        rows = self._conn.execute(
+            "SELECT representative FROM documents GROUP BY representative HAVING COUNT(*) >= ? ORDER BY representative",
+            (min_size,),
+        ).fetchall()
+        return [self.cluster(row[0]) for row in rows]
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect near-duplicate report clusters")
+    parser.add_argument("--index", default=INDEX_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("clusters", help="list clusters with more than one report")
+    check_p = sub.add_parser("check", help="look up a file's closest indexed near-duplicate")
+    check_p.add_argument("path")
+    check_p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == "clusters":
+        index = NearDuplicateIndex(args.index)
+        for members in index.clusters():
+            print(json.dumps({"representative": members[0], "members": members}))
+        return 0
+    index = NearDuplicateIndex(args.index, args.threshold)
+    with open(args.path, "r", encoding="utf-8") as f:
+        match = index.find(f.read())
+    print(json.dumps(match.__dict__ if match else None))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
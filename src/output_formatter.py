@@ -1 +1,398 @@
-# Placeholder for output_formatter.py
+#!/usr/bin/env python3
+"""Render final briefs and alerts from Codex18 outputs.
+
+Records are streamed from three sources and rendered one fragment at a time:
+
+* ingest records in ``data/analysis_output/*.json``
+* drift logs in ``data/analysis_output/drift_logs/``
+* OODA summaries in ``data/analysis_output/summaries/``
+
+Briefs are produced by generators, so a document is written chunk by chunk
+and never held in memory as a whole.  An SQLite index next to the briefs
+remembers every source file with its record timestamp and rendered
+fragments.  A directory whose mtime has not changed is not listed again;
+drift logs (timestamp-named and written once) are only listed past the last
+name seen, and the other directories are diffed against the index by inode
+without a ``stat`` per file.  Re-running a brief therefore only parses and
+renders records that are new or replaced, files last modified before the
+requested window are not even parsed, and the records of a window are read
+from the index by timestamp, so a daily brief scales with the day's data
+rather than the whole history.  Sources are expected to be replaced by
+rename (as :mod:`src.atomic` does) or written once::
+
+    python src/output_formatter.py --date 2025-05-20 --format md --output brief.md
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import os
+import sqlite3
+import stat
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+if __package__ in (None, ""):
+    # Allow ``python src/output_formatter.py`` to import sibling modules.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.atomic import atomic_open
+
+OUTPUT_DIR = os.path.join("data", "analysis_output")
+LOGS_DIR = os.path.join(OUTPUT_DIR, "drift_logs")
+SUMMARIES_DIR = os.path.join(OUTPUT_DIR, "summaries")
+CACHE_PATH = os.path.join(OUTPUT_DIR, "briefs", ".fragments.sqlite3")
+
+FORMATS = ("md", "json", "html")
+# File names are timestamps and files are never rewritten
+SORTED_KINDS = frozenset({"drift"})
+EXCERPT_CHARS = 280
+OODA_KEYS = ("Observe", "Orient", "Decide", "Act")
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    kind TEXT NOT NULL, name TEXT NOT NULL, inode INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,
+    parsed INTEGER NOT NULL DEFAULT 0, timestamp TEXT, item TEXT,
+    PRIMARY KEY (kind, name)
+);
+CREATE INDEX IF NOT EXISTS files_timestamp ON files (kind, parsed, timestamp);
+CREATE INDEX IF NOT EXISTS files_pending ON files (kind, parsed, mtime_ns);
+CREATE TABLE IF NOT EXISTS fragments (
+    kind TEXT NOT NULL, name TEXT NOT NULL, fmt TEXT NOT NULL, text TEXT NOT NULL,
+    PRIMARY KEY (kind, name, fmt)
+);
+CREATE TABLE IF NOT EXISTS marks (kind TEXT PRIMARY KEY, dir_mtime_ns INTEGER NOT NULL, last_name TEXT NOT NULL);
+"""
+
+
+def _parse_ts(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+# ----------------------------------------------------------------------
+# Record condensers: source record -> the fields a brief shows
+# ----------------------------------------------------------------------
+def _condense_report(name: str, record: Dict) -> Optional[Dict]:
+    if "sha256" not in record or "ingest_timestamp" not in record:
+        return None  # e.g. latest_drift_report.json
+    metadata = record.get("metadata") if isinstance(record.get("metadata"), dict) else {}
+    content = str(record.get("content", ""))
+    excerpt = " ".join(content.split())[:EXCERPT_CHARS]
+    return {
+        "source": record.get("source") or os.path.splitext(name)[0],
+        "timestamp": record["ingest_timestamp"],
+        "title": str(metadata.get("title") or os.path.splitext(name)[0]),
+        "tags": [str(t) for t in metadata.get("tags") or []],
+        "sha256": record["sha256"],
+        "excerpt": excerpt,
+    }
+
+
+def _condense_drift(name: str, record: Dict) -> Optional[Dict]:
+    if "vector" not in record:
+        return None
+    diffs = record.get("diff_anchor") or [0.0]
+    return {
+        "timestamp": record.get("timestamp"),
+        "alarm": bool(record.get("alarm")),
+        "vector": record["vector"],
+        "max_drift": max(float(d) for d in diffs),
+    }
+
+
+def _condense_summary(name: str, record: Dict) -> Optional[Dict]:
+    if not all(key in record for key in OODA_KEYS):
+        return None
+    item = {key: str(record[key]) for key in OODA_KEYS}
+    item["source"] = record.get("source") or os.path.splitext(name)[0]
+    item["timestamp"] = record.get("timestamp")
+    return item
+
+
+# ----------------------------------------------------------------------
+# Fragment renderers: condensed item -> text in one output format
+# ----------------------------------------------------------------------
+def _md_fragment(kind: str, item: Dict) -> str:
+    if kind == "reports":
+        tags = f" _[{', '.join(item['tags'])}]_" if item["tags"] else ""
+        return (
+            f"### {item['title']}{tags}\n\n"
+            f"- Ingested: {item['timestamp']}\n- SHA-256: `{item['sha256'][:12]}`\n\n"
+            f"> {item['excerpt']}\n\n"
+        )
+    if kind == "drift":
+        flag = "**ALARM**" if item["alarm"] else "ok"
+        vector = ", ".join(f"{v:.3f}" for v in item["vector"])
+        return f"- {item['timestamp']} {flag} max drift {item['max_drift']:.3f} ({vector})\n"
+    lines = "".join(f"- **{key}:** {item[key]}\n" for key in OODA_KEYS)
+    return f"### {item['source']}\n\n{lines}\n"
+
+
+def _html_fragment(kind: str, item: Dict) -> str:
+    esc = html.escape
+    if kind == "reports":
+        tags = "".join(f"<span class=\"tag\">{esc(t)}</span>" for t in item["tags"])
+        return (
+            f"<article><h3>{esc(item['title'])}</h3>{tags}"
+            f"<p class=\"meta\">Ingested {esc(item['timestamp'])} &middot; {esc(item['sha256'][:12])}</p>"
+            f"<blockquote>{esc(item['excerpt'])}</blockquote></article>\n"
+        )
+    if kind == "drift":
+        cls = "alarm" if item["alarm"] else "ok"
+        vector = ", ".join(f"{v:.3f}" for v in item["vector"])
+        return (
+            f"<li class=\"{cls}\">{esc(str(item['timestamp']))} max drift "
+            f"{item['max_drift']:.3f} ({vector})</li>\n"
+        )
+    rows = "".join(f"<dt>{key}</dt><dd>{esc(item[key])}</dd>" for key in OODA_KEYS)
+    return f"<article><h3>{esc(str(item['source']))}</h3><dl>{rows}</dl></article>\n"
+
+
+def _json_fragment(kind: str, item: Dict) -> str:
+    return json.dumps(item, ensure_ascii=False, sort_keys=True)
+
+
+RENDERERS: Dict[str, Callable[[str, Dict], str]] = {
+    "md": _md_fragment,
+    "html": _html_fragment,
+    "json": _json_fragment,
+}
+
+SECTIONS: Tuple[Tuple[str, str, Callable[[str, Dict], Optional[Dict]]], ...] = (
+    ("reports", "Reports", _condense_report),
+    ("drift", "Drift and Alerts", _condense_drift),
+    ("summaries", "Summaries", _condense_summary),
+)
+
+
+class BriefFormatter:
+    """Stream briefs from the output directories with an incremental index."""
+
+    def __init__(
+        self,
+        output_dir: str = OUTPUT_DIR,
+        logs_dir: str = LOGS_DIR,
+        summaries_dir: str = SUMMARIES_DIR,
+        cache_path: Optional[str] = CACHE_PATH,
+    ) -> None:
+        self.dirs = {"reports": output_dir, "drift": logs_dir, "summaries": summaries_dir}
+        self.cache_path = cache_path
+        if cache_path and os.path.dirname(cache_path):
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self._conn = sqlite3.connect(cache_path or ":memory:")
+        if cache_path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # The index is cheap to rebuild, so skip the fsyncs
+            self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.executescript(_SCHEMA)
+        self.stats = {"rendered": 0, "reused": 0, "skipped": 0}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _forget(self, kind: str, names: List[str]) -> None:
+        rows = [(kind, name) for name in names]
+        self._conn.executemany("DELETE FROM files WHERE kind=? AND name=?", rows)
+        self._conn.executemany("DELETE FROM fragments WHERE kind=? AND name=?", rows)
+
+    def _sync(self, kind: str) -> None:
+        """Record files added to or replaced in ``kind``'s directory since the last run."""
+        directory = self.dirs[kind]
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return
+        mark = self._conn.execute("SELECT dir_mtime_ns, last_name FROM marks WHERE kind=?", (kind,)).fetchone()
+        if mark is not None and mark[0] == dir_mtime:
+            return  # no file was created, renamed or removed
+        last_name = mark[1] if mark else ""
+        if kind in SORTED_KINDS:
+            changed = sorted(n for n in os.listdir(directory) if n.endswith(".json") and n > last_name)
+        else:
+            known = dict(self._conn.execute("SELECT name, inode FROM files WHERE kind=?", (kind,)))
+            with os.scandir(directory) as entries:
+                current = {e.name: e.inode() for e in entries if e.name.endswith(".json") and not e.name.startswith(".")}
+            self._forget(kind, [name for name in known if name not in current])
+            changed = sorted(name for name, inode in current.items() if known.get(name) != inode)
+        rows = []
+        for name in changed:
+            try:
+                st = os.stat(os.path.join(directory, name))
+            except FileNotFoundError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                rows.append((kind, name, st.st_ino, st.st_mtime_ns))
+        self._forget(kind, [row[1] for row in rows])
+        self._conn.executemany("INSERT INTO files (kind, name, inode, mtime_ns) VALUES (?, ?, ?, ?)", rows)
+        if changed:
+            last_name = max(last_name, changed[-1])
+        self._conn.execute("INSERT OR REPLACE INTO marks VALUES (?, ?, ?)", (kind, dir_mtime, last_name))
+
+    def _parse(self, kind: str, name: str) -> Optional[Dict]:
+        """Parse and condense one source file and store the result in the index."""
+        condense = dict((k, c) for k, _, c in SECTIONS)[kind]
+        try:
+            with open(os.path.join(self.dirs[kind], name), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        item = condense(name, record) if isinstance(record, dict) else None
+        ts = _parse_ts(item.get("timestamp")) if item else None
+        self._conn.execute(
+            "UPDATE files SET parsed=1, timestamp=?, item=? WHERE kind=? AND name=?",
+            (
+                ts.strftime("%Y-%m-%dT%H:%M:%SZ") if ts else None,
+                json.dumps(item, ensure_ascii=False) if item else None,
+                kind,
+                name,
+            ),
+        )
+        return item
+
+    def _fragments(
+        self, kind: str, fmt: str, since: Optional[datetime], until: Optional[datetime]
+    ) -> Iterator[str]:
+        """Yield rendered fragments for one section, oldest file name first."""
+        render = RENDERERS[fmt]
+        self._sync(kind)
+        since_ns = int(since.timestamp() * 1e9) if since else 0
+        if since_ns:
+            self.stats["skipped"] += self._conn.execute(
+                "SELECT COUNT(*) FROM files WHERE kind=? AND parsed=0 AND mtime_ns < ?", (kind, since_ns)
+            ).fetchone()[0]
+        low = since.strftime("%Y-%m-%dT%H:%M:%SZ") if since else ""
+        high = until.strftime("%Y-%m-%dT%H:%M:%SZ") if until else "~"
+        # Unparsed files written before the window opened cannot belong to it
+        rows = self._conn.execute(
+            "SELECT f.name, f.parsed, f.timestamp, f.item, g.text FROM files f "
+            "LEFT JOIN fragments g ON g.kind = f.kind AND g.name = f.name AND g.fmt = ? "
+            "WHERE f.kind = ? AND ((f.parsed = 1 AND (f.timestamp IS NULL OR (f.timestamp >= ? AND f.timestamp < ?))) "
+            "OR (f.parsed = 0 AND f.mtime_ns >= ?)) ORDER BY f.name",
+            (fmt, kind, low, high, since_ns),
+        ).fetchall()
+        for name, parsed, timestamp, item_text, text in rows:
+            if text is not None:
+                self.stats["reused"] += 1
+                yield text
+                continue
+            if not parsed:
+                self.stats["rendered"] += 1
+                item = self._parse(kind, name)
+                ts = _parse_ts(item.get("timestamp")) if item else None
+                if ts is not None and ((since and ts < since) or (until and ts >= until)):
+                    continue
+            elif item_text is None:
+                self.stats["reused"] += 1  # known not to be a record
+                continue
+            else:
+                self.stats["rendered"] += 1  # parsed before, first brief in this format
+                item = json.loads(item_text)
+            if item is None:
+                continue
+            text = render(kind, item)
+            self._conn.execute("INSERT OR REPLACE INTO fragments VALUES (?, ?, ?, ?)", (kind, name, fmt, text))
+            yield text
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def iter_brief(
+        self,
+        fmt: str = "md",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        title: str = "Codex18 Brief",
+    ) -> Iterator[str]:
+        """Yield the brief as text chunks in ``fmt`` (``md``, ``json`` or ``html``)."""
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format {fmt!r}; expected one of {FORMATS}")
+        generated = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        window = " to ".join(d.strftime("%Y-%m-%dT%H:%M:%SZ") for d in (since, until) if d) or "all records"
+
+        if fmt == "md":
+            yield f"# {title}\n\nGenerated {generated} ({window})\n\n"
+        elif fmt == "html":
+            yield (
+                f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head>"
+                f"<body>\n<h1>{html.escape(title)}</h1>\n<p>Generated {generated} ({html.escape(window)})</p>\n"
+            )
+        else:
+            yield json.dumps({"title": title, "generated": generated, "window": window})[:-1] + ', "sections": {'
+
+        for position, (kind, heading, _) in enumerate(SECTIONS):
+            count = 0
+            if fmt == "md":
+                yield f"## {heading}\n\n"
+            elif fmt == "html":
+                yield f"<section id=\"{kind}\"><h2>{heading}</h2>\n" + ("<ul>\n" if kind == "drift" else "")
+            else:
+                yield ("," if position else "") + f"{json.dumps(kind)}: ["
+            for fragment in self._fragments(kind, fmt, since, until):
+                if fmt == "json" and count:
+                    yield ","
+                yield fragment
+                count += 1
+            if fmt == "md":
+                yield "_No records._\n\n" if not count else "\n"
+            elif fmt == "html":
+                yield ("</ul>\n" if kind == "drift" else "") + ("<p>No records.</p>\n" if not count else "")
+                yield "</section>\n"
+            else:
+                yield "]"
+
+        if fmt == "html":
+            yield "</body></html>\n"
+        elif fmt == "json":
+            yield "}}\n"
+
+    def save_cache(self) -> None:
+        """Commit what this run added to the index."""
+        self._conn.commit()
+
+    def close(self) -> None:
+        self.save_cache()
+        self._conn.close()
+
+    def write_brief(self, path: str, fmt: str = "md", **kwargs) -> Dict[str, int]:
+        """Stream a brief to ``path`` and return render statistics."""
+        self.stats = {"rendered": 0, "reused": 0, "skipped": 0}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with atomic_open(path, "w") as f:
+            for chunk in self.iter_brief(fmt, **kwargs):
+                f.write(chunk)
+        self.save_cache()
+        return dict(self.stats)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Render a Codex18 brief")
+    parser.add_argument("--format", choices=FORMATS, default="md")
+    parser.add_argument("--date", help="UTC day (YYYY-MM-DD) to cover; default is all records")
+    parser.add_argument("--title", default="Codex18 Brief")
+    parser.add_argument("--output", help="file to write; default is stdout")
+    args = parser.parse_args(argv)
+
+    since = until = None
+    if args.date:
+        since = datetime.strptime(args.date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        until = since + timedelta(days=1)
+
+    formatter = BriefFormatter()
+    if args.output:
+        stats = formatter.write_brief(args.output, args.format, since=since, until=until, title=args.title)
+        print(json.dumps(stats), file=sys.stderr)
+    else:
+        for chunk in formatter.iter_brief(args.format, since=since, until=until, title=args.title):
+            sys.stdout.write(chunk)
+    formatter.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,293 @@
-# Placeholder for parse_metrics.py
+"""Lightweight hot-path metrics for Codex18.
+
+Counters and latency histograms are kept in a process-wide registry and can be
+exported in Prometheus text format or as a JSON snapshot with p50/p99
+estimates per stage.  Instrumentation is switched off by default; when
+disabled, :func:`timed` wrappers cost a single flag check and :func:`timer`
+returns a shared no-op context manager.
+
+Enable with ``CODEX_METRICS=1`` (or :func:`enable`).  Setting
+``CODEX_METRICS_SNAPSHOT=<path>`` additionally writes a JSON snapshot when the
+process exits.
+
+Usage::
+
+    from src.parse_metrics import timed, timer
+
+    @timed("braid_update")
+    def update(...): ...
+
+    with timer("ingest_parse"):
+        ...
+"""
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Exponential latency buckets from 10 microseconds to ~60 seconds.
+DEFAULT_BUCKETS: Tuple[float, ...] = tuple(1e-5 * 1.5 ** i for i in range(39))
+
+_enabled = os.getenv("CODEX_METRICS", "false").lower() in ("1", "true", "yes")
+
+
+class Counter:
+    """Monotonically increasing counter."""
+
+    def __init__(self, name: str, labels: Dict[str, str], help: str = "") -> None:
+        self.name = name
+        self.labels = labels
+        self.help = help
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    """Fixed-bucket histogram with interpolated quantile estimates."""
+
+    def __init__(
+        self, name: str, labels: Dict[str, str], help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.labels = labels
+        self.help = help
+        self.bounds: List[float] = sorted(buckets)
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[idx] += 1
+            self.count += 1
+            self.sum += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile (0..1) by interpolating within buckets."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[idx - 1] if idx > 0 else 0.0
+                upper = self.bounds[idx] if idx < len(self.bounds) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                fraction = (rank - seen) / bucket_count
+                return lower + (upper - lower) * fraction
+            seen += bucket_count
+        return self.max
+
+
+class MetricsRegistry:
+    """Registry of named, labelled counters and histograms."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, labels: Optional[Dict[str, str]], help: str, **kwargs):
+        labels = labels or {}
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = cls(name, labels, help, **kwargs)
+                    self._metrics[key] = metric
+        return metric
+
+    def counter(self, name: str, labels: Optional[Dict[str, str]] = None, help: str = "") -> Counter:
+        return self._get(Counter, name, labels, help)
+
+    def histogram(
+        self,
+        name: str,
+        labels: Optional[Dict[str, str]] = None,
+        help: str = "",
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get(Histogram, name, labels, help, buckets=buckets)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    def _items(self) -> List[Tuple[Tuple, Any]]:
+        # Other threads add label series under the lock while we export
+        with self._lock:
+            return list(self._metrics.items())
+
+    @staticmethod
+    def _label_text(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+        items = list(labels.items()) + ([extra] if extra else [])
+        if not items:
+            return ""
+        body = ",".join(
+            '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in items
+        )
+        return "{" + body + "}"
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        described: set = set()
+        for (name, _), metric in sorted(self._items(), key=lambda kv: kv[0]):
+            kind = "counter" if isinstance(metric, Counter) else "histogram"
+            if name not in described:
+                if metric.help:
+                    lines.append(f"# HELP {name} {metric.help}")
+                lines.append(f"# TYPE {name} {kind}")
+                described.add(name)
+            if isinstance(metric, Counter):
+                lines.append(f"{name}{self._label_text(metric.labels)} {metric.value:g}")
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(metric.bounds, metric.counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{self._label_text(metric.labels, ('le', f'{bound:.6g}'))} {cumulative}")
+            lines.append(f"{name}_bucket{self._label_text(metric.labels, ('le', '+Inf'))} {metric.count}")
+            lines.append(f"{name}_sum{self._label_text(metric.labels)} {metric.sum:.9g}")
+            lines.append(f"{name}_count{self._label_text(metric.labels)} {metric.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable summary including p50/p99 per histogram."""
+        counters: Dict[str, float] = {}
+        histograms: Dict[str, Dict[str, float]] = {}
+        for (name, _), metric in self._items():
+            key = name + self._label_text(metric.labels)
+            if isinstance(metric, Counter):
+                counters[key] = metric.value
+            else:
+                histograms[key] = {
+                    "count": metric.count,
+                    "sum": metric.sum,
+                    "mean": metric.sum / metric.count if metric.count else 0.0,
+                    "p50": metric.quantile(0.50),
+                    "p99": metric.quantile(0.99),
+                    "max": metric.max,
+                }
+        return {"counters": counters, "histograms": histograms}
+
+    def write_snapshot(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = "codex_stage_seconds"
+STAGE_ERRORS = "codex_stage_errors_total"
+
+
+def enable(flag: bool = True) -> None:
+    """Turn instrumentation on or off for the whole process."""
+    global _enabled
+    _enabled = flag
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+class _Timer:
+    __slots__ = ("histogram", "errors", "start")
+
+    def __init__(self, stage: str) -> None:
+        labels = {"stage": stage}
+        self.histogram = REGISTRY.histogram(STAGE_SECONDS, labels, "Time spent per stage call")
+        self.errors = REGISTRY.counter(STAGE_ERRORS, labels, "Stage calls that raised")
+        self.start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.histogram.observe(time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.errors.inc()
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(stage: str):
+    """Context manager timing a block under ``stage``; a no-op when disabled."""
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(stage)
+
+
+def timed(stage: str) -> Callable[[Callable], Callable]:
+    """Decorator recording the latency of every call under ``stage``."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(name: str, amount: float = 1.0, **labels: str) -> None:
+    """Increment counter ``name`` when metrics are enabled."""
+    if _enabled:
+        REGISTRY.counter(name, labels).inc(amount)
+
+
+_snapshot_path = os.getenv("CODEX_METRICS_SNAPSHOT")
+if _enabled and _snapshot_path:
+    atexit.register(REGISTRY.write_snapshot, _snapshot_path)
+
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "count",
+    "enable",
+    "enabled",
+    "timed",
+    "timer",
+]
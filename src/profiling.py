@@ -0,0 +1,287 @@
+"""On-demand profiling for Codex18 runs.
+
+Profiling is opt-in.  Set ``CODEX_PROFILE`` to ``sample`` or ``cprofile``
+(or pass ``--profile`` to the ingest and pipeline scripts) and the run is
+recorded with one of two modes:
+
+``sample``
+    A background thread snapshots every thread's stack with
+    :func:`sys._current_frames` each ``interval`` seconds.  Overhead is bounded
+    by the interval rather than by how much Python code runs, so this is the
+    mode to leave on for a long or production-sized run.  Threads parked in
+    a blocking wait (``Condition.wait``, ``Queue.get``, a selector, an idle
+    executor worker) are left out, or idle pools would dominate the profile;
+    pass ``all_threads=True`` (``--all-threads``) to keep them.  The output
+    is a collapsed-stack file (``frame;frame;frame count``) that
+    ``flamegraph.pl``, speedscope or inferno read directly.
+
+``cprofile``
+    Deterministic :mod:`cProfile` of the calling thread.  Exact call counts,
+    but every function call pays for the hook.  Writes a ``.pstats`` file and
+    caller/callee collapsed stacks derived from the profile.
+
+Either mode reports the top-N hottest functions, which the scripts add to
+their run report.  Any other script can be profiled from the outside::
+
+    python src/profiling.py --mode sample --output-dir /tmp/prof src/loopstate_tracker.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import queue
+import selectors
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import thread as _futures_thread
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:  # cProfile/pstats are imported on use to keep startup cheap
+    import cProfile
+
+if __package__ in (None, ""):
+    # Let profiled scripts import ``src`` and ``core`` like they do standalone.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROFILE_DIR = os.path.join("data", "analysis_output", "profiles")
+MODES = ("sample", "cprofile")
+
+# Sampling faster than this costs more than it tells.
+MIN_INTERVAL = 0.001
+# Deep recursion would otherwise make each sample arbitrarily expensive.
+MAX_DEPTH = 128
+
+_SELECTORS = ("SelectSelector", "PollSelector", "EpollSelector", "DevpollSelector", "KqueueSelector")
+# Innermost Python frames of a thread blocked waiting for work or I/O.
+# Thread._wait_for_tstate_lock (a join) is gone in Python 3.13.
+IDLE_CODES = frozenset(
+    func.__code__
+    for func in [
+        threading.Condition.wait,
+        getattr(threading.Thread, "_wait_for_tstate_lock", None),
+        queue.Queue.get,
+        _futures_thread._worker,
+    ]
+    + [getattr(selectors, name).select for name in _SELECTORS if hasattr(selectors, name)]
+    if func is not None
+)
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class Profiler:
+    """Record a run with the ``sample`` or ``cprofile`` mode.
+
+    Use as a context manager, or call :meth:`start` and :meth:`stop`.  After
+    stopping, :meth:`collapsed` returns flamegraph input and :meth:`top`
+    returns the hottest functions.
+    """
+
+    def __init__(
+        self, mode: str = "sample", interval: float = 0.005, label: str = "run", all_threads: bool = False
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"unknown profiling mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.interval = max(float(interval), MIN_INTERVAL)
+        self.label = label
+        self.all_threads = all_threads
+        self.samples = 0
+        self.elapsed = 0.0
+        self._stacks: Counter = Counter()
+        self._profile: Optional[cProfile.Profile] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._start = 0.0
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (not self.all_threads and frame.f_code in IDLE_CODES):
+                    continue
+                stack: List[str] = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def _pstats_stacks(self) -> Counter:
+        """Collapse cProfile data into ``caller;callee`` stacks weighted in microseconds."""
+        import pstats
+
+        stacks: Counter = Counter()
+        stats = pstats.Stats(self._profile)
+        for func, (_, _, tottime, _, callers) in stats.stats.items():  # type: ignore[attr-defined]
+            name = f"{os.path.basename(func[0])}:{func[2]}"
+            if not callers:
+                stacks[name] += int(tottime * 1e6)
+                continue
+            total_calls = sum(c[0] for c in callers.values()) or 1
+            for caller, (calls, *_rest) in callers.items():
+                caller_name = f"{os.path.basename(caller[0])}:{caller[2]}"
+                stacks[f"{caller_name};{name}"] += int(tottime * 1e6 * calls / total_calls)
+        return Counter({k: v for k, v in stacks.items() if v > 0})
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def start(self) -> "Profiler":
+        self._start = time.perf_counter()
+        if self.mode == "cprofile":
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample_loop, name="codex-profiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+            self._stacks = self._pstats_stacks()
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.elapsed = time.perf_counter() - self._start
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def collapsed(self) -> List[str]:
+        """Return collapsed-stack lines, heaviest first."""
+        return [f"{stack} {weight}" for stack, weight in self._stacks.most_common()]
+
+    def top(self, n: int = 20) -> List[Dict]:
+        """Return the ``n`` functions with the most self time."""
+        if self._profile is not None:
+            import pstats
+
+            stats = pstats.Stats(self._profile)
+            rows = sorted(
+                stats.stats.items(), key=lambda kv: kv[1][2], reverse=True  # type: ignore[attr-defined]
+            )[:n]
+            return [
+                {
+                    "function": f"{os.path.basename(func[0])}:{func[1]}:{func[2]}",
+                    "calls": ncalls,
+                    "self_seconds": round(tottime, 6),
+                    "cumulative_seconds": round(cumtime, 6),
+                }
+                for func, (_, ncalls, tottime, cumtime, _) in rows
+            ]
+
+        self_samples: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, weight in self._stacks.items():
+            frames = stack.split(";")
+            self_samples[frames[-1]] += weight
+            for frame in set(frames):
+                inclusive[frame] += weight
+        total = sum(self._stacks.values()) or 1
+        return [
+            {
+                "function": frame,
+                "self_samples": weight,
+                "self_percent": round(100.0 * weight / total, 2),
+                "inclusive_percent": round(100.0 * inclusive[frame] / total, 2),
+            }
+            for frame, weight in self_samples.most_common(n)
+        ]
+
+    def dump(self, output_dir: str = PROFILE_DIR) -> Dict[str, str]:
+        """Write the collapsed stacks (and ``.pstats`` in cprofile mode)."""
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+        base = os.path.join(output_dir, f"{self.label}_{stamp}_{os.getpid()}")
+        paths = {"collapsed": f"{base}.collapsed"}
+        with open(paths["collapsed"], "w", encoding="utf-8") as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+        if self._profile is not None:
+            paths["pstats"] = f"{base}.pstats"
+            self._profile.dump_stats(paths["pstats"])
+        return paths
+
+    def report(self, n: int = 20, output_dir: Optional[str] = PROFILE_DIR) -> Dict:
+        """Summarise the run for inclusion in a run report."""
+        result: Dict = {
+            "mode": self.mode,
+            "elapsed_seconds": round(self.elapsed, 6),
+            "top": self.top(n),
+        }
+        if self.mode == "sample":
+            result["interval"] = self.interval
+            result["samples"] = self.samples
+        if output_dir is not None:
+            result["files"] = self.dump(output_dir)
+        return result
+
+
+def from_env(label: str, mode: Optional[str] = None) -> Optional[Profiler]:
+    """Return a :class:`Profiler` when profiling is requested, else ``None``.
+
+    ``mode`` (e.g. from a ``--profile`` flag) takes precedence over
+    ``CODEX_PROFILE``; ``CODEX_PROFILE_INTERVAL`` sets the sampling interval.
+    """
+    mode = mode or os.getenv("CODEX_PROFILE", "")
+    if mode.lower() in ("", "0", "false", "no"):
+        return None
+    if mode.lower() in ("1", "true", "yes"):
+        mode = "sample"
+    interval = float(os.getenv("CODEX_PROFILE_INTERVAL", "0.005"))
+    return Profiler(mode.lower(), interval=interval, label=label)
+
+
+def _split_args(argv: List[str]) -> Tuple[argparse.Namespace, List[str]]:
+    parser = argparse.ArgumentParser(description="Profile a Codex18 script")
+    parser.add_argument("--mode", choices=MODES, default="sample")
+    parser.add_argument("--interval", type=float, default=0.005)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output-dir", default=PROFILE_DIR)
+    parser.add_argument("--all-threads", action="store_true", help="also sample threads blocked waiting")
+    parser.add_argument("script")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    return args, [args.script] + args.args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import json
+    import runpy
+
+    args, script_argv = _split_args(sys.argv[1:] if argv is None else argv)
+    label = os.path.splitext(os.path.basename(args.script))[0]
+    profiler = Profiler(args.mode, interval=args.interval, label=label, all_threads=args.all_threads)
+    saved_argv = sys.argv
+    sys.argv = script_argv
+    try:
+        with profiler:
+            try:
+                runpy.run_path(args.script, run_name="__main__")
+            except SystemExit:
+                pass
+    finally:
+        sys.argv = saved_argv
+    print(json.dumps(profiler.report(args.top, args.output_dir), indent=2))
+
+
+if __name__ == "__main__":
+    main()
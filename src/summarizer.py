@@ -1,11 +1,21 @@
-"""Summarizer module for generating OODA-style summaries via OpenAI."""
+"""Summarizer module for generating OODA-style summaries via OpenAI.
+
+Most ingested reports are a few hundred characters, so a model round trip
+and system prompt per report is mostly overhead.  :meth:`Summarizer.summarize_many`
+packs small inputs into one request per ``token_budget`` and asks for a JSON
+object keyed by report id; each entry is validated on its own, and entries
+that are missing or malformed are retried with an individual
+:meth:`Summarizer.summarize` call.
+"""
 
 from __future__ import annotations
 
 import json
 import logging
 import os
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence
+
+from .parse_metrics import timed
 
 logger = logging.getLogger(__name__)
 if not logger.handlers:
@@ -15,13 +25,40 @@ if not logger.handlers:
         format="%(asctime)s %(levelname)s: %(message)s",
     )
 
+OODA_KEYS = ("Observe", "Orient", "Decide", "Act")
+DEFAULT_TOKEN_BUDGET = 3000
+DEFAULT_MAX_BATCH = 25
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English)."""
+    return len(text) // 4 + 1
+
+
+def _check_summary(summary: Any) -> None:
+    if not isinstance(summary, dict) or set(summary.keys()) != set(OODA_KEYS):
+        raise AssertionError("Summary must contain exactly Observe, Orient, Decide, Act")
+    for key, value in summary.items():
+        assert isinstance(value, str) and value.strip(), f"{key} should be a non-empty string"
+
+
+def _input_text(input_data: Dict[str, Any]) -> str:
+    if not isinstance(input_data, dict):
+        raise TypeError("input_data must be a dictionary")
+    return input_data.get("text") or json.dumps(input_data)
+
 
 class Summarizer:
     """Generate structured OODA summaries using the OpenAI API."""
 
-    def __init__(self, *, model: str = "gpt-4-turbo", api_key: str | None = None) -> None:
+    def __init__(
+        self, *, model: str = "gpt-4-turbo", api_key: str | None = None, base_url: str | None = None
+    ) -> None:
         self.model = model
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        # Any OpenAI-compatible endpoint, e.g. a local server; ``None`` uses
+        # the library default (which honours ``OPENAI_BASE_URL``)
+        self.base_url = base_url
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -35,6 +72,17 @@ class Summarizer:
             "Observe, Orient, Decide, Act."
         )
 
+    def _build_packed_prompt(self, texts: Dict[str, str]) -> str:
+        reports = "\n\n".join(f"[{key}]\n{text}" for key, text in texts.items())
+        return (
+            "Using the OODA loop format (Observe, Orient, Decide, Act), "
+            f"summarize each of the following {len(texts)} intelligence reports separately. "
+            "Each report starts with its id in square brackets:\n\n"
+            f"{reports}\n\n"
+            "Output strictly a JSON object with one entry per report id "
+            f"({', '.join(texts)}), each an object with keys: Observe, Orient, Decide, Act."
+        )
+
     def _call_openai(self, prompt: str) -> str:
         """Call the OpenAI chat completion API and return the raw JSON text."""
         try:
@@ -46,7 +94,7 @@ class Summarizer:
 
         try:
             if hasattr(openai, "OpenAI"):
-                client = openai.OpenAI(api_key=self.api_key)
+                client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url)
                 resp = client.chat.completions.create(
                     model=self.model,
                     messages=[
@@ -58,6 +106,8 @@ class Summarizer:
                 return resp.choices[0].message.content
             else:
                 openai.api_key = self.api_key
+                if self.base_url:
+                    openai.api_base = self.base_url
                 resp = openai.ChatCompletion.create(
                     model=self.model,
                     messages=[
@@ -74,17 +124,12 @@ class Summarizer:
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
+    @timed("summarizer_summarize")
     def summarize(self, input_data: Dict[str, Any]) -> Dict[str, str]:
         """Return an OODA summary dictionary for ``input_data``."""
-        if not isinstance(input_data, dict):
-            raise TypeError("input_data must be a dictionary")
-
+        text = _input_text(input_data)
         logger.info("Input JSON: %s", json.dumps(input_data))
 
-        text = input_data.get("text")
-        if not text:
-            text = json.dumps(input_data)
-
         prompt = self._build_prompt(text)
         summary_text = self._call_openai(prompt)
         try:
@@ -93,14 +138,87 @@ class Summarizer:
             logger.error("Failed to parse summary JSON: %s", exc, exc_info=True)
             raise RuntimeError("Invalid summary format") from exc
 
-        expected_keys = {"Observe", "Orient", "Decide", "Act"}
-        if set(summary.keys()) != expected_keys:
-            raise AssertionError("Summary must contain exactly Observe, Orient, Decide, Act")
-        for key, value in summary.items():
-            assert isinstance(value, str) and value.strip(), f"{key} should be a non-empty string"
-
+        _check_summary(summary)
         logger.info("Summary: %s", json.dumps(summary))
         return summary
 
+    @staticmethod
+    def pack(
+        texts: Sequence[str], token_budget: int = DEFAULT_TOKEN_BUDGET, max_batch: int = DEFAULT_MAX_BATCH
+    ) -> List[List[int]]:
+        """Group the indexes of ``texts`` into requests of at most ``token_budget`` tokens.
+
+        Inputs are packed first-fit in order, at most ``max_batch`` per
+        request so the combined answer stays within the model's output
+        limit.  An input over half the budget gains little from packing and
+        gets a request of its own.
+        """
+        batches: List[List[int]] = []
+        room: List[int] = []
+        for index, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if tokens > token_budget // 2:
+                batches.append([index])
+                room.append(0)
+                continue
+            for b, batch in enumerate(batches):
+                if room[b] >= tokens and len(batch) < max_batch:
+                    batch.append(index)
+                    room[b] -= tokens
+                    break
+            else:
+                batches.append([index])
+                room.append(token_budget - tokens)
+        return batches
 
-__all__ = ["Summarizer"]
+    def _summarize_packed(self, texts: Dict[str, str]) -> Dict[str, Optional[Dict[str, str]]]:
+        """Summarize ``texts`` in one call; entries that fail validation map to ``None``."""
+        results: Dict[str, Optional[Dict[str, str]]] = dict.fromkeys(texts)
+        try:
+            answer = json.loads(self._call_openai(self._build_packed_prompt(texts)))
+        except ValueError as exc:
+            logger.error("Failed to parse packed summary JSON: %s", exc, exc_info=True)
+            return results
+        if not isinstance(answer, dict):
+            logger.error("Packed summary is not a JSON object")
+            return results
+        for key in texts:
+            try:
+                _check_summary(answer.get(key))
+            except AssertionError as exc:
+                logger.warning("Packed summary for %s rejected: %s", key, exc)
+                continue
+            results[key] = answer[key]
+        return results
+
+    @timed("summarizer_summarize_many")
+    def summarize_many(
+        self,
+        inputs: Sequence[Dict[str, Any]],
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ) -> List[Dict[str, str]]:
+        """Return an OODA summary for each of ``inputs``, in order.
+
+        Small inputs share one model call per :meth:`pack` batch; any entry
+        the packed answer leaves out or gets wrong falls back to
+        :meth:`summarize`, so every result is validated the same way.
+        """
+        texts = [_input_text(input_data) for input_data in inputs]
+        summaries: List[Optional[Dict[str, str]]] = [None] * len(texts)
+        batches = self.pack(texts, token_budget, max_batch)
+        logger.info("Summarizing %d inputs in %d packed requests", len(texts), len(batches))
+        for batch in batches:
+            if len(batch) == 1:
+                continue  # nothing to share; summarized individually below
+            keys = {f"r{n}": index for n, index in enumerate(batch)}
+            packed = self._summarize_packed({key: texts[index] for key, index in keys.items()})
+            for key, index in keys.items():
+                summaries[index] = packed[key]
+        for index, summary in enumerate(summaries):
+            if summary is None:
+                summaries[index] = self.summarize(inputs[index])
+        return summaries  # type: ignore[return-value]
+
+
+__all__ = ["Summarizer", "estimate_tokens"]
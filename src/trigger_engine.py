@@ -0,0 +1,273 @@
+"""Compiled trigger rules for the RI-2048 recursion safety triggers.
+
+Trigger definitions (see ``ri_2048_trigger_structure`` in ``launch.yaml``)
+declare a ``threshold``, a ``condition`` such as ``drift_index >= threshold``
+and an ``action``.  :class:`TriggerEngine` compiles every condition once into a
+predicate closure -- no ``eval`` -- and indexes rules by the metrics they read,
+so a metric update only evaluates the rules that watch that metric.
+
+Condition grammar::
+
+    expr       := or_expr
+    or_expr    := and_expr ("or" and_expr)*
+    and_expr   := not_expr ("and" not_expr)*
+    not_expr   := "not" not_expr | comparison
+    comparison := operand (">=" | "<=" | ">" | "<" | "==" | "!=") operand
+                | "(" expr ")"
+    operand    := metric name | "threshold" | number
+"""
+
+from __future__ import annotations
+
+import logging
+import operator
+import os
+import re
+from typing import Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from .config_loader import load_config
+
+logger = logging.getLogger(__name__)
+
+TRIGGER_FILES = (
+    os.path.join("triggers", "CODEX17-RI2048-TRIGGER.yaml"),
+    "launch.yaml",
+)
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:(?P<number>[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)"
+    r"|(?P<name>[A-Za-z_]\w*)"
+    r"|(?P<op>>=|<=|==|!=|>|<)"
+    r"|(?P<paren>[()]))"
+)
+_COMPARATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+Metrics = Mapping[str, float]
+Predicate = Callable[[Metrics], bool]
+
+
+class TriggerSyntaxError(ValueError):
+    """Raised when a trigger condition cannot be compiled."""
+
+
+def load_triggers(paths: Iterable[str] = TRIGGER_FILES) -> Dict[str, Dict]:
+    """Return the trigger definitions from the first file that declares any.
+
+    Triggers may live at the top level under ``triggers`` or inside
+    ``ri_2048_trigger_structure`` as in ``launch.yaml``.
+    """
+    for path in paths:
+        try:
+            cfg = load_config(path)
+        except Exception:
+            continue
+        if not isinstance(cfg, dict):
+            continue
+        triggers = cfg.get("triggers")
+        if not isinstance(triggers, dict):
+            triggers = (cfg.get("ri_2048_trigger_structure") or {}).get("triggers")
+        if isinstance(triggers, dict) and triggers:
+            return triggers
+    return {}
+
+
+class _Compiler:
+    """Recursive-descent compiler from condition text to a predicate."""
+
+    def __init__(self, condition: str, threshold: Optional[float]) -> None:
+        self.condition = condition
+        self.threshold = threshold
+        self.tokens = self._tokenize(condition)
+        self.pos = 0
+        self.metrics: set = set()
+
+    def _tokenize(self, text: str) -> List[Tuple[str, str]]:
+        tokens: List[Tuple[str, str]] = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = _TOKEN_RE.match(text, pos)
+            if not match or match.end() == pos:
+                raise TriggerSyntaxError(f"unexpected input at {text[pos:]!r} in {self.condition!r}")
+            kind = match.lastgroup
+            tokens.append((kind, match.group(kind)))
+            pos = match.end()
+        return tokens
+
+    def _peek(self) -> Tuple[str, str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else ("end", "")
+
+    def _take(self) -> Tuple[str, str]:
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def compile(self) -> Predicate:
+        predicate = self._or()
+        if self._peek()[0] != "end":
+            raise TriggerSyntaxError(f"trailing input in {self.condition!r}")
+        return predicate
+
+    def _or(self) -> Predicate:
+        parts = [self._and()]
+        while self._peek() == ("name", "or"):
+            self._take()
+            parts.append(self._and())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda m: any(p(m) for p in parts)
+
+    def _and(self) -> Predicate:
+        parts = [self._not()]
+        while self._peek() == ("name", "and"):
+            self._take()
+            parts.append(self._not())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda m: all(p(m) for p in parts)
+
+    def _not(self) -> Predicate:
+        if self._peek() == ("name", "not"):
+            self._take()
+            inner = self._not()
+            return lambda m: not inner(m)
+        if self._peek() == ("paren", "("):
+            self._take()
+            inner = self._or()
+            if self._take() != ("paren", ")"):
+                raise TriggerSyntaxError(f"missing ')' in {self.condition!r}")
+            return inner
+        return self._comparison()
+
+    def _operand(self) -> Callable[[Metrics], Optional[float]]:
+        kind, text = self._take()
+        if kind == "number":
+            value = float(text)
+            return lambda m: value
+        if kind == "name" and text == "threshold":
+            if self.threshold is None:
+                raise TriggerSyntaxError(f"'threshold' used without a threshold in {self.condition!r}")
+            value = float(self.threshold)
+            return lambda m: value
+        if kind == "name" and text not in ("and", "or", "not"):
+            self.metrics.add(text)
+            return lambda m: m.get(text)
+        raise TriggerSyntaxError(f"expected operand, got {text!r} in {self.condition!r}")
+
+    def _comparison(self) -> Predicate:
+        left = self._operand()
+        kind, op = self._take()
+        if kind != "op":
+            raise TriggerSyntaxError(f"expected comparison operator in {self.condition!r}")
+        right = self._operand()
+        compare = _COMPARATORS[op]
+
+        def predicate(m: Metrics) -> bool:
+            lhs = left(m)
+            rhs = right(m)
+            # Metrics that have never been reported cannot satisfy a condition
+            if lhs is None or rhs is None:
+                return False
+            return compare(lhs, rhs)
+
+        return predicate
+
+
+class TriggerRule:
+    """A compiled trigger definition."""
+
+    def __init__(self, name: str, spec: Mapping) -> None:
+        self.name = name
+        self.condition = str(spec.get("condition", ""))
+        self.threshold = spec.get("threshold")
+        self.action = spec.get("action")
+        self.response = spec.get("response")
+        compiler = _Compiler(self.condition, self.threshold)
+        self.predicate: Predicate = compiler.compile()
+        self.metrics: FrozenSet[str] = frozenset(compiler.metrics)
+        self.active = False
+
+    def __repr__(self) -> str:
+        return f"TriggerRule({self.name!r}, {self.condition!r})"
+
+
+class TriggerEngine:
+    """Evaluate compiled trigger rules incrementally as metrics change.
+
+    Rules are edge-triggered: an action is dispatched when a rule's condition
+    becomes true and re-arms once the condition is false again.
+    """
+
+    def __init__(self, triggers: Optional[Mapping[str, Mapping]] = None) -> None:
+        self.rules: Dict[str, TriggerRule] = {}
+        self.by_metric: Dict[str, List[TriggerRule]] = {}
+        self.metrics: Dict[str, float] = {}
+        self.handlers: Dict[Optional[str], List[Callable[[Dict], None]]] = {}
+        for name, spec in (load_triggers() if triggers is None else triggers).items():
+            self.add_rule(name, spec)
+
+    def add_rule(self, name: str, spec: Mapping) -> TriggerRule:
+        """Compile and index a trigger definition."""
+        rule = TriggerRule(name, spec)
+        self.rules[name] = rule
+        for metric in rule.metrics:
+            self.by_metric.setdefault(metric, []).append(rule)
+        return rule
+
+    def on(self, action: Optional[str], handler: Callable[[Dict], None]) -> None:
+        """Register ``handler`` for ``action`` (``None`` receives every action)."""
+        self.handlers.setdefault(action, []).append(handler)
+
+    def _dispatch(self, event: Dict) -> None:
+        for handler in self.handlers.get(event["action"], []) + self.handlers.get(None, []):
+            try:
+                handler(event)
+            except Exception as exc:
+                logger.error("Trigger handler for %s failed: %s", event["action"], exc, exc_info=True)
+
+    def _evaluate(self, rules: Iterable[TriggerRule]) -> List[Dict]:
+        fired: List[Dict] = []
+        metrics = self.metrics
+        for rule in rules:
+            hit = rule.predicate(metrics)
+            if hit and not rule.active:
+                event = {
+                    "trigger": rule.name,
+                    "action": rule.action,
+                    "response": rule.response,
+                    "metrics": {m: metrics.get(m) for m in rule.metrics},
+                }
+                fired.append(event)
+                self._dispatch(event)
+            rule.active = hit
+        return fired
+
+    def update(self, metric: str, value: float) -> List[Dict]:
+        """Set ``metric`` and evaluate only the rules that read it.
+
+        Returns the trigger events dispatched by this update.
+        """
+        self.metrics[metric] = value
+        rules = self.by_metric.get(metric)
+        if not rules:
+            return []
+        return self._evaluate(rules)
+
+    def update_many(self, values: Mapping[str, float]) -> List[Dict]:
+        """Set several metrics at once, evaluating each affected rule once."""
+        self.metrics.update(values)
+        affected: Dict[str, TriggerRule] = {}
+        for metric in values:
+            for rule in self.by_metric.get(metric, ()):
+                affected[rule.name] = rule
+        return self._evaluate(affected.values())
+
+
+__all__ = ["TriggerEngine", "TriggerRule", "TriggerSyntaxError", "load_triggers"]
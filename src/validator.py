@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import re
 from typing import Dict
 
+from . import codec
+from .parse_metrics import timed
+
 
 class Validator:
     """Validate symbolic ledger nodes prior to persistence."""
@@ -22,6 +24,7 @@ class Validator:
 
     MANDATED_ANCHOR = "No Veteran Left Behind"
 
+    @timed("validator_validate")
     def validate(self, node: Dict[str, str]) -> bool:
         """Validate a ledger node's schema, symbols and integrity hash.
 
@@ -68,8 +71,7 @@ class Validator:
         # ------------------------------------------------------------------
         node_copy = dict(node)
         declared_hash = node_copy.pop("truth_vector_hash")
-        serialized = json.dumps(node_copy, sort_keys=True).encode("utf-8")
-        computed = hashlib.sha256(serialized).hexdigest()
+        computed = hashlib.sha256(codec.canonical_bytes(node_copy)).hexdigest()
         if computed != declared_hash:
             return False
 
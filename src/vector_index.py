@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""Nearest-neighbour index over historical truth vectors.
+
+Every drift analysis appends one fixed-width record to
+``data/analysis_output/truth_vectors.bin``::
+
+    header   16 bytes   b"CDXVEC01", record size, dimensions
+    record   64 bytes   4 little-endian doubles + 32-byte report reference
+
+The report reference is the drift log timestamp (or any short string the
+caller passes): record ``ref`` points at ``drift_logs/drift_log_<ref>.json``,
+so analysts can open the past reports.
+
+The file is memory-mapped and each refresh decodes only the records
+appended since the last one into an in-memory array (with precomputed
+norms), so with NumPy installed a top-k query over millions of vectors is a
+single matrix-vector product plus a partial sort; without NumPy a pure-Python
+scan gives the same answers, only slower::
+
+    index = VectorIndex()
+    index.attach(engine)                      # append on every analysis
+    index.query([0.9, 0.4, 0.7, 0.8], k=5)    # most similar past vectors
+
+Rebuild from the drift logs with ``python src/vector_index.py backfill``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+if __package__ in (None, ""):
+    # Allow ``python src/vector_index.py`` to import sibling modules.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import codec
+from src.locking import FileLock
+
+try:  # Optional, vectorised queries
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+
+INDEX_PATH = os.path.join("data", "analysis_output", "truth_vectors.bin")
+LOGS_DIR = os.path.join("data", "analysis_output", "drift_logs")
+
+DIMS = 4
+REF_BYTES = 32
+MAGIC = b"CDXVEC01"
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct(f"<{DIMS}d{REF_BYTES}s")
+METRICS = ("euclidean", "chebyshev")
+_NP_RECORD = None if np is None else np.dtype([("v", "<f8", (DIMS,)), ("ref", f"S{REF_BYTES}")])
+
+
+class IndexFormatError(ValueError):
+    """Raised when an index file has an unexpected header."""
+
+
+def _encode_ref(ref: str) -> bytes:
+    # Long references are cut at a character boundary to fit the record
+    return ref.encode("utf-8")[:REF_BYTES].decode("utf-8", "ignore").encode("utf-8")
+
+
+def _decode_ref(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode("utf-8")
+
+
+class VectorIndex:
+    """Append-only, memory-mapped store of truth vectors with k-NN queries."""
+
+    def __init__(self, path: str = INDEX_PATH) -> None:
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = FileLock(path + ".lock")
+        self._map_lock = threading.Lock()
+        # Record number of the last event each thread indexed via add_event
+        self._events = threading.local()
+        self._mm: Optional[mmap.mmap] = None
+        self._file = None
+        self._count = 0
+        # Decoded copies of the vectors, extended as the file grows
+        self._cached = 0
+        self._vectors = self._norms = None
+        self._py_vectors: List[Tuple[float, ...]] = []
+        with self._lock:
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                with open(path, "wb") as f:
+                    f.write(HEADER.pack(MAGIC, RECORD.size, DIMS))
+        with open(path, "rb") as f:
+            magic, record_size, dims = HEADER.unpack(f.read(HEADER.size))
+        if (magic, record_size, dims) != (MAGIC, RECORD.size, DIMS):
+            raise IndexFormatError(f"{path} is not a {DIMS}-d truth vector index")
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _refresh(self) -> int:
+        """Remap the file if records were appended (by any process)."""
+        size = os.path.getsize(self.path)
+        count = (size - HEADER.size) // RECORD.size
+        if count != self._count or (count and self._mm is None):
+            if self._mm is not None:
+                self._mm.close()
+                self._file.close()
+                self._mm = self._file = None
+            if count:
+                self._file = open(self.path, "rb")
+                # Map whole records only; a writer may be mid-append
+                self._mm = mmap.mmap(
+                    self._file.fileno(), HEADER.size + count * RECORD.size, access=mmap.ACCESS_READ
+                )
+            self._count = count
+            self._load_vectors(count)
+        return count
+
+    def _load_vectors(self, count: int) -> None:
+        """Copy records ``[cached, count)`` into the in-memory query arrays.
+
+        The file is append-only, so each refresh only decodes new records.
+        """
+        if count < self._cached:  # the file was replaced; start over
+            self._vectors = self._norms = None
+            self._py_vectors = []
+            self._cached = 0
+        if count == self._cached:
+            return
+        offset = HEADER.size + self._cached * RECORD.size
+        if np is None:
+            with memoryview(self._mm) as view:
+                chunk = view[offset:HEADER.size + count * RECORD.size]
+                self._py_vectors.extend(record[:DIMS] for record in RECORD.iter_unpack(chunk))
+                chunk.release()
+            self._cached = count
+            return
+        if self._vectors is None or len(self._vectors) < count:
+            capacity = max(1024, 2 * count)
+            vectors, norms = np.empty((capacity, DIMS)), np.empty(capacity)
+            if self._vectors is not None:
+                vectors[:self._cached] = self._vectors[:self._cached]
+                norms[:self._cached] = self._norms[:self._cached]
+            self._vectors, self._norms = vectors, norms
+        new = np.frombuffer(self._mm, dtype=_NP_RECORD, count=count - self._cached, offset=offset)["v"]
+        self._vectors[self._cached:count] = new
+        del new
+        fresh = self._vectors[self._cached:count]
+        self._norms[self._cached:count] = np.einsum("ij,ij->i", fresh, fresh)
+        self._cached = count
+
+    def _nearest_numpy(self, query: Sequence[float], k: int, metric: str, skip: Optional[int]):
+        vectors = self._vectors[:self._count]
+        q = np.asarray(query, dtype="<f8")
+        if metric == "chebyshev":
+            score = np.abs(vectors - q).max(axis=1)
+            take = k
+        else:
+            # |v - q|^2 = |v|^2 - 2 v.q + |q|^2; the last term does not change
+            # the ranking, and the precomputed norms make this one mat-vec.
+            # A few spare candidates absorb rounding before the exact re-rank.
+            score = self._norms[:self._count] - 2.0 * (vectors @ q)
+            take = k + 8
+        if skip is not None and 0 <= skip < self._count:
+            score[skip] = np.inf
+        take = min(take, self._count)
+        candidates = np.argpartition(score, take - 1)[:take]
+        diff = np.abs(vectors[candidates] - q)
+        exact = diff.max(axis=1) if metric == "chebyshev" else np.sqrt((diff * diff).sum(axis=1))
+        pairs = sorted(zip(exact.tolist(), candidates.tolist()))
+        return [pair for pair in pairs if pair[1] != skip][:k]
+
+    def _nearest_python(self, query: Sequence[float], k: int, metric: str, skip: Optional[int]):
+        scored = []
+        for i, vector in enumerate(self._py_vectors):
+            if i == skip:
+                continue
+            diffs = [abs(a - b) for a, b in zip(vector, query)]
+            distance = max(diffs) if metric == "chebyshev" else sum(d * d for d in diffs) ** 0.5
+            scored.append((distance, i))
+        return heapq.nsmallest(k, scored)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        with self._map_lock:
+            return self._refresh()
+
+    def append_many(self, items: Iterable[Tuple[Sequence[float], str]]) -> int:
+        """Append ``(vector, report reference)`` pairs; return the new record count."""
+        payload = bytearray()
+        for vector, ref in items:
+            if len(vector) != DIMS:
+                raise ValueError(f"truth vectors have {DIMS} dimensions, got {len(vector)}")
+            payload += RECORD.pack(*(float(v) for v in vector), _encode_ref(ref))
+        with self._lock:
+            with open(self.path, "r+b") as f:
+                size = f.seek(0, os.SEEK_END)
+                whole = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+                if size != whole:
+                    # A writer died mid-append; later records must stay aligned
+                    f.truncate(whole)
+                    f.seek(whole)
+                f.write(payload)
+                size = f.tell()
+        return (size - HEADER.size) // RECORD.size
+
+    def append(self, vector: Sequence[float], ref: str) -> int:
+        """Append one vector; return its record number."""
+        return self.append_many([(vector, ref)]) - 1
+
+    def add_event(self, event: Dict) -> int:
+        """Index a drift log entry under its timestamp; return its record number."""
+        self._events.number = None
+        self._events.number = self.append(event["vector"], event["timestamp"])
+        return self._events.number
+
+    def take_event_record(self) -> Optional[int]:
+        """Return and forget the record :meth:`add_event` last wrote in this thread.
+
+        ``None`` if this thread has indexed nothing since the previous call,
+        e.g. because the subscriber failed.  Other processes appending to the
+        same file do not affect the answer.
+        """
+        number = getattr(self._events, "number", None)
+        self._events.number = None
+        return number
+
+    def attach(self, engine) -> None:
+        """Index every analysis ``engine`` produces from now on."""
+        engine.subscribe(self.add_event)
+
+    def record(self, number: int) -> Dict:
+        """Return record ``number`` as ``{"index", "vector", "ref"}``."""
+        with self._map_lock:
+            count = self._refresh()
+            if not 0 <= number < count:
+                raise IndexError(number)
+            *vector, ref = RECORD.unpack_from(self._mm, HEADER.size + number * RECORD.size)
+        return {"index": number, "vector": vector, "ref": _decode_ref(ref)}
+
+    def export(self) -> Tuple[Any, List[str]]:
+        """Return copies of every vector and its reference, in record order.
+
+        Vectors come back as an ``(n, 4)`` array with NumPy installed and as
+        a list of tuples without it.
+        """
+        with self._map_lock:
+            count = self._refresh()
+            if not count:
+                return (np.empty((0, DIMS)) if np is not None else []), []
+            if np is None:
+                records = list(RECORD.iter_unpack(self._mm[HEADER.size:HEADER.size + count * RECORD.size]))
+                return [r[:DIMS] for r in records], [_decode_ref(r[DIMS]) for r in records]
+            refs = np.frombuffer(self._mm, dtype=_NP_RECORD, count=count, offset=HEADER.size)["ref"]
+            return self._vectors[:count].copy(), [_decode_ref(bytes(ref)) for ref in refs]
+
+    def query(
+        self,
+        vector: Sequence[float],
+        k: int = 5,
+        metric: str = "euclidean",
+        exclude: Optional[int] = None,
+    ) -> List[Dict]:
+        """Return the ``k`` records nearest to ``vector``, closest first.
+
+        ``metric`` is ``"euclidean"`` or ``"chebyshev"`` (largest per-axis
+        difference, the measure drift alarms use).  ``exclude`` skips one
+        record number, e.g. the analysis being investigated.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"unknown metric {metric!r}; expected one of {METRICS}")
+        if len(vector) != DIMS:
+            raise ValueError(f"truth vectors have {DIMS} dimensions, got {len(vector)}")
+        with self._map_lock:
+            count = self._refresh()
+            if not count or k <= 0:
+                return []
+            nearest = self._nearest_python if np is None else self._nearest_numpy
+            pairs = nearest(vector, k, metric, exclude)
+        results = []
+        for distance, number in pairs:
+            item = self.record(number)
+            item["distance"] = distance
+            results.append(item)
+        return results
+
+    def neighbours(self, number: int, k: int = 5, metric: str = "euclidean") -> List[Dict]:
+        """Return the ``k`` past records most similar to record ``number``."""
+        return self.query(self.record(number)["vector"], k, metric, exclude=number)
+
+    def backfill(self, logs_dir: str = LOGS_DIR) -> int:
+        """Append every drift log in ``logs_dir`` (in time order); return how many."""
+        items = []
+        for name in sorted(os.listdir(logs_dir)):
+            if not (name.startswith("drift_log_") and name.endswith(".json")):
+                continue
+            try:
+                vector = codec.read_json(os.path.join(logs_dir, name)).get("vector")
+            except (OSError, ValueError):
+                continue
+            if vector and len(vector) == DIMS:
+                items.append((vector, name[len("drift_log_"):-len(".json")]))
+        if items:
+            self.append_many(items)
+        return len(items)
+
+    def close(self) -> None:
+        with self._map_lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._file.close()
+            self._mm = self._file = None
+            self._count = self._cached = 0
+            self._vectors = self._norms = None
+            self._py_vectors = []
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Truth vector nearest-neighbour index")
+    parser.add_argument("--index", default=INDEX_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    backfill_p = sub.add_parser("backfill", help="append the vectors of existing drift logs")
+    backfill_p.add_argument("--logs-dir", default=LOGS_DIR)
+    query_p = sub.add_parser("query", help="print the nearest past vectors")
+    query_p.add_argument("--vector", required=True, help='JSON list, e.g. "[0.9, 0.4, 0.7, 0.8]"')
+    query_p.add_argument("-k", type=int, default=5)
+    query_p.add_argument("--metric", choices=METRICS, default="euclidean")
+    args = parser.parse_args(argv)
+
+    index = VectorIndex(args.index)
+    if args.command == "backfill":
+        if os.path.getsize(index.path) > HEADER.size:
+            parser.error(f"{index.path} already has records; remove it to rebuild")
+        print(json.dumps({"indexed": index.backfill(args.logs_dir)}))
+    else:
+        print(json.dumps(index.query(json.loads(args.vector), args.k, args.metric), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Lease-based work claiming for ingest workers sharing ``reports_incoming``.
+
+Several ingest processes, on one host or many hosts over a shared
+filesystem, can drain the same incoming directory without processing a
+report twice::
+
+    reports_incoming/
+        report_a.md                     waiting
+        .claims/
+            host1-4242/                 one directory per worker
+                .lease                  heartbeat; its mtime is the lease
+                report_b.md             claimed by host1-4242
+
+A worker claims a report by renaming it into its own claim directory.
+``rename`` within one filesystem is atomic, so exactly one contender wins
+and the others see the file vanish.  A heartbeat thread refreshes each
+worker's lease every third of ``lease_seconds``, however long a single
+report takes.  A worker whose lease is older than ``lease_seconds`` is
+presumed dead: the first live worker to notice renames its whole claim
+directory to a unique tombstone, so nothing can be claimed into it any
+more, and then puts the reports back into the incoming directory.  A
+worker that was only stalled finds its lease gone and stops with
+:class:`LeaseLostError` instead of finishing work that is now queued again.
+
+With ``partitions > 1`` each worker only claims reports whose filename hash
+falls into its ``partition``, so workers rarely contend for the same file;
+``steal_after`` lets an idle worker also take reports from other partitions
+once they have waited that many seconds, in case a partition has no
+worker.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import socket
+import threading
+import time
+import uuid
+import zlib
+from typing import Iterator, List, Optional
+
+CLAIMS_DIR = ".claims"
+LEASE_NAME = ".lease"
+TOMBSTONE_PREFIX = ".tombstone-"
+DEFAULT_LEASE_SECONDS = 300.0
+
+
+class LeaseLostError(RuntimeError):
+    """Raised when another worker has recovered this worker's claims."""
+
+
+def partition_of(filename: str, partitions: int) -> int:
+    """Return the partition of ``filename``; stable across hosts and runs."""
+    return zlib.crc32(filename.encode("utf-8")) % partitions
+
+
+def default_worker_id() -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", f"{socket.gethostname()}-{os.getpid()}")
+
+
+class WorkClaimer:
+    """Claim reports from a shared incoming directory for one worker."""
+
+    def __init__(
+        self,
+        incoming_dir: str,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        partitions: int = 1,
+        partition: int = 0,
+        steal_after: Optional[float] = None,
+        heartbeat: bool = True,
+    ) -> None:
+        if not 0 <= partition < partitions:
+            raise ValueError(f"partition must be in [0, {partitions}), got {partition}")
+        self.incoming_dir = incoming_dir
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.partitions = partitions
+        self.partition = partition
+        self.steal_after = steal_after
+        self.claims_root = os.path.join(incoming_dir, CLAIMS_DIR)
+        self.claim_dir = os.path.join(self.claims_root, self.worker_id)
+        self.lease_path = os.path.join(self.claim_dir, LEASE_NAME)
+        self.lost = False
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+        os.makedirs(self.claim_dir, exist_ok=True)
+        # A restarted worker with the same id takes back what it left claimed
+        for path in self.pending():
+            self.release(path)
+        with open(self.lease_path, "w", encoding="utf-8") as f:
+            json.dump({"worker": self.worker_id, "host": socket.gethostname(), "pid": os.getpid()}, f)
+        self.renew()
+        if heartbeat:
+            self._heartbeat = threading.Thread(target=self._beat, name=f"lease-{self.worker_id}", daemon=True)
+            self._heartbeat.start()
+
+    # ------------------------------------------------------------------
+    # Leases
+    # ------------------------------------------------------------------
+    def renew(self) -> None:
+        """Extend this worker's lease.
+
+        Raises :class:`LeaseLostError` if another worker has already
+        recovered this worker's claims.
+        """
+        try:
+            os.utime(self.lease_path)
+        except FileNotFoundError:
+            self.lost = True
+            raise LeaseLostError(f"worker {self.worker_id} lost its lease; its claims were requeued") from None
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self.renew()
+            except LeaseLostError:
+                return
+
+    def check_lease(self) -> None:
+        """Raise :class:`LeaseLostError` if this worker's lease was taken over."""
+        if self.lost or not os.path.exists(self.lease_path):
+            self.lost = True
+            raise LeaseLostError(f"worker {self.worker_id} lost its lease; its claims were requeued")
+
+    def _lease_expired(self, claim_dir: str, now: float) -> bool:
+        try:
+            heartbeat = os.stat(os.path.join(claim_dir, LEASE_NAME)).st_mtime
+        except FileNotFoundError:
+            # No lease at all: a worker that died while starting up, or a
+            # directory left behind; judge it by the directory's own age
+            try:
+                heartbeat = os.stat(claim_dir).st_mtime
+            except FileNotFoundError:
+                return False
+        return now - heartbeat > self.lease_seconds
+
+    def _requeue(self, path: str) -> bool:
+        try:
+            os.rename(path, os.path.join(self.incoming_dir, os.path.basename(path)))
+            return True
+        except FileNotFoundError:
+            return False  # another worker got there first
+
+    def recover_stale(self, now: Optional[float] = None) -> List[str]:
+        """Return the reports of workers with expired leases to the queue.
+
+        Returns the file names that were put back.
+        """
+        now = time.time() if now is None else now
+        recovered = []
+        try:
+            workers = os.listdir(self.claims_root)
+        except FileNotFoundError:
+            return recovered
+        for worker in workers:
+            claim_dir = os.path.join(self.claims_root, worker)
+            if worker.startswith(TOMBSTONE_PREFIX):
+                # Left by a recovering worker that died halfway
+                if self._lease_expired(claim_dir, now):
+                    recovered.extend(self._drain(claim_dir))
+                continue
+            if worker == self.worker_id or not os.path.isdir(claim_dir) or not self._lease_expired(claim_dir, now):
+                continue
+            # Take the directory away from its owner in one atomic step, so
+            # the owner cannot claim into it or renew it while we requeue
+            tombstone = os.path.join(self.claims_root, f"{TOMBSTONE_PREFIX}{worker}-{uuid.uuid4().hex}")
+            try:
+                os.rename(claim_dir, tombstone)
+            except OSError:
+                continue  # another worker is recovering it
+            recovered.extend(self._drain(tombstone))
+        return recovered
+
+    def _drain(self, tombstone: str) -> List[str]:
+        recovered = []
+        try:
+            names = os.listdir(tombstone)
+        except FileNotFoundError:
+            return recovered
+        for name in names:
+            if name != LEASE_NAME and self._requeue(os.path.join(tombstone, name)):
+                recovered.append(name)
+        # Nothing is ever claimed into a tombstone, so removing it is safe
+        shutil.rmtree(tombstone, ignore_errors=True)
+        return recovered
+
+    # ------------------------------------------------------------------
+    # Claiming
+    # ------------------------------------------------------------------
+    def _wanted(self, name: str, now: float) -> bool:
+        if self.partitions == 1 or partition_of(name, self.partitions) == self.partition:
+            return True
+        if self.steal_after is None:
+            return False
+        try:
+            return now - os.stat(os.path.join(self.incoming_dir, name)).st_mtime > self.steal_after
+        except FileNotFoundError:
+            return False
+
+    def claim(self, name: str) -> Optional[str]:
+        """Try to claim incoming report ``name``; return its claimed path or ``None``."""
+        self.check_lease()
+        target = os.path.join(self.claim_dir, name)
+        try:
+            os.rename(os.path.join(self.incoming_dir, name), target)
+        except FileNotFoundError:
+            self.check_lease()
+            return None  # claimed by another worker, or already ingested
+        return target
+
+    def release(self, path: str) -> bool:
+        """Put a claimed report back in the incoming directory (e.g. after a failure)."""
+        return self._requeue(path)
+
+    def iter_claims(self) -> Iterator[str]:
+        """Claim and yield waiting reports one at a time.
+
+        Stale leases are recovered first.  A report is only claimed once
+        the previous one has been handed back, so a crash strands at most
+        the report being processed.  Raises :class:`LeaseLostError` if this
+        worker's claims were recovered by another worker in the meantime.
+        """
+        self.recover_stale()
+        now = time.time()
+        names = sorted(os.listdir(self.incoming_dir))
+        # Own partition first; stolen work only once it is drained
+        names.sort(key=lambda n: self.partitions > 1 and partition_of(n, self.partitions) != self.partition)
+        for name in names:
+            if name.startswith(".") or not self._wanted(name, now):
+                continue
+            if not os.path.isfile(os.path.join(self.incoming_dir, name)):
+                continue
+            path = self.claim(name)
+            if path is not None:
+                yield path
+
+    def pending(self) -> List[str]:
+        """Return paths still sitting in this worker's claim directory."""
+        return [os.path.join(self.claim_dir, n) for n in sorted(os.listdir(self.claim_dir)) if n != LEASE_NAME]
+
+    def close(self) -> None:
+        """Requeue anything left claimed and give up the lease."""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        if self.lost or not os.path.exists(self.lease_path):
+            return  # the claim directory now belongs to whoever recovered it
+        for path in self.pending():
+            self.release(path)
+        shutil.rmtree(self.claim_dir, ignore_errors=True)
+
+    def __enter__(self) -> "WorkClaimer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
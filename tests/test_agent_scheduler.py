@@ -0,0 +1,81 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from core import Agent
+from core.scheduler import AgentScheduler, DependencyError
+
+
+class Recorder(Agent):
+    def __init__(self, name, log, delay=0.0, fail=False, depends_on=()):
+        super().__init__(name, depends_on=depends_on)
+        self.log = log
+        self.delay = delay
+        self.fail = fail
+
+    def execute(self):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("boom")
+        self.log.append((self.name, threading.get_ident()))
+        return self.name.lower()
+
+
+def test_dependencies_and_timings():
+    log = []
+    agents = [
+        Recorder("Sentinel", log, depends_on=["Core", "Manager"]),
+        Recorder("Core", log),
+        Recorder("Manager", log, depends_on=["Core"]),
+    ]
+    runs = AgentScheduler(agents).run()
+    order = [name for name, _ in log]
+    assert order.index("Core") < order.index("Manager") < order.index("Sentinel")
+    assert runs["Sentinel"].result == "sentinel"
+    assert all(run.duration >= 0 for run in runs.values())
+
+
+def test_independent_agents_run_concurrently():
+    log = []
+    agents = [Recorder(f"A{i}", log, delay=0.2) for i in range(4)]
+    start = time.perf_counter()
+    AgentScheduler(agents, max_workers=4).run()
+    assert time.perf_counter() - start < 0.6
+    assert len({thread for _, thread in log}) > 1
+
+
+def test_failed_dependency_skips_dependents():
+    log = []
+    runs = AgentScheduler(
+        [Recorder("Core", log, fail=True), Recorder("Manager", log, depends_on=["Core"])]
+    ).run()
+    assert isinstance(runs["Core"].error, RuntimeError)
+    assert isinstance(runs["Manager"].error, DependencyError)
+    assert log == []
+
+
+def test_cycle_and_unknown_dependency_rejected():
+    log = []
+    with pytest.raises(ValueError):
+        AgentScheduler(
+            [Recorder("A", log, depends_on=["B"]), Recorder("B", log, depends_on=["A"])]
+        ).run()
+    with pytest.raises(ValueError):
+        AgentScheduler([Recorder("A", log, depends_on=["Missing"])]).run()
+
+
+def test_import_core_is_quiet():
+    root = Path(__file__).resolve().parents[1]
+    result = subprocess.run(
+        [sys.executable, "-c", "import logging, core.drift_analysis_engine; "
+         "assert not logging.getLogger().handlers"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "" and result.stderr == ""
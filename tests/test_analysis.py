@@ -1,4 +1,115 @@
-# Placeholder test file
+import json
+import time
+from pathlib import Path
 
-def test_analysis_placeholder():
-    assert True
+from core.drift_analysis_engine import DriftAnalysisEngine
+from src.analyze import DAY, DriftRollups, _epoch, _iso, hist_quantile
+
+
+def _event(ts: int, vector, alarm=False):
+    return {"vector": vector, "alarm": alarm, "timestamp": _iso(ts)}
+
+
+BASE = _epoch("2025-01-01T00:00:00Z")
+
+
+def test_rollups_match_raw_values(tmp_path: Path):
+    rollups = DriftRollups(str(tmp_path / "r.sqlite3"))
+    values = [i / 100 for i in range(100)]
+    events = [_event(BASE + i * 30, [v, 1 - v, 0.5, 0.2], alarm=i % 10 == 0) for i, v in enumerate(values)]
+    assert rollups.add_many(events[:60]) == 60
+    for event in events[60:]:
+        rollups.add(event)
+
+    end = BASE + DAY
+    summary = rollups.summary(0, BASE, end)
+    assert summary["count"] == 100
+    assert summary["min"] == 0.0 and summary["max"] == 0.99
+    assert abs(summary["mean"] - sum(values) / 100) < 1e-9
+    assert abs(summary["p50"] - 0.5) <= 0.02
+    assert abs(summary["p90"] - 0.9) <= 0.02
+
+    # Every resolution agrees on the totals
+    for resolution in ("minute", "hour", "day"):
+        points = rollups.series(0, BASE, end, resolution)
+        assert sum(p["count"] for p in points) == 100
+    assert len(rollups.series(0, BASE, end, "minute")) == 50
+    assert rollups.series(0, BASE, end, "day")[0]["bucket"] == "2025-01-01T00:00:00Z"
+
+    alarms = rollups.alarms(BASE, end, "day")
+    assert alarms == [{"bucket": "2025-01-01T00:00:00Z", "events": 100, "alarms": 10, "alarm_rate": 0.1}]
+
+
+def test_resolution_is_chosen_by_span(tmp_path: Path):
+    rollups = DriftRollups(str(tmp_path / "r.sqlite3"))
+    rollups.add_many(_event(BASE + d * DAY, [0.1, 0.2, 0.3, 0.4]) for d in range(120))
+    # 90 days -> hourly buckets, a year -> daily buckets
+    assert len(rollups.series(2, BASE, BASE + 90 * DAY)) == 90
+    year = rollups.series(2, BASE, BASE + 365 * DAY)
+    assert len(year) == 120 and year[0]["p99"] == 0.3
+
+
+def test_retention_keeps_coarse_history(tmp_path: Path):
+    rollups = DriftRollups(str(tmp_path / "r.sqlite3"))
+    rollups.add_many(_event(BASE + d * DAY, [0.5] * 4) for d in range(60))
+    now = BASE + 60 * DAY
+    deleted = rollups.apply_retention(now)
+    assert deleted["raw"] == 53
+    assert deleted["minute"] == 4 * 30
+    assert rollups.summary(1, BASE, now, "minute")["count"] == 30
+    assert rollups.summary(1, BASE, now, "day")["count"] == 60
+
+
+def test_backfill_is_incremental(tmp_path: Path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    for i in range(5):
+        event = _event(BASE + i * 60, [0.25, 0.5, 0.75, 1.0])
+        (logs / f"drift_log_{event['timestamp']}.json").write_text(json.dumps(event))
+    rollups = DriftRollups(str(tmp_path / "r.sqlite3"))
+    assert rollups.backfill(str(logs)) == 5
+    assert rollups.backfill(str(logs)) == 0
+    assert rollups.summary(3, BASE, BASE + DAY)["max"] == 1.0
+
+
+def test_resolution_respects_retention(tmp_path: Path):
+    now = BASE + 90 * DAY
+    assert DriftRollups._pick_resolution(now - DAY, now, now) == "minute"
+    # Minute buckets are gone after 30 days, hour buckets after 400
+    assert DriftRollups._pick_resolution(now - 60 * DAY, now - 58 * DAY, now) == "hour"
+    assert DriftRollups._pick_resolution(now - 500 * DAY, now - 498 * DAY, now) == "day"
+
+    rollups = DriftRollups(str(tmp_path / "r.sqlite3"))
+    start = int(time.time()) - 60 * DAY
+    rollups.add_many(_event(start + h * 3600, [0.5] * 4) for h in range(48))
+    rollups.apply_retention()
+    assert rollups.summary(0, start, start + 2 * DAY)["count"] == 48
+
+
+def test_backfill_skips_analyses_rolled_up_live(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = DriftAnalysisEngine()
+    rollups = DriftRollups(str(tmp_path / "r.sqlite3"))
+    rollups.attach(engine)
+    engine.analyze_input(0.9, set())
+    assert rollups.backfill(engine.logs_dir) == 0
+    now = int(time.time())
+    assert rollups.summary(0, now - DAY, now + DAY)["count"] == 1
+
+
+def test_attach_rolls_up_live_analyses(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = DriftAnalysisEngine()
+    rollups = DriftRollups(str(tmp_path / "r.sqlite3"))
+    rollups.attach(engine)
+    engine.analyze_input(0.9, {"policy"})
+    engine.analyze_input(0.4, set())
+    now = int(time.time())
+    assert rollups.summary(0, now - DAY, now + DAY)["count"] == 2
+
+
+def test_hist_quantile_clamps_to_bounds():
+    hist = [0] * 100
+    hist[10] = 4
+    assert hist_quantile(hist, 0.5, 0.101, 0.104) <= 0.104
+    assert hist_quantile([0] * 100, 0.5, 0.0, 1.0) == 0.0
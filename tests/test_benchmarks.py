@@ -0,0 +1,35 @@
+import pytest
+
+from benchmarks import generators, run
+from benchmarks.run import compare, run_suite
+from src.validator import Validator
+
+
+def test_generated_braid_nodes_validate():
+    nodes = list(generators.iter_braid_nodes(5))
+    assert all(Validator().validate(node) for node in nodes)
+    assert nodes[1]["parent_node"] == nodes[0]["id"]
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"a": {"seconds_per_op": 1.0}, "b": {"seconds_per_op": 1.0}}}
+    current = {"results": {"a": {"seconds_per_op": 1.1}, "b": {"seconds_per_op": 1.5}}}
+    rows = {row["case"]: row for row in compare(baseline, current, threshold=0.2)}
+    assert not rows["a"]["regression"]
+    assert rows["b"]["regression"]
+
+
+def test_run_suite_smoke():
+    result = run_suite("small", groups=["truth_vector", "triggers"], rounds=1)
+    assert result["meta"]["scale"] == "small"
+    assert "truth_vector_process_input[tags=10]" in result["results"]
+
+
+def test_triggers_load_from_outside_the_repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert "trigger_engine_update[10000]" in run_suite("small", groups=["triggers"], rounds=1)["results"]
+
+    # Without definitions the case refuses to time an empty engine
+    monkeypatch.setattr(run, "REPO_ROOT", str(tmp_path))
+    with pytest.raises(RuntimeError, match="no trigger definitions"):
+        run_suite("small", groups=["triggers"], rounds=1)
@@ -0,0 +1,108 @@
+import json
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from src.memory_braid import BraidCorruptionError, BraidReader, MemoryBraid
+from src.memory_retriever import MemoryRetriever
+
+
+def make_braid(tmp_path: Path, **kwargs) -> MemoryBraid:
+    config = tmp_path / "VAULTIS.yml"
+    config.write_text("version: 18.0.0\n")
+    return MemoryBraid(config_path=str(config), memory_dir=str(tmp_path / "braid"), **kwargs)
+
+
+def _write_facts(tmp_path: str, worker: int, rounds: int) -> None:
+    braid = make_braid(Path(tmp_path))
+    for i in range(rounds):
+        braid.update({f"w{worker}": i})
+
+
+def test_concurrent_writers_lose_nothing(tmp_path: Path):
+    procs = [multiprocessing.Process(target=_write_facts, args=(str(tmp_path), w, 10)) for w in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+
+    braid = make_braid(tmp_path)
+    assert len(braid.long_term) == 40
+    assert braid.verify(None)
+    assert braid.long_term[-1]["facts"] == {f"w{w}": 9 for w in range(4)}
+
+
+def test_reader_refreshes_incrementally_and_skips_partial_lines(tmp_path: Path):
+    writer = make_braid(tmp_path)
+    reader = BraidReader(str(tmp_path / "braid"))
+    retriever = MemoryRetriever(reader)
+    assert reader.refresh() == 0
+
+    writer.update({"topic": "harbor"})
+    writer.update({"topic": "convoy"})
+    assert reader.refresh() == 2
+    assert retriever.search("convoy")[0]["index"] == 1
+
+    # A writer that died mid-append leaves a line without its newline
+    with open(writer.log_path, "ab") as f:
+        f.write(b'{"id": "torn"')
+    assert reader.refresh() == 0
+    assert len(reader) == 2
+
+    writer.update({"topic": "relay"})
+    assert reader.refresh() == 1
+    assert [node["facts"]["topic"] for node in reader.nodes] == ["harbor", "convoy", "relay"]
+    assert make_braid(tmp_path).verify(None)
+
+
+def test_replaced_log_is_reread(tmp_path: Path):
+    writer = make_braid(tmp_path)
+    for i in range(3):
+        writer.update({"fact": i})
+    reader = BraidReader(str(tmp_path / "braid"))
+    generation = reader.generation
+
+    log = Path(writer.log_path)
+    lines = log.read_text().splitlines(keepends=True)
+    log.unlink()
+    log.write_text("".join(lines[:2]))
+    assert reader.refresh() == 2
+    assert reader.generation == generation + 1
+    assert len(reader) == 2
+
+
+def test_legacy_history_is_migrated(tmp_path: Path):
+    legacy = make_braid(tmp_path)
+    for i in range(3):
+        legacy.update({"fact": i})
+    nodes = list(legacy.long_term)
+    Path(legacy.log_path).unlink()
+    Path(legacy.history_path).write_text(json.dumps(nodes, indent=2))
+
+    braid = make_braid(tmp_path, snapshot_every=1)
+    assert braid.long_term == nodes
+    braid.update({"fact": 3})
+    assert braid.verify(None)
+    assert BraidReader(str(tmp_path / "braid")).nodes == braid.long_term
+    # snapshot_every=1 keeps the JSON document current after every update
+    assert json.loads(Path(braid.history_path).read_text()) == braid.long_term
+
+
+def test_corrupt_line_blocks_writes_without_losing_nodes(tmp_path: Path):
+    writer = make_braid(tmp_path)
+    for i in range(4):
+        writer.update({"fact": i})
+    log = Path(writer.log_path)
+    lines = log.read_text().splitlines(keepends=True)
+    lines[1] = "{not json\n"
+    log.write_text("".join(lines))
+
+    reader = BraidReader(str(tmp_path / "braid"))
+    assert len(reader) == 1
+    assert reader.corrupt_at == len(lines[0].encode())
+
+    braid = make_braid(tmp_path)
+    with pytest.raises(BraidCorruptionError):
+        braid.update({"fact": 4})
+    assert log.read_text().splitlines(keepends=True) == lines
@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.catalog import Catalog
+
+
+def _record(sha: str, ts: str, **metadata):
+    return {"ingest_timestamp": ts, "sha256": sha, "metadata": metadata, "content": "body"}
+
+
+def test_batched_inserts_and_indexed_queries(tmp_path: Path):
+    catalog = Catalog(str(tmp_path / "catalog.sqlite3"), batch_size=3)
+    catalog.add(_record("a" * 64, "2025-05-01T10:00:00Z", author="Alice", title="One"), "out/one.json", "one.md")
+    catalog.add(_record("b" * 64, "2025-05-02T10:00:00Z", author="Bob", title="Two"), "out/two.json")
+    # Below the batch size nothing has reached the database yet
+    assert catalog._pending
+    catalog.add(_record("c" * 64, "2025-05-03T10:00:00Z", author="Alice", date="2025-05-03"), "out/three.json")
+    assert not catalog._pending
+
+    alice = catalog.find(author="Alice")
+    assert [row["name"] for row in alice] == ["one", "three"]
+    assert alice[0]["archive_location"] == "one.md"
+    assert alice[1]["metadata"] == {"author": "Alice", "date": "2025-05-03"}
+    assert [r["name"] for r in catalog.find(since="2025-05-02T00:00:00Z", until="2025-05-03T00:00:00Z")] == ["two"]
+    assert catalog.find(sha256="c" * 64)[0]["output_path"] == "out/three.json"
+    assert catalog.find(author="Alice", limit=1)[0]["name"] == "one"
+    with pytest.raises(ValueError):
+        catalog.find(content="body")
+
+    # Re-ingesting the same output replaces its row
+    catalog.add(_record("d" * 64, "2025-05-04T10:00:00Z", author="Bob"), "out/two.json")
+    assert len(catalog) == 3
+    assert catalog.get("out/two.json")["sha256"] == "d" * 64
+
+    # Queries use the metadata indexes
+    plan = catalog._conn.execute("EXPLAIN QUERY PLAN SELECT * FROM reports WHERE author = ?", ("x",)).fetchall()
+    assert "reports_author" in " ".join(str(tuple(row)) for row in plan)
+    catalog.close()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_rebuild_from_output_files(tmp_path: Path, workers: int):
+    output = tmp_path / "analysis_output"
+    output.mkdir()
+    for i in range(25):
+        record = _record(f"{i:064x}", f"2025-05-{i + 1:02d}T00:00:00Z", author=f"author-{i % 3}")
+        (output / f"report_{i:02d}.json").write_text(json.dumps(record))
+    (output / "latest_drift_report.json").write_text(json.dumps({"vector": [0.5] * 4}))
+    (output / "broken.json").write_text("{not json")
+
+    catalog = Catalog(str(output / "catalog.sqlite3"))
+    catalog.add(_record("0" * 64, "2025-05-01T00:00:00Z"), str(output / "report_00.json"), "seg-00000001.gz#0")
+    catalog.add(_record("f" * 64, "2025-01-01T00:00:00Z"), str(output / "gone.json"))
+
+    assert catalog.rebuild(str(output), workers=workers, chunk_size=4) == 25
+    assert len(catalog) == 25
+    assert catalog.get(str(output / "gone.json")) is None
+    # Archive locations survive a rebuild
+    assert catalog.get(str(output / "report_00.json"))["archive_location"] == "seg-00000001.gz#0"
+    assert len(catalog.find(author="author-1")) == 8
+    catalog.close()
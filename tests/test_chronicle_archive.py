@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src.chronicle_archive import ArchiveError, ChronicleArchive, migrate_loose
+
+
+def test_put_get_and_dedupe(tmp_path: Path):
+    archive = ChronicleArchive(str(tmp_path))
+    first = archive.put("a.md", b"alpha report")
+    archive.put("b.md", b"beta report")
+    dup = archive.put("a_copy.md", b"alpha report")
+
+    assert archive.get("a.md") == b"alpha report"
+    assert archive.get("a_copy.md") == b"alpha report"
+    assert archive.get(sha256=first["sha256"]) == b"alpha report"
+    assert dup["deduplicated_from"] == "a.md"
+    assert dup["offset"] == first["offset"]
+    with pytest.raises(KeyError):
+        archive.get("missing.md")
+
+    # A fresh instance rebuilds the index from index.jsonl
+    reopened = ChronicleArchive(str(tmp_path))
+    assert len(reopened) == 3
+    assert reopened.get("b.md") == b"beta report"
+    assert reopened.verify() == []
+
+
+def test_torn_index_line_is_cut_before_appending(tmp_path: Path):
+    archive = ChronicleArchive(str(tmp_path))
+    archive.put("a.md", b"alpha report")
+    # A writer died halfway through its index line
+    with open(tmp_path / "index.jsonl", "ab") as f:
+        f.write(b'{"name": "b.md", "sha')
+
+    archive.put("c.md", b"gamma report")
+    reopened = ChronicleArchive(str(tmp_path))
+    assert [entry["name"] for entry in reopened.entries()] == ["a.md", "c.md"]
+    assert reopened.get("c.md") == b"gamma report"
+
+
+def test_segments_roll_over_and_detect_corruption(tmp_path: Path):
+    archive = ChronicleArchive(str(tmp_path), segment_bytes=64)
+    for i in range(5):
+        archive.put(f"r{i}.md", os.urandom(100))
+    segments = sorted(os.listdir(tmp_path / "segments"))
+    assert len(segments) == 5
+
+    entry = archive.lookup("r2.md")
+    with open(tmp_path / "segments" / entry["segment"], "r+b") as f:
+        f.seek(entry["offset"] + 20)
+        f.write(b"\x00\x00\x00\x00")
+    with pytest.raises((ArchiveError, OSError, EOFError)):
+        archive.get("r2.md")
+    assert archive.verify() == ["r2.md"]
+
+
+def test_migrate_loose(tmp_path: Path):
+    (tmp_path / "one.md").write_text("one")
+    (tmp_path / "one_20250101T000000Z.md").write_text("one")
+    (tmp_path / "two.txt").write_text("two")
+
+    stats = migrate_loose(str(tmp_path))
+    assert stats == {"migrated": 3, "deduplicated": 1, "bytes": 9}
+    assert sorted(os.listdir(tmp_path)) == [".archive.lock", "index.jsonl", "segments"]
+    archive = ChronicleArchive(str(tmp_path))
+    assert archive.get("two.txt") == b"two"
+    assert migrate_loose(str(tmp_path))["migrated"] == 0
+
+
+def test_ingest_packed_backend(tmp_path: Path):
+    incoming = tmp_path / "data" / "reports_incoming"
+    incoming.mkdir(parents=True)
+    (incoming / "report.md").write_text("---\ntitle: Packed\n---\nbody\n")
+
+    script = Path(__file__).resolve().parents[1] / "src" / "ingest.py"
+    env = dict(os.environ, CODEX_ARCHIVE_BACKEND="packed")
+    subprocess.run(["python", str(script)], cwd=tmp_path, env=env, check=True)
+
+    archive_dir = tmp_path / "data" / "chronicle" / "archive"
+    assert not any(incoming.iterdir())
+    lines = (archive_dir / "index.jsonl").read_text().splitlines()
+    assert json.loads(lines[0])["name"] == "report.md"
+    assert ChronicleArchive(str(archive_dir)).get("report.md").startswith(b"---\ntitle: Packed")
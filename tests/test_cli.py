@@ -0,0 +1,68 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative import budgets in microseconds.  Generous enough for slow CI
+# machines, tight enough to catch an eager import of a heavy dependency.
+BUDGETS = {
+    "src.cli": 20_000,
+    "src.ingest": 60_000,
+    "src.codex16_validator": 60_000,
+    "src.loopstate_tracker": 60_000,
+}
+# Modules a subcommand must not drag in at startup
+HEAVY = {"yaml", "cProfile", "pstats", "fastapi", "numpy", "sqlite3", "src.chronicle_archive", "src.profiling"}
+
+
+def import_profile(module: str):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", line)
+        if match:
+            cumulative[match.group(2)] = int(match.group(1))
+    return cumulative
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS))
+def test_cold_import_budget(module):
+    # Best of three to smooth out a cold filesystem cache
+    profiles = [import_profile(module) for _ in range(3)]
+    best = min(p[module] for p in profiles)
+    assert best < BUDGETS[module], f"{module} imported in {best}us"
+    assert not HEAVY & set(profiles[0]), HEAVY & set(profiles[0])
+
+
+def test_cli_imports_nothing_from_the_project():
+    modules = set(import_profile("src.cli"))
+    assert not {m for m in modules if m.startswith(("src.", "core", "benchmarks"))} - {"src.cli"}
+
+
+def test_dispatch():
+    run = lambda *args: subprocess.run(  # noqa: E731
+        [sys.executable, "-m", "src.cli", *args], cwd=ROOT, capture_output=True, text=True
+    )
+    assert "rotate-anchor" in run("--help").stdout
+    assert run("handshake").returncode == 0
+    assert run("nope").returncode == 2
+    assert "--archive-backend" in run("ingest", "--help").stdout
+
+
+@pytest.mark.parametrize("command", ["handshake", "agents", "loopstate", "brief", "trends"])
+def test_help_has_no_side_effects(command, tmp_path):
+    proc = subprocess.run(
+        [sys.executable, "-m", "src.cli", command, "--help"],
+        cwd=tmp_path, capture_output=True, text=True, env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    assert proc.returncode == 0
+    assert proc.stdout.startswith(f"usage: codex18 {command}")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import math
+from pathlib import Path
+
+import pytest
+
+from src import codec
+from src.memory_ledger import MemoryBraid
+from src.validator import Validator
+
+ROOT = Path(__file__).resolve().parents[1]
+AVAILABLE = [name for name in codec.BACKENDS if name == "json" or getattr(codec, name) is not None]
+
+TRICKY = {
+    "unicode": "café – 東京 –   – 🛰",
+    "escapes": 'quote " backslash \\ tab \t newline \n',
+    "floats": [0.1, 1e-7, 1e16, 1.5e300, -0.0, 2.5],
+    "ints": [0, -1, 2 ** 53 + 1, 2 ** 63 - 1],
+    "nested": {"b": [None, True, False], "a": {"z": 1, "y": [{}]}},
+    "separators": "a, b: c",
+}
+
+
+def _stdlib_hash(node):
+    copy = dict(node)
+    copy.pop("truth_vector_hash", None)
+    return hashlib.sha256(json.dumps(copy, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def test_canonical_bytes_match_stdlib():
+    assert codec.canonical_bytes(TRICKY) == json.dumps(TRICKY, sort_keys=True).encode("utf-8")
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_round_trip_keeps_canonical_bytes(backend, monkeypatch):
+    monkeypatch.setattr(codec, "BACKEND", backend)
+    for indent in (False, True):
+        decoded = codec.loads(codec.dumps(TRICKY, indent=indent))
+        assert codec.canonical_bytes(decoded) == codec.canonical_bytes(TRICKY)
+    # Beyond what the fast backends handle natively
+    assert codec.loads(codec.dumps({"big": 2 ** 70})) == {"big": 2 ** 70}
+    assert codec.loads(b'{"v": NaN}')["v"] != codec.loads(b'{"v": NaN}')["v"]
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads(b'{"torn": ')
+
+
+def _real_braid(memory_dir: Path) -> MemoryBraid:
+    """A braid built from the repository's own config, truth and template files."""
+    return MemoryBraid(
+        config_path=str(ROOT / "VAULTIS.yml"),
+        memory_dir=str(memory_dir),
+        truth_files=[str(ROOT / "Codex17_continuity_seed.json"), str(ROOT / "Garden_memory_seed.md")],
+        template_files=[str(ROOT / "summarizer" / "OODA_loop_pulse_report.json"), str(ROOT / "Codex18_AGENTS_v1.0.md")],
+        gpt_config_files=[str(ROOT / "Codex18.yaml"), str(ROOT / "launch.yaml")],
+    )
+
+
+@pytest.mark.parametrize("writer", AVAILABLE)
+@pytest.mark.parametrize("reader", AVAILABLE)
+def test_braid_hashes_survive_every_backend(writer, reader, tmp_path, monkeypatch):
+    monkeypatch.setattr(codec, "BACKEND", writer)
+    braid = _real_braid(tmp_path)
+    for i in range(5):
+        braid.update({f"fact{i}": TRICKY if i == 2 else f"report {i}", "drift": [0.91, 0.4 + i / 10, 0.7, 0.8]})
+    for node in braid.long_term:
+        assert node["truth_vector_hash"] == _stdlib_hash(node)
+
+    monkeypatch.setattr(codec, "BACKEND", reader)
+    reloaded = _real_braid(tmp_path)
+    assert len(reloaded.long_term) == 5
+    assert reloaded.verify(None)
+    for node in reloaded.long_term:
+        assert node["truth_vector_hash"] == _stdlib_hash(node)
+
+
+def test_existing_stdlib_history_still_validates(tmp_path, monkeypatch):
+    # Histories written before the codec existed were plain json.dump output
+    node = {
+        "id": "2025-05-20T00:00:00Z",
+        "version_anchor": "v18.0.0",
+        "recursion_layer": "RI-256",
+        "symbolic_anchor": Validator.MANDATED_ANCHOR,
+        "parent_node": "2025-05-19T00:00:00Z",
+        "facts": TRICKY,
+    }
+    node["truth_vector_hash"] = _stdlib_hash(node)
+    (tmp_path / "braid_history.json").write_text(json.dumps([node], indent=2))
+    for backend in AVAILABLE:
+        monkeypatch.setattr(codec, "BACKEND", backend)
+        loaded = MemoryBraid(config_path=str(tmp_path / "missing.yml"), memory_dir=str(tmp_path)).long_term[0]
+        assert Validator().validate(loaded), backend
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_non_finite_floats_round_trip_and_verify(backend, tmp_path, monkeypatch):
+    monkeypatch.setattr(codec, "BACKEND", backend)
+    doc = {"drift": [float("nan"), float("inf"), -float("inf"), 0.5], "note": None}
+    decoded = codec.loads(codec.dumps(doc, indent=True))
+    assert math.isnan(decoded["drift"][0])
+    assert decoded["drift"][1:] == [float("inf"), -float("inf"), 0.5]
+    assert decoded["note"] is None
+
+    config = tmp_path / "VAULTIS.yml"
+    config.write_text("version: 18.0.0\n")
+    braid = MemoryBraid(config_path=str(config), memory_dir=str(tmp_path / "braid"))
+    braid.update({"score": float("nan"), "ceiling": float("inf")})
+    braid.update({"next": 1})
+    assert MemoryBraid(config_path=str(config), memory_dir=str(tmp_path / "braid")).verify(None)
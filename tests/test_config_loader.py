@@ -0,0 +1,80 @@
+import glob
+import os
+from pathlib import Path
+
+import pytest
+
+from src import config_loader
+from src.config_loader import ConfigError, _builtin_loads, load_config
+
+ROOT = Path(__file__).resolve().parents[1]
+REPO_CONFIGS = ["VAULTIS.yml", "launch.yaml", "Codex18.yaml"] + sorted(
+    os.path.relpath(p, ROOT) for p in glob.glob(str(ROOT / "config" / "*.yaml"))
+)
+
+
+@pytest.mark.parametrize("name", REPO_CONFIGS)
+def test_builtin_parser_matches_pyyaml(name):
+    yaml = pytest.importorskip("yaml")
+    text = (ROOT / name).read_text(encoding="utf-8")
+    assert _builtin_loads(text) == yaml.safe_load(text)
+
+
+def test_builtin_nested_structures():
+    text = (
+        "behaviors:\n"
+        "  - require_handshake:\n"
+        "      challenge: No Veteran Stands Alone\n"
+        "      response: No Veteran Left Behind\n"
+        "  - plain\n"
+        "  -\n"
+        "    nested: [1, 'two', {k: v}]\n"
+        "stack:\n"
+        "- a  # trailing comment\n"
+        "- \"b # not a comment\"\n"
+        "note: |\n"
+        "  line one\n"
+        "  line two\n"
+        "empty:\n"
+    )
+    assert _builtin_loads(text) == {
+        "behaviors": [
+            {
+                "require_handshake": {
+                    "challenge": "No Veteran Stands Alone",
+                    "response": "No Veteran Left Behind",
+                }
+            },
+            "plain",
+            {"nested": [1, "two", {"k": "v"}]},
+        ],
+        "stack": ["a", "b # not a comment"],
+        "note": "line one\nline two\n",
+        "empty": None,
+    }
+
+
+def test_builtin_rejects_bad_indentation():
+    with pytest.raises(ConfigError):
+        _builtin_loads("a: 1\n   b: 2\n")
+
+
+def test_load_config_cache(tmp_path, monkeypatch):
+    path = tmp_path / "cfg.yaml"
+    path.write_text("version: 1\n")
+    config_loader.clear_cache()
+
+    calls = []
+    name, parse = config_loader._select_parser()
+    monkeypatch.setattr(
+        config_loader, "_PARSER", (name, lambda text: calls.append(text) or parse(text))
+    )
+
+    first = load_config(str(path))
+    assert load_config(str(path)) is first
+    assert len(calls) == 1
+
+    path.write_text("version: 22\n")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+    assert load_config(str(path)) == {"version": 22}
+    assert len(calls) == 2
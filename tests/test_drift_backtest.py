@@ -0,0 +1,106 @@
+import json
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core import drift_backtest
+from core.drift_analysis_engine import DriftAnalysisEngine
+from core.drift_backtest import DriftBacktest, History, anchors
+from src.vector_index import VectorIndex
+
+
+def _history(count=300, seed=5):
+    rng = random.Random(seed)
+    start = 1_735_689_600  # 2025-01-01T00:00:00Z
+    timestamps = [start + i * 1800 for i in range(count)]
+    vectors = [[rng.random() for _ in range(4)] for _ in range(count)]
+    return History(timestamps, vectors)
+
+
+def _brute_force(history, anchor_rows, thresholds):
+    alarms = [
+        i for i, (vector, anchor) in enumerate(zip(history.vectors.tolist(), anchor_rows))
+        if any(abs(v - a) > t for v, a, t in zip(vector, anchor, thresholds))
+    ]
+    ts = history.timestamps.tolist()
+    return len(alarms), ts[alarms[0]] if alarms else -1, ts[alarms[-1]] if alarms else -1
+
+
+def test_matches_the_engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "analysis_output").mkdir(parents=True)
+    engine = DriftAnalysisEngine()
+    events = []
+    engine.subscribe(events.append)
+    rng = random.Random(7)
+    for _ in range(60):
+        engine.analyze_input(rng.random(), set(rng.sample(["bias", "omission", "speculation", "error"], 2)))
+    # Several analyses can share a one-second timestamp; keep the engine's order
+    for i, event in enumerate(events):
+        event["timestamp"] = f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}Z"
+
+    result = DriftBacktest(History.from_events(events)).sweep([[0.2] * 4])[0]
+    assert int(result.alarms[0]) == sum(event["alarm"] for event in events)
+
+
+@pytest.mark.parametrize("policy", ["fixed", "previous", "rotate:1d", "mean:5"])
+def test_sweep_matches_brute_force(policy):
+    history = _history()
+    backtest = DriftBacktest(history)
+    rng = random.Random(11)
+    candidates = [[rng.choice([0.1, 0.3, 0.5, 0.7, 0.9]) for _ in range(4)] for _ in range(40)]
+    result = backtest.sweep(candidates, [policy])[0]
+    anchor_rows = anchors(history, policy).tolist()
+    for row, thresholds in zip(result.rows(), candidates):
+        count, first, last = _brute_force(history, anchor_rows, thresholds)
+        assert row["alarms"] == count
+        assert row["first_alarm"] == (drift_backtest._iso(first) if count else None)
+        assert row["last_alarm"] == (drift_backtest._iso(last) if count else None)
+
+
+def test_anchor_policies():
+    history = History([0, 100, 86_400, 86_500], [[0.1] * 4, [0.2] * 4, [0.3] * 4, [0.4] * 4])
+    assert anchors(history, "rotate:1d")[:, 0].tolist() == [0.1, 0.1, 0.2, 0.2]
+    assert anchors(history, "previous")[:, 0].tolist() == [0.1, 0.1, 0.2, 0.3]
+    assert anchors(history, "mean:2")[:, 0].tolist() == pytest.approx([0.1, 0.1, 0.15, 0.25])
+    assert anchors(history, "fixed", anchor=[0.5] * 4)[:, 0].tolist() == [0.5] * 4
+    with pytest.raises(ValueError):
+        anchors(history, "rotate")
+
+
+def test_grid_and_chunked_counts_agree(monkeypatch):
+    backtest = DriftBacktest(_history())
+    axis = np.linspace(0.05, 0.5, 6)
+    grid = backtest.sweep_grid([axis] * 4, ["fixed", "previous"])
+    assert len(grid[0].alarms) == 6 ** 4
+    monkeypatch.setattr(drift_backtest, "MAX_GRID_CELLS", 0)
+    chunked = backtest.sweep(grid[0].thresholds, ["fixed", "previous"])
+    for a, b in zip(grid, chunked):
+        assert a.alarms.tolist() == b.alarms.tolist()
+
+
+def test_loading_is_read_only(tmp_path):
+    logs = tmp_path / "drift_logs"
+    logs.mkdir()
+    for i, vector in enumerate([[0.9] * 4, [0.5] * 4, [0.88] * 4]):
+        ts = f"2025-05-0{i + 1}T00:00:00Z"
+        (logs / f"drift_log_{ts}.json").write_text(json.dumps({"vector": vector, "timestamp": ts, "alarm": False}))
+    (logs / "drift_log_torn.json").write_text("{")
+    before = sorted(p.name for p in tmp_path.rglob("*"))
+
+    history = History.from_logs(str(logs))
+    assert len(history) == 3
+    assert sorted(p.name for p in tmp_path.rglob("*")) == before
+    rows = list(DriftBacktest(history).sweep([[0.2] * 4, [0.5] * 4])[0].rows())
+    assert [row["alarms"] for row in rows] == [1, 0]
+    assert rows[0]["first_alarm"] == rows[0]["last_alarm"] == "2025-05-02T00:00:00Z"
+    assert len(history.between(since="2025-05-02T00:00:00Z")) == 2
+
+    index = VectorIndex(str(tmp_path / "vectors.bin"))
+    index.backfill(str(logs))
+    index.close()
+    from_index = History.from_index(str(tmp_path / "vectors.bin"))
+    assert from_index.timestamps.tolist() == history.timestamps.tolist()
+    assert from_index.vectors.tolist() == history.vectors.tolist()
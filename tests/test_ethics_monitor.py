@@ -0,0 +1,81 @@
+import pytest
+
+from src.ethics_monitor import EthicsMonitor, PolicyError
+
+SUMMARY = {"Observe": "Convoy sighted", "Orient": "Routine", "Decide": "Monitor", "Act": "Report upward"}
+
+
+@pytest.fixture(scope="module")
+def monitor():
+    return EthicsMonitor()
+
+
+def test_repository_policy_clean_outputs(monitor):
+    assert monitor.evaluate(SUMMARY, kind="summary").action == "allow"
+    drift = {"vector": [0.9, 0.8, 0.7, 0.9], "alarm": False, "max_drift": 0.1}
+    assert monitor.evaluate(drift, kind="drift").allowed
+
+
+def test_text_rules_single_pass(monitor):
+    doc = dict(SUMMARY, Observe="Subject lives at 12 Elm St, SSN 123-45-6789", Act="call 555-123-4567")
+    verdict = monitor.evaluate(doc, kind="summary")
+    assert verdict.action == "block"
+    rules = {(hit["rule"], hit["field"]) for hit in verdict.hits}
+    assert {("doxxing", "Observe"), ("pii-us-ssn", "Observe"), ("pii-phone", "Act")} <= rules
+
+
+def test_field_and_threshold_rules(monitor):
+    verdict = monitor.evaluate({"Observe": "x", "Orient": "y", "Decide": "z"}, kind="summary")
+    assert [hit["rule"] for hit in verdict.hits] == ["summary-ooda-complete"]
+    assert not verdict.allowed
+
+    severe = monitor.evaluate({"vector": [0.1, 0.2, 0.3, 0.4], "max_drift": 0.7}, kind="drift")
+    assert severe.needs_review and severe.allowed
+    broken = monitor.evaluate({"vector": [1.5, 0, 0]}, kind="drift")
+    assert {hit["rule"] for hit in broken.hits} == {"drift-vector-shape", "drift-vector-range"}
+
+
+def test_batch_counters_and_bounds():
+    policy = {
+        "max_scan_chars": 50,
+        "rules": [
+            {"id": "secret", "type": "keywords", "keywords": ["classified"], "action": "review"},
+            {"id": "code", "type": "regex", "pattern": "OP-[0-9]+", "case_sensitive": True},
+        ],
+    }
+    monitor = EthicsMonitor(policy)
+    verdicts = monitor.evaluate_many(["classified op-1", "OP-7 plan", "x" * 60 + " classified"])
+    assert [v.action for v in verdicts] == ["review", "block", "allow"]
+    assert verdicts[2].truncated
+    assert monitor.stats() == {"secret": 1, "code": 1}
+
+
+def test_invalid_policies():
+    with pytest.raises(PolicyError):
+        EthicsMonitor({"rules": [{"id": "a", "type": "regex", "pattern": "("}]})
+    with pytest.raises(PolicyError):
+        EthicsMonitor({"rules": [{"id": "a", "type": "unknown"}]})
+    with pytest.raises(PolicyError):
+        EthicsMonitor(policy_path="/nonexistent/policy.json")
+
+
+def test_overlapping_rules_are_all_reported():
+    policy = {
+        "rules": [
+            {"id": "secret", "type": "keywords", "keywords": ["classified"], "action": "review"},
+            {"id": "leak", "type": "regex", "pattern": "classified (?:file|cable)s?"},
+            {"id": "cable", "type": "regex", "pattern": "cables? [0-9]+"},
+        ],
+    }
+    verdict = EthicsMonitor(policy).evaluate({"body": "the classified cables 42 leaked"})
+    assert {hit["rule"] for hit in verdict.hits} == {"secret", "leak", "cable"}
+    assert verdict.action == "block"
+
+
+def test_group_references_are_rejected():
+    for pattern in [r"(a)\1", r"(a)?(?(1)b|c)", r"x(y)\\\1"]:
+        with pytest.raises(PolicyError, match="group references"):
+            EthicsMonitor({"rules": [{"id": "a", "type": "regex", "pattern": pattern}]})
+    # An escaped backslash followed by a digit is a literal, not a reference
+    monitor = EthicsMonitor({"rules": [{"id": "a", "type": "regex", "pattern": r"(x)\\1"}]})
+    assert monitor.evaluate("x\\1").action == "block"
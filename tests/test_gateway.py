@@ -0,0 +1,107 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+from src import ingest
+from src.gateway import create_app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = tmp_path / "VAULTIS.yml"
+    config.write_text("version: 18.0.0\nrecursion_tier: RI-256\n")
+    app = create_app(
+        incoming_dir=str(tmp_path / "incoming"),
+        output_dir=str(tmp_path / "output"),
+        archive_dir=str(tmp_path / "archive"),
+        braid_kwargs={"config_path": str(config), "memory_dir": str(tmp_path / "braid")},
+    )
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_submit_and_ingest_report(client, tmp_path):
+    body = b"---\ntitle: Gateway\n---\nStreamed body\n"
+    response = client.post("/reports", params={"filename": "r1.md", "ingest": "true"}, content=body)
+    assert response.status_code == 201
+    data = response.json()
+    assert data["bytes"] == len(body)
+    assert data["metadata"] == {"title": "Gateway"}
+    assert data["ingested"] is True
+    assert (tmp_path / "output" / "r1.json").exists()
+    assert (tmp_path / "archive" / "r1.md").exists()
+
+    assert client.post("/reports", params={"filename": "../x"}, content=b"x").status_code == 400
+
+
+def test_drift_batch(client):
+    payload = {"inputs": [{"quality_score": 1.0, "tags": []}, {"quality_score": 0.1, "tags": ["bias"]}]}
+    data = client.post("/drift/batch", json=payload).json()
+    assert data["count"] == 2
+    assert data["results"][0]["alarm"] is False
+    assert len(data["results"][1]["vector"]) == 4
+
+    query = ",".join(str(v) for v in data["results"][1]["vector"])
+    similar = client.get("/drift/similar", params={"vector": query, "k": 1}).json()["results"]
+    assert similar[0]["distance"] == 0.0
+    assert similar[0]["ref"].endswith("Z")
+    assert client.get("/drift/similar", params={"vector": "1,2"}).status_code == 400
+
+
+def test_braid_endpoints(client):
+    created = client.post("/braid/nodes", json={"facts": {"topic": "harbor logistics"}})
+    assert created.status_code == 201
+    node_id = created.json()["id"]
+
+    assert client.get(f"/braid/nodes/{node_id}").json()["facts"] == {"topic": "harbor logistics"}
+    assert client.get("/braid/index/0").json()["id"] == node_id
+    assert client.get("/braid/index/5").status_code == 404
+    assert client.get("/braid/proof/0").json()["index"] == 0
+    hits = client.get("/braid/search", params={"q": "harbor"}).json()["results"]
+    assert hits[0]["node"]["id"] == node_id
+    assert client.get("/health").json()["status"] == "ok"
+    assert client.get("/metrics").status_code == 200
+
+
+def test_upload_in_progress_is_invisible_to_ingest(client, tmp_path):
+    incoming = tmp_path / "incoming"
+    seen = []
+
+    def body():
+        yield b"---\ntitle: Slow\n---\n"
+        # A cron ingest runs while the upload is still streaming
+        seen.extend(ingest.iter_incoming(str(incoming)))
+        yield b"second half\n"
+
+    assert client.post("/reports", params={"filename": "slow.md"}, content=body()).status_code == 201
+    assert seen == []
+    assert (incoming / "slow.md").read_bytes() == b"---\ntitle: Slow\n---\nsecond half\n"
+    assert [p.name for p in incoming.iterdir() if p.is_file()] == ["slow.md"]
+
+
+def test_pending_report_is_not_replaced(client, tmp_path):
+    assert client.post("/reports", params={"filename": "r2.md"}, content=b"first").status_code == 201
+    response = client.post("/reports", params={"filename": "r2.md", "ingest": "true"}, content=b"second")
+    assert response.status_code == 409
+    assert (tmp_path / "incoming" / "r2.md").read_bytes() == b"first"
+    assert [p.name for p in (tmp_path / "incoming").iterdir() if p.is_file()] == ["r2.md"]
+
+
+def test_ingest_claims_before_processing(client, tmp_path):
+    from src.work_claim import WorkClaimer
+
+    with WorkClaimer(str(tmp_path / "incoming"), worker_id="cron", heartbeat=False) as other:
+        def claim_first(name):
+            # Simulate an ``ingest --claim`` worker winning the race
+            other.claim(name)
+            return None
+
+        client.app.state.codex.claimer.claim = claim_first
+        response = client.post("/reports", params={"filename": "r3.md", "ingest": "true"}, content=b"body")
+        assert response.json()["ingested"] is False
+        assert other.pending() == [str(tmp_path / "incoming" / ".claims" / "cron" / "r3.md")]
+        assert not (tmp_path / "output" / "r3.json").exists()
@@ -6,7 +6,9 @@ import sys
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from src.codex16_validator import (
+    clear_cache,
     verify_handshake,
+    verify_many,
     HANDSHAKE_YAML,
     CHALLENGE_PHRASE,
     RESPONSE_PHRASE,
@@ -34,6 +36,19 @@ class HandshakeTests(unittest.TestCase):
         tampered = HANDSHAKE_YAML.replace(CHALLENGE_PHRASE, "Wrong Challenge")
         self.assertFalse(verify_handshake(tampered))
 
+    def test_cached_results_follow_content(self):
+        clear_cache()
+        tampered = HANDSHAKE_YAML.replace(SEAL_PHRASE, "Wrong Phrase")
+        self.assertTrue(verify_handshake(HANDSHAKE_YAML, audit=True))
+        self.assertTrue(verify_handshake(HANDSHAKE_YAML, audit=True))
+        self.assertFalse(verify_handshake(tampered, audit=True))
+        self.assertFalse(verify_handshake(tampered, audit=False))
+
+    def test_verify_many(self):
+        tampered = HANDSHAKE_YAML.replace("leader_ack: true", "leader_ack: false")
+        results = verify_many([HANDSHAKE_YAML, tampered, HANDSHAKE_YAML])
+        self.assertEqual(results, [True, False, True])
+
     def test_cli_exit_code(self):
         script = Path(__file__).resolve().parents[1] / "src" / "codex16_validator.py"
         result = subprocess.run(["python3", str(script)], capture_output=True, text=True)
@@ -53,3 +53,15 @@ def test_archiving_moves_file(tmp_path):
     assert archived_files
     assert "Just some report content" in archived_files[0].read_text()
 
+
+
+def test_ingest_populates_catalog(tmp_path):
+    from src.catalog import Catalog
+
+    _, output, archive, out_file, data = run_ingest(tmp_path, "report_with_yaml.md")
+    with Catalog(str(output / "catalog.sqlite3")) as catalog:
+        rows = catalog.find(author="Alice Example")
+    assert len(rows) == 1
+    assert rows[0]["sha256"] == data["sha256"]
+    assert rows[0]["output_path"].endswith(out_file.name)
+    assert rows[0]["archive_location"].endswith("report_with_yaml.md")
@@ -0,0 +1,167 @@
+import datetime
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src import ingest
+from src.atomic import atomic_open, atomic_write
+from src.catalog import Catalog
+from src.ingest_journal import IngestJournal
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_atomic_write_keeps_old_content_on_failure(tmp_path: Path):
+    target = tmp_path / "out.json"
+    atomic_write(str(target), '{"v": 1}')
+    with pytest.raises(RuntimeError):
+        with atomic_open(str(target)) as f:
+            f.write('{"v": 2, "trunc')
+            raise RuntimeError("crash mid-write")
+    assert json.loads(target.read_text()) == {"v": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+    atomic_write(str(target), b"raw")
+    assert target.read_bytes() == b"raw"
+
+
+def test_journal_merges_stages_and_compacts(tmp_path: Path):
+    path = tmp_path / "journal.jsonl"
+    journal = IngestJournal(str(path))
+    journal.record("a.md", "written", output="a.json", source=[1, 2])
+    journal.record("a.md", "archived", location="arch/a.md")
+    journal.record("b.md", "written", output="b.json", source=[3, 4])
+    journal.record("b.md", "archived", location=None)
+    journal.record("b.md", "done")
+    with pytest.raises(ValueError):
+        journal.record("c.md", "parsed")
+    journal.close(compact=False)
+    with open(path, "a") as f:
+        f.write('{"name": "c.md", "sta')  # torn line from a crash
+
+    reopened = IngestJournal(str(path))
+    assert reopened.entry("a.md") == {"stage": "archived", "output": "a.json", "source": [1, 2], "location": "arch/a.md"}
+    assert list(reopened.incomplete()) == ["a.md"]
+    assert reopened.compact() == 1
+    assert len(path.read_text().splitlines()) == 1
+    # Starting a report over forgets what the previous attempt recorded
+    reopened.record("a.md", "written", output="a2.json", source=[5, 6])
+    assert "location" not in reopened.entry("a.md")
+    reopened.close()
+
+
+def test_torn_line_is_cut_before_appending(tmp_path: Path):
+    path = tmp_path / "journal.jsonl"
+    journal = IngestJournal(str(path))
+    journal.record("a.md", "written", output="a.json", source=[1, 2])
+    journal.close(compact=False)
+    with open(path, "a") as f:
+        f.write('{"name": "b.md", "sta')
+
+    IngestJournal(str(path)).record("c.md", "written", output="c.json", source=[3, 4])
+    reopened = IngestJournal(str(path))
+    assert sorted(reopened.incomplete()) == ["a.md", "c.md"]
+    assert len(path.read_text().splitlines()) == 2
+
+
+def _setup(tmp_path: Path):
+    incoming, output, archive = tmp_path / "in", tmp_path / "out", tmp_path / "arch"
+    for path in (incoming, output, archive):
+        path.mkdir()
+    report = incoming / "r1.md"
+    report.write_text("---\ntitle: Resume\n---\nBody\n")
+    return report, output, archive
+
+
+def test_resumes_written_report_without_reparsing(tmp_path: Path, monkeypatch):
+    report, output, archive = _setup(tmp_path)
+    journal = IngestJournal(str(output / "journal.jsonl"))
+
+    # First attempt dies while archiving, after the output was written
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(ingest, "archive_report", crash)
+    with pytest.raises(KeyboardInterrupt):
+        ingest.ingest_file(str(report), str(output), str(archive), journal=journal)
+    monkeypatch.undo()
+    first = json.loads((output / "r1.json").read_text())
+    assert journal.entry("r1.md")["stage"] == "written"
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("finished stages must not be redone")
+
+    monkeypatch.setattr(ingest, "parse_report", no_parse)
+    with Catalog(str(output / "catalog.sqlite3"), batch_size=10) as catalog:
+        record = ingest.ingest_file(str(report), str(output), str(archive), catalog=catalog, journal=journal)
+        assert record == first
+        # Not done until the catalog row is committed
+        assert journal.entry("r1.md")["stage"] == "archived"
+    assert journal.entry("r1.md")["stage"] == "done"
+    assert (archive / "r1.md").exists()
+    assert journal.compact() == 0
+
+
+def test_changed_source_is_ingested_again(tmp_path: Path):
+    report, output, archive = _setup(tmp_path)
+    journal = IngestJournal(str(output / "journal.jsonl"))
+    journal.record("r1.md", "written", output=str(output / "r1.json"), source=[1, 1], path=str(report))
+    (output / "r1.json").write_text(json.dumps({"sha256": "stale", "ingest_timestamp": "2020-01-01T00:00:00Z"}))
+    record = ingest.ingest_file(str(report), str(output), str(archive), journal=journal)
+    assert record["sha256"] != "stale"
+    assert json.loads((output / "r1.json").read_text())["sha256"] == record["sha256"]
+
+
+def test_resume_journal_finishes_archived_reports(tmp_path: Path):
+    report, output, archive = _setup(tmp_path)
+    record = ingest.build_record({"title": "Gone"}, "Body", datetime.datetime(2025, 1, 1))
+    ingest.write_record(record, "gone.md", str(output))
+    journal = IngestJournal(str(output / "journal.jsonl"))
+    journal.record("gone.md", "written", output=str(output / "gone.json"), source=[4, 4], path=str(tmp_path / "x"))
+    journal.record("gone.md", "archived", location="arch/gone.md")
+    journal.record("r1.md", "written", output=str(output / "r1.json"), source=[0, 0], path=str(report))
+
+    with Catalog(str(output / "catalog.sqlite3")) as catalog:
+        # r1.md is still waiting in the incoming dir, so it is left for the ingest loop
+        assert ingest.resume_journal(journal, str(report.parent), catalog) == 1
+    with Catalog(str(output / "catalog.sqlite3")) as catalog:
+        assert catalog.find(title="Gone")[0]["archive_location"] == "arch/gone.md"
+    assert list(journal.incomplete()) == ["r1.md"]
+
+
+def test_restart_after_hard_crash(tmp_path: Path):
+    incoming = tmp_path / "data" / "reports_incoming"
+    incoming.mkdir(parents=True)
+    for i in range(10):
+        (incoming / f"report_{i}.md").write_text(f"---\ntitle: Report {i}\n---\nBody {i}\n")
+    # Kill the process outright while archiving the fourth report
+    crashing = (
+        "import os, sys\n"
+        f"sys.path.insert(0, {str(ROOT)!r})\n"
+        "from src import ingest\n"
+        "calls = []\n"
+        "real = ingest.archive_report\n"
+        "def archive(*args, **kwargs):\n"
+        "    calls.append(1)\n"
+        "    if len(calls) == 4:\n"
+        "        os._exit(9)\n"
+        "    return real(*args, **kwargs)\n"
+        "ingest.archive_report = archive\n"
+        "sys.argv = ['ingest', '--no-dedupe']\n"
+        "ingest.main()\n"
+    )
+    assert subprocess.run([sys.executable, "-c", crashing], cwd=tmp_path).returncode == 9
+    output = tmp_path / "data" / "analysis_output"
+    journal_lines = [json.loads(line) for line in (output / ".ingest_journal.jsonl").read_text().splitlines()]
+    assert sum(1 for e in journal_lines if e["stage"] == "written") == 4
+
+    subprocess.run([sys.executable, str(ROOT / "src" / "ingest.py"), "--no-dedupe"], cwd=tmp_path, check=True)
+    archived = sorted(p.name for p in (tmp_path / "data" / "chronicle" / "archive").iterdir())
+    assert archived == sorted(f"report_{i}.md" for i in range(10))
+    assert (output / ".ingest_journal.jsonl").read_text() == ""
+    with Catalog(str(output / "catalog.sqlite3")) as catalog:
+        assert len(catalog) == 10
+    assert not [name for name in os.listdir(output) if name.endswith(".tmp")]
@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+from core.drift_analysis_engine import DriftAnalysisEngine
+from src import loopstate_tracker
+from src.loopstate_tracker import LoopstateTracker, follow_logs
+
+TRIGGERS = {
+    "drift_divergence": {
+        "threshold": 0.3,
+        "condition": "drift_index >= threshold",
+        "action": "recalibrate_drift",
+    }
+}
+
+
+def test_tracker_receives_engine_events(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = DriftAnalysisEngine()
+    tracker = LoopstateTracker(window=4, triggers=TRIGGERS)
+    tracker.attach(engine)
+
+    engine.analyze_input(1.0, set())
+    assert tracker.total_events == 1
+    assert not tracker.fired
+
+    engine.analyze_input(0.0, {"misinformation", "inconsistency"})
+    assert tracker.total_alarms == 1
+    assert tracker.alarm_rate() == 0.5
+    assert tracker.metrics["drift_index"] == 1.0
+    assert [f["action"] for f in tracker.fired] == ["recalibrate_drift"]
+
+
+def test_window_bounds_memory():
+    tracker = LoopstateTracker(window=3, triggers={})
+    for i in range(10):
+        tracker.observe({"diff_anchor": [i / 10, 0.0, 0.0, 0.0], "alarm": i % 2 == 0})
+    assert tracker.total_events == 10
+    assert len(tracker.axis_drift[0]) == 3
+    assert tracker.percentiles((50, 100))[0] == {"p50": 0.8, "p100": 0.9}
+
+
+def test_follow_logs_only_reads_new_files(tmp_path, monkeypatch):
+    def write(i, text=None):
+        path = tmp_path / f"drift_log_2025-01-01T00:00:0{i}Z.json"
+        path.write_text(text if text is not None else json.dumps({"diff_anchor": [0.1] * 4, "alarm": i == 1}))
+
+    write(0)
+    write(1)
+    write(2, "{")  # still being written
+    tracker = LoopstateTracker(window=8, triggers={})
+    polls = []
+
+    def tick(_interval):
+        polls.append(tracker.total_events)
+        if len(polls) == 1:
+            write(2)
+            write(3)
+        elif len(polls) == 3:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(loopstate_tracker.time, "sleep", tick)
+    with pytest.raises(KeyboardInterrupt):
+        follow_logs(tracker, str(tmp_path), follow=True, interval=0)
+    # The torn log is retried once it is complete, and nothing is read twice
+    assert polls == [2, 4, 4]
+    assert tracker.total_alarms == 1
+
+    replay = LoopstateTracker(window=8, triggers={})
+    (tmp_path / "drift_log_2025-01-01T00:00:04Z.json").write_text("{")
+    follow_logs(replay, str(tmp_path), follow=False, interval=0)
+    assert replay.total_events == 4
+
+
+def test_follow_logs_survives_coarse_mtimes_and_slow_writers(tmp_path, monkeypatch):
+    def write(i, text=None):
+        stat = os.stat(tmp_path)
+        path = tmp_path / f"drift_log_2025-01-01T00:00:0{i}Z.json"
+        path.write_text(text if text is not None else json.dumps({"diff_anchor": [0.1] * 4, "alarm": False}))
+        # Same timestamp tick as the previous listing: the directory looks unchanged
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    write(0)
+    tracker = LoopstateTracker(window=8, triggers={})
+    polls = []
+
+    def tick(_interval):
+        polls.append(tracker.total_events)
+        if len(polls) == 1:
+            write(1)
+            write(2, "{")
+        elif len(polls) == 4:
+            write(2)
+        elif len(polls) == 5:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(loopstate_tracker.time, "sleep", tick)
+    with pytest.raises(KeyboardInterrupt):
+        follow_logs(tracker, str(tmp_path), follow=True, interval=0)
+    # The slow log stays pending across polls instead of being dropped
+    assert polls == [1, 2, 2, 2, 3]
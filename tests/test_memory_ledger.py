@@ -52,10 +52,10 @@ def test_braid_updates(tmp_path: Path):
     mb.update({"fact1": "alpha"})
     mb.update({"fact2": "beta"})
 
-    history_file = braid_dir / "braid_history.json"
+    history_file = braid_dir / "braid_history.jsonl"
     assert history_file.exists()
 
-    data = json.loads(history_file.read_text())
+    data = [json.loads(line) for line in history_file.read_text().splitlines()]
     assert len(data) == 2
     first, second = data
     assert first["symbolic_anchor"] == "Codex18_AGENTS_v1.0"
@@ -0,0 +1,65 @@
+import multiprocessing
+from pathlib import Path
+
+from src.locking import FileLock
+from src.memory_braid import MemoryBraid
+from src.memory_retriever import MemoryRetriever
+
+
+def make_braid(tmp_path: Path) -> MemoryBraid:
+    config = tmp_path / "VAULTIS.yml"
+    config.write_text("version: 18.0.0\nrecursion_tier: RI-256\n")
+    return MemoryBraid(config_path=str(config), memory_dir=str(tmp_path / "braid"))
+
+
+def test_search_and_lookup(tmp_path: Path):
+    braid = make_braid(tmp_path)
+    retriever = MemoryRetriever(braid)
+    braid.update({"topic": "supply chain disruption"})
+    braid.update({"region": "Baltic shipping"})
+    assert retriever.refresh() == 2
+
+    hits = retriever.search("baltic shipping")
+    assert hits[0]["index"] == 1
+    assert hits[0]["score"] == 2
+    # Facts carry over, so both nodes mention the supply chain topic
+    assert {h["index"] for h in retriever.search("supply")} == {0, 1}
+    assert retriever.search("nothing-matches") == []
+
+    node = braid.long_term[-1]
+    assert retriever.get(node["id"]) == node
+    assert retriever.get("missing") is None
+
+
+def test_reload_picks_up_other_writers(tmp_path: Path):
+    reader = make_braid(tmp_path)
+    writer = make_braid(tmp_path)
+    assert reader.reload() is False
+
+    writer.update({"fact": "written elsewhere"})
+    assert reader.reload() is True
+    assert reader.long_term == writer.long_term
+    assert reader.merkle.root() == writer.merkle.root()
+    assert reader.reload() is False
+
+
+def _bump(path: str, lock_path: str, rounds: int) -> None:
+    lock = FileLock(lock_path)
+    for _ in range(rounds):
+        with lock:
+            with open(path) as f:
+                value = int(f.read())
+            with open(path, "w") as f:
+                f.write(str(value + 1))
+
+
+def test_file_lock_serialises_processes(tmp_path: Path):
+    counter = tmp_path / "counter"
+    counter.write_text("0")
+    lock_path = str(tmp_path / ".lock")
+    procs = [multiprocessing.Process(target=_bump, args=(str(counter), lock_path, 50)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    assert counter.read_text() == "200"
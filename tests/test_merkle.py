@@ -0,0 +1,93 @@
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+
+from src.memory_braid import BraidCorruptionError, MemoryBraid
+from src.merkle import MerkleLog, verify_proof
+
+
+def leaf_hashes(count: int):
+    return [hashlib.sha256(str(i).encode()).hexdigest() for i in range(count)]
+
+
+def test_historical_roots_match_fresh_logs():
+    leaves = leaf_hashes(37)
+    log = MerkleLog(leaves)
+    for size in (0, 1, 2, 5, 16, 37):
+        assert log.root(size) == MerkleLog(leaves[:size]).root()
+
+
+def test_inclusion_proofs():
+    leaves = leaf_hashes(23)
+    log = MerkleLog(leaves)
+    root = log.root()
+    for idx, leaf in enumerate(leaves):
+        proof = log.proof(idx)
+        assert len(proof["path"]) <= 5
+        assert verify_proof(leaf, proof, root)
+    assert not verify_proof(leaves[1], log.proof(0), root)
+
+
+def make_braid(tmp_path: Path) -> MemoryBraid:
+    config = tmp_path / "VAULTIS.yml"
+    config.write_text("version: 18.0.0\n")
+    return MemoryBraid(config_path=str(config), memory_dir=str(tmp_path / "braid"))
+
+
+def test_braid_checkpoint_verification(tmp_path: Path):
+    mb = make_braid(tmp_path)
+    for i in range(5):
+        mb.update({f"fact{i}": i})
+    entry = mb.checkpoint()
+    assert entry["size"] == 5
+    mb.update({"fact5": 5})
+
+    reloaded = make_braid(tmp_path)
+    assert reloaded.verify()
+    assert reloaded.verify(None)
+    proof = reloaded.prove(3)
+    assert MemoryBraid.verify_proof(proof)
+
+
+def test_braid_detects_tampering(tmp_path: Path):
+    mb = make_braid(tmp_path)
+    for i in range(4):
+        mb.update({f"fact{i}": i})
+    mb.checkpoint()
+    mb.update({"fact4": 4})
+
+    history_file = tmp_path / "braid" / "braid_history.jsonl"
+
+    def rewrite(data):
+        history_file.write_text("".join(json.dumps(node) + "\n" for node in data))
+
+    data = [json.loads(line) for line in history_file.read_text().splitlines()]
+    data[-1]["facts"]["fact4"] = "forged"
+    rewrite(data)
+    assert not make_braid(tmp_path).verify()
+
+    data[-1]["facts"]["fact4"] = 4
+    data[1]["truth_vector_hash"] = "0" * 64
+    rewrite(data)
+    assert not make_braid(tmp_path).verify()
+
+
+def test_checkpoint_refuses_to_seal_tampered_nodes(tmp_path: Path):
+    mb = make_braid(tmp_path)
+    for i in range(3):
+        mb.update({f"fact{i}": i})
+    first = mb.checkpoint()
+    mb.update({"fact3": 3})
+
+    history_file = tmp_path / "braid" / "braid_history.jsonl"
+    data = [json.loads(line) for line in history_file.read_text().splitlines()]
+    data[-1]["facts"]["fact3"] = "forged"
+    history_file.write_text("".join(json.dumps(node) + "\n" for node in data))
+
+    forged = make_braid(tmp_path)
+    with pytest.raises(BraidCorruptionError):
+        forged.checkpoint()
+    checkpoints = json.loads((tmp_path / "braid" / "braid_checkpoints.json").read_text())
+    assert checkpoints == [first]
@@ -0,0 +1,106 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from src import near_duplicate
+from src.near_duplicate import NearDuplicateIndex, shingles, signature, similarity
+
+WORDS = [f"word{i}" for i in range(500)]
+
+
+def _story(seed: int, length: int = 300) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def _edit(text: str, changes: int, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = "edited"
+    return " ".join(words)
+
+
+def test_shingles_ignore_formatting():
+    assert shingles("Breaking: the Council met today.") == shingles("breaking the   council\nmet TODAY")
+    assert shingles("") == set()
+    with pytest.raises(ValueError):
+        signature(set())
+
+
+def test_numpy_and_python_signatures_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    hashes = shingles(_story(3))
+    fast = signature(hashes)
+    monkeypatch.setattr(near_duplicate, "np", None)
+    assert signature(hashes) == fast
+
+
+def test_similarity_tracks_edits():
+    base = _story(1)
+    close = similarity(signature(shingles(base)), signature(shingles(_edit(base, 3))))
+    far = similarity(signature(shingles(base)), signature(shingles(_story(2))))
+    assert close > 0.8
+    assert far < 0.2
+
+
+def test_clusters_near_duplicates(tmp_path: Path):
+    index = NearDuplicateIndex(str(tmp_path / "nd.sqlite3"))
+    base = _story(1)
+    assert index.assign("original", base) is None
+    assert index.assign("unrelated", _story(2)) is None
+
+    first = index.assign("copy_1", _edit(base, 3, seed=5))
+    assert first.representative == "original" and first.similarity >= 0.8
+    # A copy of a copy still joins the original's cluster
+    second = index.assign("copy_2", _edit(_edit(base, 3, seed=5), 2, seed=9))
+    assert second.representative == "original"
+
+    assert index.cluster("copy_2") == ["original", "copy_1", "copy_2"]
+    assert index.clusters() == [["original", "copy_1", "copy_2"]]
+    assert index.find(_edit(base, 1, seed=11)).representative == "original"
+    assert index.find(_story(3)) is None
+    assert index.assign("empty", "   ") is None
+
+    # Re-assigning the representative keeps it as the cluster head
+    assert index.assign("original", base) is None
+    index.close()
+
+    reopened = NearDuplicateIndex(str(tmp_path / "nd.sqlite3"))
+    assert len(reopened) == 4
+    assert reopened.representative("copy_1") == "original"
+
+
+def test_candidate_lookup_uses_band_index(tmp_path: Path):
+    index = NearDuplicateIndex(str(tmp_path / "nd.sqlite3"))
+    plan = index._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT doc_id FROM bands WHERE band = ? AND bucket = ?", (0, 0)
+    ).fetchall()
+    assert "bands_lookup" in " ".join(str(tuple(row)) for row in plan)
+
+
+def test_ingest_tags_and_pipeline_skips_duplicates(tmp_path: Path, monkeypatch):
+    from src.ingest import iter_incoming
+    from src.main import build_codex_pipeline
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "VAULTIS.yml").write_text("version: 18.0.0\n")
+    incoming = tmp_path / "data" / "reports_incoming"
+    incoming.mkdir(parents=True)
+    base = _story(1)
+    (incoming / "a_original.md").write_text(base)
+    (incoming / "b_repost.md").write_text(_edit(base, 2))
+    (incoming / "c_other.md").write_text(_story(2))
+
+    index = NearDuplicateIndex(str(tmp_path / "nd.sqlite3"))
+    pipeline = build_codex_pipeline(ingest_workers=1, near_duplicates=index)
+    report = pipeline.run(iter_incoming(str(incoming)))
+
+    assert report["stages"]["dedupe"]["dropped"] == 1
+    assert report["items_out"] == 2
+    output = tmp_path / "data" / "analysis_output"
+    repost = json.loads((output / "b_repost.json").read_text())
+    assert repost["near_duplicate_of"] == "a_original"
+    assert "near_duplicate_of" not in json.loads((output / "c_other.json").read_text())
@@ -0,0 +1,104 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.output_formatter import BriefFormatter
+
+
+def make_tree(tmp_path: Path):
+    output = tmp_path / "analysis_output"
+    logs = output / "drift_logs"
+    summaries = output / "summaries"
+    for d in (logs, summaries):
+        d.mkdir(parents=True)
+    (output / "r1.json").write_text(json.dumps({
+        "ingest_timestamp": "2025-05-20T10:00:00Z",
+        "sha256": "ab" * 32,
+        "metadata": {"title": "Harbor <watch>", "tags": ["osint"]},
+        "content": "Ships observed leaving port.",
+    }))
+    (output / "latest_drift_report.json").write_text(json.dumps({"vector": [0, 0, 0, 0]}))
+    (logs / "drift_log_2025-05-20T10:00:01Z.json").write_text(json.dumps({
+        "vector": [0.5, 0.5, 0.5, 0.5], "diff_anchor": [0.3, 0, 0, 0], "alarm": True,
+        "timestamp": "2025-05-20T10:00:01Z",
+    }))
+    (summaries / "r1.json").write_text(json.dumps({
+        "Observe": "Ships leaving", "Orient": "Routine", "Decide": "Monitor", "Act": "Report",
+        "timestamp": "2025-05-20T10:05:00Z",
+    }))
+    return output, logs, summaries
+
+
+def formatter_for(tmp_path, output, logs, summaries):
+    return BriefFormatter(str(output), str(logs), str(summaries), str(tmp_path / "fragments.sqlite3"))
+
+
+def test_markdown_json_html(tmp_path):
+    dirs = make_tree(tmp_path)
+    formatter = formatter_for(tmp_path, *dirs)
+
+    md = "".join(formatter.iter_brief("md"))
+    assert "### Harbor <watch> _[osint]_" in md
+    assert "**ALARM** max drift 0.300" in md
+    assert "- **Decide:** Monitor" in md
+
+    doc = json.loads("".join(formatter.iter_brief("json", title="Daily")))
+    assert doc["title"] == "Daily"
+    assert [len(doc["sections"][k]) for k in ("reports", "drift", "summaries")] == [1, 1, 1]
+    assert doc["sections"]["drift"][0]["alarm"] is True
+
+    page = "".join(formatter.iter_brief("html"))
+    assert "Harbor &lt;watch&gt;" in page
+    assert page.endswith("</html>\n")
+
+
+def test_incremental_rerender(tmp_path):
+    output, logs, summaries = make_tree(tmp_path)
+    brief = tmp_path / "brief.md"
+    first = formatter_for(tmp_path, output, logs, summaries).write_brief(str(brief))
+    assert first["rendered"] == 4 and first["reused"] == 0
+
+    (logs / "drift_log_2025-05-20T11:00:00Z.json").write_text(json.dumps({
+        "vector": [0.1] * 4, "diff_anchor": [0.0] * 4, "alarm": False, "timestamp": "2025-05-20T11:00:00Z",
+    }))
+    second = formatter_for(tmp_path, output, logs, summaries).write_brief(str(brief))
+    assert second == {"rendered": 1, "reused": 4, "skipped": 0}
+    assert "2025-05-20T11:00:00Z ok" in brief.read_text()
+
+
+def test_window_filters_by_timestamp_and_mtime(tmp_path):
+    output, logs, summaries = make_tree(tmp_path)
+    old = time.time() - 3 * 86400
+    os.utime(output / "r1.json", (old, old))
+    formatter = formatter_for(tmp_path, output, logs, summaries)
+
+    since = datetime.fromtimestamp(time.time() - 86400, timezone.utc)
+    doc = json.loads("".join(formatter.iter_brief("json", since=since)))
+    # r1.json was skipped on mtime alone; the others fall outside by timestamp
+    assert doc["sections"] == {"reports": [], "drift": [], "summaries": []}
+    assert formatter.stats["skipped"] == 1
+
+
+def test_unchanged_directories_are_not_listed(tmp_path, monkeypatch):
+    output, logs, summaries = make_tree(tmp_path)
+    formatter_for(tmp_path, output, logs, summaries).write_brief(str(tmp_path / "brief.md"))
+
+    # Replace one report by rename and remove the summary
+    replacement = output / ".r1.json.tmp"
+    replacement.write_text((output / "r1.json").read_text().replace("Harbor", "Dock"))
+    os.replace(replacement, output / "r1.json")
+    (summaries / "r1.json").unlink()
+    stats = formatter_for(tmp_path, output, logs, summaries).write_brief(str(tmp_path / "brief.md"))
+    assert stats == {"rendered": 1, "reused": 2, "skipped": 0}
+    text = (tmp_path / "brief.md").read_text()
+    assert "### Dock <watch>" in text and "Ships leaving" not in text
+
+    def no_listing(*args):
+        raise AssertionError("an unchanged directory was listed")
+
+    monkeypatch.setattr(os, "scandir", no_listing)
+    monkeypatch.setattr(os, "listdir", no_listing)
+    stats = formatter_for(tmp_path, output, logs, summaries).write_brief(str(tmp_path / "brief.md"))
+    assert stats == {"rendered": 0, "reused": 3, "skipped": 0}
@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from src import parse_metrics
+from src.parse_metrics import REGISTRY, Histogram, timed, timer
+from src.validator import Validator
+
+
+@pytest.fixture
+def metrics():
+    REGISTRY.reset()
+    parse_metrics.enable()
+    yield REGISTRY
+    parse_metrics.enable(False)
+    REGISTRY.reset()
+
+
+def test_disabled_records_nothing():
+    REGISTRY.reset()
+    parse_metrics.enable(False)
+    Validator().validate({})
+    with timer("noop"):
+        pass
+    assert REGISTRY.snapshot() == {"counters": {}, "histograms": {}}
+
+
+def test_timed_functions_and_errors(metrics):
+    @timed("unit")
+    def work(fail=False):
+        if fail:
+            raise ValueError("fail")
+        return 1
+
+    assert work() == 1
+    with pytest.raises(ValueError):
+        work(fail=True)
+    Validator().validate({})
+
+    snap = metrics.snapshot()
+    assert snap["histograms"]['codex_stage_seconds{stage="unit"}']["count"] == 2
+    assert snap["counters"]['codex_stage_errors_total{stage="unit"}'] == 1
+    assert 'codex_stage_seconds{stage="validator_validate"}' in snap["histograms"]
+
+
+def test_prometheus_export(metrics):
+    with timer("ingest_parse"):
+        pass
+    text = metrics.to_prometheus()
+    assert "# TYPE codex_stage_seconds histogram" in text
+    assert 'codex_stage_seconds_bucket{stage="ingest_parse",le="+Inf"} 1' in text
+    assert 'codex_stage_seconds_count{stage="ingest_parse"} 1' in text
+
+
+def test_histogram_quantiles():
+    hist = Histogram("h", {})
+    for i in range(1, 1001):
+        hist.observe(i / 1000)
+    assert hist.quantile(0.5) == pytest.approx(0.5, rel=0.25)
+    assert hist.quantile(0.99) == pytest.approx(0.99, rel=0.25)
+    assert hist.quantile(1.0) <= hist.max
+
+
+def test_export_while_series_are_added():
+    registry = parse_metrics.MetricsRegistry()
+
+    def add_series():
+        for n in range(2_000):
+            registry.counter("codex_rule_hits_total", {"rule": str(n)}).inc()
+
+    writer = threading.Thread(target=add_series)
+    writer.start()
+    try:
+        while writer.is_alive():
+            registry.snapshot()
+    finally:
+        writer.join()
+    assert len(registry.snapshot()["counters"]) == 2_000
+    assert registry.to_prometheus().count("codex_rule_hits_total{") == 2_000
@@ -0,0 +1,106 @@
+import json
+import shutil
+import time
+from pathlib import Path
+
+from src.main import Pipeline, Stage, build_codex_pipeline
+from src.ingest import iter_incoming
+from src.memory_braid import BraidReader
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def test_stages_chain_and_filter():
+    def double(x):
+        return x * 2
+
+    def drop_odd_thirds(x):
+        if x % 3 == 0:
+            return None
+        if x == 10:
+            raise ValueError("bad item")
+        return x
+
+    pipeline = Pipeline([Stage("double", double, workers=3), Stage("filter", drop_odd_thirds, workers=2)])
+    report = pipeline.run(range(10))
+    assert report["items_in"] == 10
+    assert report["stages"]["double"]["processed"] == 10
+    assert report["stages"]["filter"]["errors"] == 1
+    # 0, 6, 12, 18 are dropped by the filter and 10 errors out
+    assert report["items_out"] == 5
+
+
+def test_bounded_queues_apply_backpressure():
+    def slow(x):
+        time.sleep(0.01)
+        return x
+
+    pipeline = Pipeline([Stage("fast", lambda x: x, maxsize=2), Stage("slow", slow, maxsize=2)])
+    report = pipeline.run(range(20))
+    assert report["items_out"] == 20
+    assert report["stages"]["slow"]["max_queue_depth"] <= 2
+
+
+def test_codex_pipeline_end_to_end(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    incoming = tmp_path / "data" / "reports_incoming"
+    incoming.mkdir(parents=True)
+    shutil.copy(FIXTURES / "report_with_yaml.md", incoming)
+    shutil.copy(FIXTURES / "plain_report.txt", incoming)
+    (tmp_path / "VAULTIS.yml").write_text("version: 18.0.0\n")
+
+    pipeline = build_codex_pipeline(ingest_workers=2, queue_size=4)
+    report = pipeline.run(iter_incoming(str(incoming)))
+
+    assert report["items_out"] == 2
+    assert set(report["stages"]) == {"ingest", "drift", "braid", "release"}
+    assert report["stages"]["release"]["dropped"] == 0
+    assert not any(incoming.iterdir())
+    history = BraidReader(str(tmp_path / "data" / "memory_braid")).nodes
+    assert len(history) == 2
+    sources = {node["facts"]["latest_report"]["source"] for node in history}
+    assert sources <= {"report_with_yaml.md", "plain_report.txt"}
+
+
+def test_alarmed_records_list_similar_past_vectors(tmp_path, monkeypatch):
+    from src.vector_index import VectorIndex
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "VAULTIS.yml").write_text("version: 18.0.0\n")
+    (tmp_path / "data").mkdir()
+    # A far-away anchor makes every analysis raise an alarm
+    (tmp_path / "data" / "drift_anchor.json").write_text(json.dumps({"baseline_vector": [5.0] * 4}))
+    index = VectorIndex(str(tmp_path / "vectors.bin"))
+    pipeline = build_codex_pipeline(vector_index=index)
+    drift = next(stage for stage in pipeline.stages if stage.name == "drift")
+
+    first = drift.func({"metadata": {"quality_score": 0.9}})
+    assert first["drift"]["alarm"] and first["drift"]["similar"] == []
+    second = drift.func({"metadata": {"quality_score": 0.9}})
+    assert len(index) == 2
+    assert second["drift"]["similar"][0]["distance"] == 0.0
+
+
+def test_released_summaries_reach_the_brief(tmp_path, monkeypatch):
+    from src import summarizer
+    from src.output_formatter import BriefFormatter
+
+    class CannedSummarizer:
+        def summarize(self, input_data):
+            return {"Observe": "Ships leaving", "Orient": "Routine", "Decide": "Monitor", "Act": "Report"}
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(summarizer, "Summarizer", CannedSummarizer)
+    incoming = tmp_path / "data" / "reports_incoming"
+    incoming.mkdir(parents=True)
+    shutil.copy(FIXTURES / "plain_report.txt", incoming)
+    (tmp_path / "VAULTIS.yml").write_text("version: 18.0.0\n")
+
+    output = tmp_path / "data" / "analysis_output"
+    report = build_codex_pipeline(summarize_workers=1, output_dir=str(output)).run(iter_incoming(str(incoming)))
+    assert report["items_out"] == 1
+    saved = json.loads((output / "summaries" / "plain_report.json").read_text())
+    assert saved["Decide"] == "Monitor" and saved["source"] == "plain_report.txt"
+
+    formatter = BriefFormatter(str(output), str(output / "drift_logs"), str(output / "summaries"), None)
+    assert "- **Decide:** Monitor" in "".join(formatter.iter_brief("md"))
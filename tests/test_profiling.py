@@ -0,0 +1,81 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.profiling import Profiler, from_env
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+def test_sampler_collapsed_stacks(tmp_path):
+    with Profiler("sample", interval=0.001, label="unit") as profiler:
+        worker = threading.Thread(target=_busy, args=(0.2,))
+        worker.start()
+        worker.join()
+
+    assert profiler.samples > 0
+    lines = profiler.collapsed()
+    assert any("test_profiling.py:_busy" in line for line in lines)
+    for line in lines:
+        stack, weight = line.rsplit(" ", 1)
+        assert stack and int(weight) > 0
+
+    report = profiler.report(5, str(tmp_path))
+    assert len(report["top"]) <= 5
+    assert (tmp_path / report["files"]["collapsed"].split("/")[-1]).exists()
+
+
+def test_cprofile_top(tmp_path):
+    with Profiler("cprofile", label="unit") as profiler:
+        _busy(0.05)
+
+    top = profiler.top(10)
+    assert any("_busy" in row["function"] for row in top)
+    report = profiler.report(10, str(tmp_path))
+    assert report["files"]["pstats"].endswith(".pstats")
+    assert any(";" in line for line in profiler.collapsed())
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv("CODEX_PROFILE", raising=False)
+    assert from_env("x") is None
+    monkeypatch.setenv("CODEX_PROFILE", "1")
+    assert from_env("x").mode == "sample"
+    assert from_env("x", "cprofile").mode == "cprofile"
+    with pytest.raises(ValueError):
+        Profiler("perf")
+
+
+def test_idle_threads_are_not_sampled():
+    work = queue.Queue()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # Park every pool worker waiting for work
+        for future in [pool.submit(time.sleep, 0) for _ in range(4)]:
+            future.result()
+        idle = [threading.Thread(target=work.get) for _ in range(4)]
+        for thread in idle:
+            thread.start()
+
+        with Profiler("sample", interval=0.001, label="unit") as profiler:
+            _busy(0.2)
+        with Profiler("sample", interval=0.001, label="unit", all_threads=True) as everything:
+            _busy(0.05)
+
+        for _ in idle:
+            work.put(None)
+        for thread in idle:
+            thread.join()
+
+    # The busy thread outranks eight idle ones only once they are filtered
+    assert profiler.top(1)[0]["function"] == "test_profiling.py:_busy"
+    assert not any("queue.py:get" in line or "thread.py:_worker" in line for line in profiler.collapsed())
+    assert everything.top(1)[0]["function"] != "test_profiling.py:_busy"
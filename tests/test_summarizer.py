@@ -1,13 +1,14 @@
+import json
 import os
 import logging
+import re
 import pytest
 
-openai = pytest.importorskip("openai")
-
 from src.summarizer import Summarizer
 
 
 def test_summarizer_ooda_structure(caplog):
+    pytest.importorskip("openai")
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         pytest.skip("Set OPENAI_API_KEY to run this test")
@@ -31,9 +32,62 @@ def test_summarizer_ooda_structure(caplog):
 
 
 def test_summarizer_error_handling(caplog):
+    pytest.importorskip("openai")
     caplog.set_level(logging.ERROR)
     bad_summ = Summarizer(api_key="INVALID_KEY")
     with pytest.raises(Exception):
         bad_summ.summarize({"dummy": "data"})
     assert "OpenAI API error" in caplog.text or "OpenAI library not available" in caplog.text
 
+
+
+def _ooda(text):
+    return {key: f"{key} {text}" for key in ("Observe", "Orient", "Decide", "Act")}
+
+
+class FakeSummarizer(Summarizer):
+    """Answers from the prompt itself; ``broken`` report texts get a bad packed entry."""
+
+    def __init__(self, broken=(), garbled=False):
+        super().__init__(api_key="test")
+        self.prompts = []
+        self.broken = set(broken)
+        self.garbled = garbled
+
+    def _call_openai(self, prompt):
+        self.prompts.append(prompt)
+        reports = re.findall(r"^\[(r\d+)\]\n(.*)$", prompt, re.M)
+        if not reports:
+            return json.dumps(_ooda(prompt.split("\n\n")[1]))
+        if self.garbled:
+            return "Sure! Here are your summaries:"
+        return json.dumps(
+            {key: {"Observe": ""} if text in self.broken else _ooda(text) for key, text in reports}
+        )
+
+
+def test_summarize_many_packs_small_inputs():
+    summ = FakeSummarizer()
+    inputs = [{"text": f"report {i}"} for i in range(45)]
+    summaries = summ.summarize_many(inputs, max_batch=20)
+    assert summaries == [_ooda(f"report {i}") for i in range(45)]
+    assert len(summ.prompts) == 3
+
+
+def test_summarize_many_falls_back_per_entry():
+    summ = FakeSummarizer(broken={"report 3"})
+    summaries = summ.summarize_many([{"text": f"report {i}"} for i in range(5)])
+    assert summaries[3] == _ooda("report 3")
+    assert len(summ.prompts) == 2
+    assert "[r0]" not in summ.prompts[1]
+
+    garbled = FakeSummarizer(garbled=True)
+    assert garbled.summarize_many([{"text": "a"}, {"text": "b"}]) == [_ooda("a"), _ooda("b")]
+    assert len(garbled.prompts) == 3
+
+
+def test_pack_respects_budget():
+    texts = ["x" * 400, "x" * 4000, "x" * 400, "x" * 400]
+    # ~101 tokens each for the small ones; the large one gets its own call
+    assert Summarizer.pack(texts, token_budget=250) == [[0, 2], [1], [3]]
+    assert Summarizer.pack(texts, token_budget=250, max_batch=1) == [[0], [1], [2], [3]]
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from src.trigger_engine import TriggerEngine, TriggerSyntaxError, load_triggers
+
+
+def test_launch_triggers_compile():
+    triggers = load_triggers()
+    assert triggers["failed_handshake"]["action"] == "abort_recursion"
+    engine = TriggerEngine(triggers)
+    assert set(engine.by_metric) == {
+        "hallucination_probability",
+        "drift_index",
+        "phase_misalignment_duration",
+        "handshake_failures",
+    }
+
+
+def test_actions_dispatch_on_rising_edge():
+    engine = TriggerEngine(
+        {
+            "failed_handshake": {
+                "threshold": 3,
+                "condition": "handshake_failures >= threshold",
+                "action": "abort_recursion",
+            }
+        }
+    )
+    seen = []
+    engine.on("abort_recursion", seen.append)
+
+    assert engine.update("handshake_failures", 2) == []
+    fired = engine.update("handshake_failures", 3)
+    assert [e["trigger"] for e in fired] == ["failed_handshake"]
+    engine.update("handshake_failures", 4)
+    assert len(seen) == 1
+
+    engine.update("handshake_failures", 0)
+    engine.update("handshake_failures", 5)
+    assert len(seen) == 2
+
+
+def test_compound_conditions_and_unknown_metrics():
+    engine = TriggerEngine(
+        {
+            "combo": {
+                "threshold": 0.5,
+                "condition": "(drift_index > threshold and not alarm_rate < 0.1) or handshake_failures == 9",
+                "action": "context_reset",
+            }
+        }
+    )
+    assert engine.update("alarm_rate", 0.05) == []
+    assert engine.update("drift_index", 0.9) == []
+    assert engine.update("alarm_rate", 0.2)[0]["action"] == "context_reset"
+    assert engine.update("unwatched", 1.0) == []
+
+
+@pytest.mark.parametrize(
+    "condition",
+    ["drift_index >=", "__import__('os') >= 1", "drift_index >= threshold", "a > 1 b"],
+)
+def test_invalid_conditions_rejected(condition):
+    with pytest.raises(TriggerSyntaxError):
+        TriggerEngine({"bad": {"condition": condition}})
+
+
+def test_update_throughput():
+    engine = TriggerEngine(load_triggers())
+    start = time.perf_counter()
+    for i in range(20000):
+        engine.update("drift_index", (i % 10) / 100)
+    assert time.perf_counter() - start < 1.0
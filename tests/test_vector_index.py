@@ -0,0 +1,118 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from src import vector_index
+from src.vector_index import HEADER, RECORD, IndexFormatError, VectorIndex
+
+
+def _brute_force(vectors, query, k):
+    ranked = sorted((sum((a - b) ** 2 for a, b in zip(v, query)) ** 0.5, i) for i, v in enumerate(vectors))
+    return [i for _, i in ranked[:k]]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(vector_index, "np", None)
+    return request.param
+
+
+def test_fixed_width_records_and_reopen(tmp_path: Path):
+    path = tmp_path / "vectors.bin"
+    index = VectorIndex(str(path))
+    assert index.append([0.1, 0.2, 0.3, 0.4], "drift_log_a.json") == 0
+    assert index.append([0.5, 0.5, 0.5, 0.5], "x" * 40) == 1
+    assert path.stat().st_size == HEADER.size + 2 * RECORD.size
+    index.close()
+
+    reopened = VectorIndex(str(path))
+    assert len(reopened) == 2
+    assert reopened.record(0) == {"index": 0, "vector": [0.1, 0.2, 0.3, 0.4], "ref": "drift_log_a.json"}
+    assert reopened.record(1)["ref"] == "x" * 32
+    with pytest.raises(IndexError):
+        reopened.record(2)
+    with pytest.raises(ValueError):
+        reopened.append([0.1, 0.2], "short")
+
+    (tmp_path / "other.bin").write_bytes(b"not an index at all")
+    with pytest.raises(IndexFormatError):
+        VectorIndex(str(tmp_path / "other.bin"))
+
+
+def test_query_matches_brute_force(tmp_path: Path, backend):
+    rng = random.Random(7)
+    vectors = [[rng.random() for _ in range(4)] for _ in range(2000)]
+    index = VectorIndex(str(tmp_path / "vectors.bin"))
+    index.append_many((v, f"r{i}") for i, v in enumerate(vectors))
+
+    for _ in range(5):
+        query = [rng.random() for _ in range(4)]
+        hits = index.query(query, k=5)
+        assert [h["index"] for h in hits] == _brute_force(vectors, query, 5)
+        assert hits == sorted(hits, key=lambda h: h["distance"])
+
+    cheb = index.query([0.5] * 4, k=3, metric="chebyshev")
+    expected = sorted(range(len(vectors)), key=lambda i: max(abs(x - 0.5) for x in vectors[i]))[:3]
+    assert [h["index"] for h in cheb] == expected
+
+    # A record's neighbours never include itself
+    assert 10 not in [h["index"] for h in index.neighbours(10, k=5)]
+    with pytest.raises(ValueError):
+        index.query([0.5] * 4, metric="cosine")
+
+
+def test_sees_appends_from_another_instance(tmp_path: Path, backend):
+    path = str(tmp_path / "vectors.bin")
+    reader = VectorIndex(path)
+    assert reader.query([0.0] * 4) == []
+    writer = VectorIndex(path)
+    writer.append([0.9, 0.9, 0.9, 0.9], "late")
+    assert reader.query([1.0] * 4, k=1)[0]["ref"] == "late"
+
+
+def test_attach_and_backfill(tmp_path: Path, monkeypatch):
+    from core.drift_analysis_engine import DriftAnalysisEngine
+
+    monkeypatch.chdir(tmp_path)
+    engine = DriftAnalysisEngine()
+    live = VectorIndex(str(tmp_path / "live.bin"))
+    live.attach(engine)
+    vector, _ = engine.analyze_input(0.8, {"bias"})
+    assert len(live) == 1
+    hit = live.query(vector, k=1)[0]
+    assert hit["distance"] == 0.0
+    assert (Path(engine.logs_dir) / f"drift_log_{hit['ref']}.json").exists()
+
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    for i in range(3):
+        (logs / f"drift_log_2025-01-0{i + 1}T00:00:00Z.json").write_text(json.dumps({"vector": [i / 10] * 4}))
+    (logs / "drift_log_bad.json").write_text("{")
+    rebuilt = VectorIndex(str(tmp_path / "rebuilt.bin"))
+    assert rebuilt.backfill(str(logs)) == 3
+    assert rebuilt.record(2)["ref"] == "2025-01-03T00:00:00Z"
+
+
+def test_torn_append_is_trimmed_before_the_next_write(tmp_path: Path):
+    path = tmp_path / "vectors.bin"
+    index = VectorIndex(str(path))
+    index.append([0.1] * 4, "first")
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 20)  # a writer killed mid-append
+    assert index.append([0.2] * 4, "second") == 1
+    assert path.stat().st_size == HEADER.size + 2 * RECORD.size
+    assert VectorIndex(str(path)).record(1) == {"index": 1, "vector": [0.2] * 4, "ref": "second"}
+
+
+def test_event_record_ignores_other_writers(tmp_path: Path):
+    path = str(tmp_path / "vectors.bin")
+    ours, theirs = VectorIndex(path), VectorIndex(path)
+    number = ours.add_event({"vector": [0.3] * 4, "timestamp": "mine"})
+    theirs.append([0.9] * 4, "other process")
+    assert ours.take_event_record() == number == 0
+    assert ours.take_event_record() is None
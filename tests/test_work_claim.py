@@ -0,0 +1,129 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.work_claim import CLAIMS_DIR, LEASE_NAME, LeaseLostError, WorkClaimer, partition_of
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _reports(incoming: Path, count: int) -> None:
+    incoming.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        (incoming / f"report_{i:03d}.md").write_text(f"---\ntitle: Report {i}\n---\nUnique body number {i}\n")
+
+
+def test_claims_are_exclusive(tmp_path: Path):
+    _reports(tmp_path, 1)
+    first = WorkClaimer(str(tmp_path), worker_id="a")
+    second = WorkClaimer(str(tmp_path), worker_id="b")
+    claimed = first.claim("report_000.md")
+    assert claimed == str(tmp_path / CLAIMS_DIR / "a" / "report_000.md")
+    assert second.claim("report_000.md") is None
+    assert list(second.iter_claims()) == []
+
+    # Closing requeues unfinished work and drops the claim directory
+    first.close()
+    assert (tmp_path / "report_000.md").exists()
+    assert not (tmp_path / CLAIMS_DIR / "a").exists()
+    with pytest.raises(ValueError):
+        WorkClaimer(str(tmp_path), partitions=2, partition=2)
+
+
+def test_stale_lease_recovery(tmp_path: Path):
+    _reports(tmp_path, 4)
+    dead = WorkClaimer(str(tmp_path), worker_id="dead", lease_seconds=30)
+    claims = dead.iter_claims()
+    stranded = os.path.basename(next(claims))
+    busy = WorkClaimer(str(tmp_path), worker_id="busy", lease_seconds=30)
+    in_flight = os.path.basename(next(busy.iter_claims()))
+    old = time.time() - 60
+    os.utime(tmp_path / CLAIMS_DIR / "dead" / LEASE_NAME, (old, old))
+
+    live = WorkClaimer(str(tmp_path), worker_id="live", lease_seconds=30)
+    assert live.recover_stale() == [stranded]
+    assert not (tmp_path / CLAIMS_DIR / "dead").exists()
+    # A worker with a fresh lease keeps its claim
+    assert (tmp_path / CLAIMS_DIR / "busy" / in_flight).exists()
+    claimed = sorted(os.path.basename(p) for p in live.iter_claims())
+    assert stranded in claimed and in_flight not in claimed and len(claimed) == 3
+
+
+def test_heartbeat_keeps_slow_workers_alive(tmp_path: Path):
+    _reports(tmp_path, 3)
+    slow = WorkClaimer(str(tmp_path), worker_id="slow", lease_seconds=0.6)
+    claims = slow.iter_claims()
+    in_flight = next(claims)
+    other = WorkClaimer(str(tmp_path), worker_id="other", lease_seconds=0.6, heartbeat=False)
+    time.sleep(1.5)  # one report outlasting the lease several times
+    assert other.recover_stale() == []
+    assert os.path.exists(in_flight)
+    assert next(claims)
+    slow.close()
+
+
+def test_stalled_worker_detects_lost_lease(tmp_path: Path):
+    _reports(tmp_path, 3)
+    stalled = WorkClaimer(str(tmp_path), worker_id="stalled", lease_seconds=30, heartbeat=False)
+    claims = stalled.iter_claims()
+    in_flight = os.path.basename(next(claims))
+    old = time.time() - 60
+    os.utime(tmp_path / CLAIMS_DIR / "stalled" / LEASE_NAME, (old, old))
+
+    live = WorkClaimer(str(tmp_path), worker_id="live", lease_seconds=30, heartbeat=False)
+    assert live.recover_stale() == [in_flight]
+    assert sorted(p.name for p in (tmp_path / CLAIMS_DIR).iterdir()) == ["live"]
+    with pytest.raises(LeaseLostError):
+        stalled.renew()
+    with pytest.raises(LeaseLostError):
+        next(claims)
+    # The stalled worker's close must not touch the requeued report
+    stalled.close()
+    assert (tmp_path / in_flight).exists()
+
+
+def test_partitions_split_and_steal(tmp_path: Path):
+    _reports(tmp_path, 40)
+    names = sorted(p.name for p in tmp_path.iterdir() if p.is_file())
+    claimers = [WorkClaimer(str(tmp_path), worker_id=f"w{i}", partitions=4, partition=i) for i in range(3)]
+    seen = {}
+    for i, claimer in enumerate(claimers):
+        for path in claimer.iter_claims():
+            seen[os.path.basename(path)] = i
+    assert all(partition_of(name, 4) == worker for name, worker in seen.items())
+    # Partition 3 has no worker: its reports wait until someone steals them
+    orphans = [n for n in names if partition_of(n, 4) == 3]
+    assert orphans and sorted(p.name for p in tmp_path.iterdir() if p.is_file()) == orphans
+    thief = WorkClaimer(str(tmp_path), worker_id="thief", partitions=4, partition=0, steal_after=0)
+    assert sorted(os.path.basename(p) for p in thief.iter_claims()) == orphans
+
+
+def test_parallel_ingest_workers_process_each_report_once(tmp_path: Path):
+    data = tmp_path / "data"
+    _reports(data / "reports_incoming", 60)
+    script = ROOT / "src" / "ingest.py"
+    procs = [
+        subprocess.Popen(
+            [sys.executable, str(script), "--claim", "--worker-id", f"w{i}", "--no-dedupe"],
+            cwd=tmp_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        for i in range(4)
+    ]
+    for proc in procs:
+        _, err = proc.communicate(timeout=120)
+        assert proc.returncode == 0, err.decode()
+
+    outputs = sorted(p.name for p in (data / "analysis_output").glob("report_*.json"))
+    archived = sorted(p.name for p in (data / "chronicle" / "archive").iterdir())
+    assert len(outputs) == 60
+    # A duplicate ingest would leave a timestamp-suffixed copy in the archive
+    assert archived == [f"report_{i:03d}.md" for i in range(60)]
+    assert not any(p.is_file() for p in (data / "reports_incoming").iterdir())
+    assert not any((data / "reports_incoming" / CLAIMS_DIR).iterdir())
+    record = json.loads((data / "analysis_output" / "report_007.json").read_text())
+    assert record["metadata"]["title"] == "Report 7"